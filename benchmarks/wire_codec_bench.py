@@ -0,0 +1,65 @@
+"""
+Compares JSON text frames with binary wire frames for a simulated streaming run.
+
+Usage: PYTHONPATH=src python benchmarks/wire_codec_bench.py [--turns N]
+"""
+
+import argparse
+import json
+import time
+
+from hallw.server.wire_codec import encode_frame
+from hallw.tools import build_tool_response
+
+
+def simulated_events(turns: int) -> list[tuple[str, dict]]:
+    """Events of an agent run: streamed chunks, tool calls with large JSON results, stage updates."""
+    events = []
+    page = " ".join(f"Paragraph {idx}: the quick brown fox jumps over the lazy dog." for idx in range(200))
+    for turn in range(turns):
+        events.append(("llm_started", {"session_id": "s1"}))
+        for idx in range(40):
+            events.append(("llm_new_reasoning", {"session_id": "s1", "reasoning": f"thinking {idx} "}))
+        for idx in range(120):
+            events.append(("llm_new_text", {"session_id": "s1", "text": f"token{idx} "}))
+        args = json.dumps({"url": f"https://example.com/{turn}"})
+        events.append(
+            ("tool_state_update", {"session_id": "s1", "run_id": f"r{turn}", "status": "running", "args": args})
+        )
+        result = build_tool_response(
+            True, "Page content extracted.", {"content": page, "url": f"https://example.com/{turn}"}
+        )
+        events.append(
+            ("tool_state_update", {"session_id": "s1", "run_id": f"r{turn}", "status": "success", "result": result})
+        )
+        events.append(("stages_advanced", {"session_id": "s1", "current_stage": turn + 1}))
+        events.append(("llm_finished", {"session_id": "s1"}))
+    return events
+
+
+def measure(name: str, encode, events) -> None:
+    started = time.perf_counter()
+    sizes = [len(encode(event, data)) for event, data in events]
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:>8}: {sum(sizes):>10} bytes, {sum(sizes) / len(sizes):8.1f} bytes/event, "
+        f"{elapsed / len(events) * 1e6:6.2f} us/event, largest {max(sizes)} bytes"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    events = simulated_events(args.turns)
+    print(f"{len(events)} events")
+    # What python-socketio puts on the wire for a text event: packet type, then the JSON array
+    measure("json", lambda event, data: ("42" + json.dumps([event, data], separators=(",", ":"))).encode(), events)
+    # Binary events go out as a placeholder text packet followed by the binary attachment
+    placeholder = len('451-["wire",{"_placeholder":true,"num":0}]')
+    measure("msgpack", lambda event, data: b"\0" * placeholder + encode_frame(event, data), events)
+
+
+if __name__ == "__main__":
+    main()
@@ -216,7 +216,10 @@ app.whenReady().then(() => {
         });
 
         await view.webContents.loadURL("about:blank");
-        await view.webContents.executeJavaScript("window.__IS_AGENT_VIEW__ = true;");
+        // The view id lets each backend session find its own views (sessionId or sessionId:tabId)
+        await view.webContents.executeJavaScript(
+          `window.__IS_AGENT_VIEW__ = true; window.__AGENT_VIEW_ID__ = ${JSON.stringify(sessionId)};`
+        );
       }
 
       return true;
@@ -245,14 +248,15 @@ app.whenReady().then(() => {
       restoreWindowBounds(window);
     }
 
-    const view = cdpViews.get(sessionId);
-    if (view) {
+    // Extra agent tabs are keyed as `${sessionId}:${tabId}` and go with the session
+    for (const [viewId, view] of cdpViews) {
+      if (viewId !== sessionId && !viewId.startsWith(`${sessionId}:`)) continue;
       try {
         if (!view.webContents.isDestroyed()) {
           view.webContents.close();
         }
       } catch {}
-      cdpViews.delete(sessionId);
+      cdpViews.delete(viewId);
     }
 
     return true;
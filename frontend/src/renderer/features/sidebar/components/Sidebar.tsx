@@ -1,7 +1,8 @@
 import { cn } from "@lib/utils";
 
+import { useAppStore } from "@store/store";
 import { ChevronLeft } from "lucide-react";
-import { useRef, useState } from "react";
+import { useEffect, useRef, useState } from "react";
 
 import { useActiveSidebarSession } from "../hooks/useActiveSidebarSession";
 import type { SidebarProps } from "../types";
@@ -21,6 +22,15 @@ export function Sidebar({ className }: SidebarProps) {
   const completedStages = sidebar?.completedStages ?? [];
   const errorStageIndex = sidebar?.errorStageIndex ?? -1;
   const selectedTool = selectedRunId ? toolStates.find((t) => t.run_id === selectedRunId) : null;
+  const activeSessionId = useAppStore((s) => s.activeSessionId);
+  const fetchFullToolState = useAppStore((s) => s.fetchFullToolState);
+
+  // Long args/results arrive as previews; load the full text once the card is opened
+  useEffect(() => {
+    if (activeSessionId && selectedTool && (selectedTool.args_handle || selectedTool.result_handle)) {
+      fetchFullToolState(activeSessionId, selectedTool);
+    }
+  }, [activeSessionId, selectedTool, fetchFullToolState]);
 
   const handleMouseEnter = () => {
     if (hoverTimeoutRef.current) clearTimeout(hoverTimeoutRef.current);
@@ -3,10 +3,13 @@ import type { StateCreator } from "zustand";
 
 import { HIDDEN_TOOLS } from "../constants";
 import { patchSidebar, setRunningToolToError } from "../lib/utils";
-import type { SidebarSlice } from "../types";
+import type { SidebarSlice, ToolState } from "../types";
 
 export type { SidebarSessionState, SidebarSlice } from "../types";
 
+// Chunks of full tool payloads being fetched, keyed by `${sessionId}:${runId}:${field}`
+const pendingPayloads = new Map<string, string[]>();
+
 export const createSidebarSlice: StateCreator<AppState, [], [], SidebarSlice> = (set, get) => ({
   sidebarSessions: {},
 
@@ -17,12 +20,38 @@ export const createSidebarSlice: StateCreator<AppState, [], [], SidebarSlice> =
     return session.toolStates.filter((t) => !HIDDEN_TOOLS.includes(t.tool_name));
   },
 
+  fetchFullToolState: (sessionId, toolState) => {
+    const socket = get()._socket;
+    if (!socket) return;
+    for (const field of ["args", "result"] as const) {
+      const handle = toolState[`${field}_handle`];
+      const key = `${sessionId}:${toolState.run_id}:${field}`;
+      if (!handle || pendingPayloads.has(key)) continue;
+      pendingPayloads.set(key, []);
+      socket.emit("get_tool_result", { session_id: sessionId, run_id: toolState.run_id, field, handle });
+    }
+  },
+
+  _onToolResultChunk: (sessionId, data) => {
+    const key = `${sessionId}:${data.run_id}:${data.field}`;
+    const parts = pendingPayloads.get(key);
+    if (!parts) return;
+    if (data.chunk) parts.push(data.chunk);
+    if (!data.done) return;
+
+    pendingPayloads.delete(key);
+    if (data.error) return;
+    const update: Partial<ToolState> = { run_id: data.run_id, [data.field]: parts.join("") };
+    update[`${data.field}_handle`] = undefined;
+    get()._onToolStateUpdate(sessionId, update);
+  },
+
   _onToolStateUpdate: (sessionId, nextToolState) => {
     if (!nextToolState || !sessionId || !get().chatSessions[sessionId]) return;
     set((state) =>
       patchSidebar(state, sessionId, (s) => {
         const { run_id } = nextToolState;
-        if (!run_id) return { ...s, toolStates: [...s.toolStates, nextToolState] };
+        if (!run_id) return { ...s, toolStates: [...s.toolStates, nextToolState as ToolState] };
 
         const idx = s.toolStates.findIndex((t) => t.run_id === run_id);
         if (idx >= 0) {
@@ -30,7 +59,7 @@ export const createSidebarSlice: StateCreator<AppState, [], [], SidebarSlice> =
           updated[idx] = { ...updated[idx], ...nextToolState };
           return { ...s, toolStates: updated };
         }
-        return { ...s, toolStates: [...s.toolStates, nextToolState] };
+        return { ...s, toolStates: [...s.toolStates, nextToolState as ToolState] };
       })
     );
   },
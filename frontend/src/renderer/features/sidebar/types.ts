@@ -10,6 +10,21 @@ export interface ToolState {
   status: ToolStatus;
   args: string;
   result: string;
+  // Set when args/result were sent as a preview; the full text is fetched with get_tool_result
+  args_handle?: string;
+  args_chars?: number;
+  result_handle?: string;
+  result_chars?: number;
+}
+
+export interface ToolResultChunkPayload {
+  run_id: string;
+  field: "args" | "result";
+  offset?: number;
+  chunk?: string;
+  total_chars?: number;
+  done: boolean;
+  error?: string;
 }
 
 export interface ToolItemProps {
@@ -68,7 +83,10 @@ export interface SidebarSlice {
 
   getVisibleTools: () => ToolState[];
 
-  _onToolStateUpdate: (sessionId: string, state: ToolState) => void;
+  fetchFullToolState: (sessionId: string, toolState: ToolState) => void;
+
+  _onToolStateUpdate: (sessionId: string, state: Partial<ToolState>) => void;
+  _onToolResultChunk: (sessionId: string, data: ToolResultChunkPayload) => void;
   _onStagesBuilt: (sessionId: string, data: string[] | { stages?: string[] }) => void;
   _onStagesAdvanced: (sessionId: string, data: { completed_indices: number[]; next_index: number; is_done: boolean }) => void;
   _onStagesEdited: (sessionId: string, data: { stages: string[]; current_index: number }) => void;
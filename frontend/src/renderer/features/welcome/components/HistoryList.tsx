@@ -7,7 +7,7 @@ import { useEffect } from "react";
 import type { HistoryRowProps } from "../types";
 
 function HistoryRow({ item, onLoad, onDelete }: HistoryRowProps) {
-  const dateStr = item.created_at || item.metadata?.created_at;
+  const dateStr = item.updated_at || item.created_at || item.metadata?.created_at;
   const date = dateStr ? new Date(dateStr as string).toLocaleString() : "";
   const title = item.title || (item.metadata?.title as string) || `Conversation ${item.id.slice(0, 8)}`;
 
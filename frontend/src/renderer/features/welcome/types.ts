@@ -16,6 +16,10 @@ export interface HistoryItemProps {
   id: string;
   title?: string;
   created_at?: string;
+  updated_at?: string;
+  message_count?: number;
+  input_tokens?: number;
+  output_tokens?: number;
   metadata?: Record<string, unknown>;
 }
 
@@ -0,0 +1,136 @@
+// Decoder for binary "wire" frames sent by the backend (see hallw/server/wire_codec.py).
+// A frame is one flag byte (0 = raw, 1 = deflate) followed by MessagePack of [event, data].
+
+export const WIRE_EVENT = "wire";
+export const WIRE_ENCODINGS = ["msgpack", "json"];
+
+const FLAG_DEFLATE = 1;
+const textDecoder = new TextDecoder();
+
+export async function decodeWireFrame(frame: ArrayBuffer | Uint8Array): Promise<[string, unknown]> {
+  const bytes = frame instanceof Uint8Array ? frame : new Uint8Array(frame);
+  let body = bytes.subarray(1);
+  if (bytes[0] === FLAG_DEFLATE) {
+    const stream = new Blob([body.slice()]).stream().pipeThrough(new DecompressionStream("deflate"));
+    body = new Uint8Array(await new Response(stream).arrayBuffer());
+  }
+  const decoded = new MsgpackReader(body).read();
+  if (!Array.isArray(decoded) || typeof decoded[0] !== "string") {
+    throw new Error("Malformed wire frame");
+  }
+  return [decoded[0], decoded[1]];
+}
+
+class MsgpackReader {
+  private pos = 0;
+  private view: DataView;
+
+  constructor(private bytes: Uint8Array) {
+    this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  }
+
+  read(): unknown {
+    const type = this.u8();
+    if (type <= 0x7f) return type;
+    if (type <= 0x8f) return this.map(type & 0x0f);
+    if (type <= 0x9f) return this.array(type & 0x0f);
+    if (type <= 0xbf) return this.str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+
+    switch (type) {
+      case 0xc0:
+        return null;
+      case 0xc2:
+        return false;
+      case 0xc3:
+        return true;
+      case 0xc4:
+        return this.bin(this.u8());
+      case 0xc5:
+        return this.bin(this.u16());
+      case 0xc6:
+        return this.bin(this.u32());
+      case 0xca:
+        return this.take(4, (offset) => this.view.getFloat32(offset));
+      case 0xcb:
+        return this.take(8, (offset) => this.view.getFloat64(offset));
+      case 0xcc:
+        return this.u8();
+      case 0xcd:
+        return this.u16();
+      case 0xce:
+        return this.u32();
+      case 0xcf:
+        return Number(this.take(8, (offset) => this.view.getBigUint64(offset)));
+      case 0xd0:
+        return this.take(1, (offset) => this.view.getInt8(offset));
+      case 0xd1:
+        return this.take(2, (offset) => this.view.getInt16(offset));
+      case 0xd2:
+        return this.take(4, (offset) => this.view.getInt32(offset));
+      case 0xd3:
+        return Number(this.take(8, (offset) => this.view.getBigInt64(offset)));
+      case 0xd9:
+        return this.str(this.u8());
+      case 0xda:
+        return this.str(this.u16());
+      case 0xdb:
+        return this.str(this.u32());
+      case 0xdc:
+        return this.array(this.u16());
+      case 0xdd:
+        return this.array(this.u32());
+      case 0xde:
+        return this.map(this.u16());
+      case 0xdf:
+        return this.map(this.u32());
+      default:
+        throw new Error(`Unsupported MessagePack type 0x${type.toString(16)}`);
+    }
+  }
+
+  private take<T>(size: number, get: (offset: number) => T): T {
+    const value = get(this.pos);
+    this.pos += size;
+    return value;
+  }
+
+  private u8(): number {
+    return this.take(1, (offset) => this.view.getUint8(offset));
+  }
+
+  private u16(): number {
+    return this.take(2, (offset) => this.view.getUint16(offset));
+  }
+
+  private u32(): number {
+    return this.take(4, (offset) => this.view.getUint32(offset));
+  }
+
+  private str(length: number): string {
+    const value = textDecoder.decode(this.bytes.subarray(this.pos, this.pos + length));
+    this.pos += length;
+    return value;
+  }
+
+  private bin(length: number): Uint8Array {
+    const value = this.bytes.slice(this.pos, this.pos + length);
+    this.pos += length;
+    return value;
+  }
+
+  private array(length: number): unknown[] {
+    const items: unknown[] = [];
+    for (let i = 0; i < length; i++) items.push(this.read());
+    return items;
+  }
+
+  private map(length: number): Record<string, unknown> {
+    const result: Record<string, unknown> = {};
+    for (let i = 0; i < length; i++) {
+      const key = this.read();
+      result[String(key)] = this.read();
+    }
+    return result;
+  }
+}
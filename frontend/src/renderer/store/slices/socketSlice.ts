@@ -1,8 +1,9 @@
+import { decodeWireFrame, WIRE_ENCODINGS, WIRE_EVENT } from "@lib/wireCodec";
 import type { AppState } from "@store/store";
 import { io, type Socket } from "socket.io-client";
 import type { StateCreator } from "zustand";
 import type { Message, MessageRole } from "../../features/chat/types";
-import type { ToolState } from "../../features/sidebar/types";
+import type { ToolResultChunkPayload, ToolState } from "../../features/sidebar/types";
 
 interface RawTextMessage {
   id: string;
@@ -56,6 +57,7 @@ interface CdpPayload extends SessionPayload {
   request_id: string;
   headless?: boolean;
   userDataDir?: string;
+  tabId?: string | null;
 }
 
 interface HistoryLoadedPayload extends SessionPayload {
@@ -101,6 +103,21 @@ export const createSocketSlice: StateCreator<AppState, [], [], SocketSlice> = (s
     socket.on("connect", () => {
       console.log("Connected to backend");
       set({ isConnected: true });
+      // The backend answers with the encoding it will use; binary frames are handled below either way
+      socket.emit("set_wire_encoding", { encodings: WIRE_ENCODINGS }, (res: { encoding?: string }) => {
+        console.log(`Wire encoding: ${res?.encoding || "json"}`);
+      });
+    });
+
+    // Binary frames wrap a regular event; decode in arrival order and hand them to its listeners
+    let wireQueue: Promise<void> = Promise.resolve();
+    socket.on(WIRE_EVENT, (frame: ArrayBuffer | Uint8Array) => {
+      wireQueue = wireQueue
+        .then(async () => {
+          const [event, data] = await decodeWireFrame(frame);
+          for (const listener of socket.listeners(event)) listener(data);
+        })
+        .catch((err) => console.error("Failed to decode wire frame:", err));
     });
 
     socket.on("connect_error", (err) => {
@@ -211,6 +228,11 @@ export const createSocketSlice: StateCreator<AppState, [], [], SocketSlice> = (s
       const { session_id: _sessionId, ...toolPayload } = data;
       actions._onToolStateUpdate(sessionId, toolPayload as unknown as ToolState);
     });
+    socket.on("tool_result_chunk", (data: SessionPayload & ToolResultChunkPayload) => {
+      const sessionId = getSessionId(data) || actions.activeSessionId;
+      if (!sessionId) return;
+      actions._onToolResultChunk(sessionId, data);
+    });
     socket.on("stages_built", (data: SessionPayload & Record<string, unknown>) => {
       const sessionId = getSessionId(data);
       if (!sessionId) return;
@@ -266,6 +288,18 @@ export const createSocketSlice: StateCreator<AppState, [], [], SocketSlice> = (s
         return;
       }
 
+      // Extra agent tabs always run in the background next to the session's main view
+      if (data?.tabId) {
+        try {
+          await window.api?.cdpCreateOrShow?.(`${sessionId}:${data.tabId}`, true, data?.userDataDir);
+          socket.emit("resolve_cdp_page", { session_id: sessionId, status: "success" });
+        } catch (e) {
+          console.error("Failed to create CDP tab view", e);
+          socket.emit("resolve_cdp_page", { session_id: sessionId, status: "error" });
+        }
+        return;
+      }
+
       // Mark the session as having a CDP view
       set((state) => {
         const existing = state.chatSessions[sessionId];
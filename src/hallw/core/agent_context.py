@@ -0,0 +1,177 @@
+import json
+from typing import Any, Mapping, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage, ToolMessage
+
+from hallw.tools import build_tool_response, parse_tool_response
+from hallw.utils.spill_store import spill_output
+
+# Rough heuristics; good enough to decide when to compact without a tokenizer round-trip
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 1000
+TRANSCRIPT_MAX_CHARS = 2000
+
+SUMMARY_PREFIX = "Summary of earlier conversation turns (compacted to save context):"
+
+SPILL_PREVIEW_CHARS = 300
+# Outputs of these tools are already bounded slices of spilled data
+UNSPILLED_TOOLS = {"read_tool_output"}
+
+
+def estimate_tokens(messages: Sequence[BaseMessage]) -> int:
+    """Estimate the prompt size of a message list in tokens."""
+    total = 0
+    for msg in messages:
+        total += _estimate_content_tokens(msg.content)
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            total += (
+                len(json.dumps([call.get("args", {}) for call in msg.tool_calls], ensure_ascii=False))
+                // CHARS_PER_TOKEN
+            )
+    return total
+
+
+def build_prompt_messages(state: Mapping[str, Any]) -> list[BaseMessage]:
+    """
+    Returns the messages actually sent to the model.
+    Turns covered by the context summary are replaced with a single summary message,
+    while the system prompt and the latest user request are always kept verbatim.
+    """
+    messages = state["messages"]
+    summary = state.get("context_summary", "")
+    start = _index_of(messages, state.get("compacted_until", ""))
+    if not summary or start <= 0:
+        return list(messages)
+
+    head = [msg for msg in messages[:1] if isinstance(msg, SystemMessage)]
+    view = head + [SystemMessage(content=f"{SUMMARY_PREFIX}\n{summary}")]
+
+    last_human = _last_human_index(messages)
+    if 0 <= last_human < start:
+        view.append(messages[last_human])
+
+    return view + list(messages[start:])
+
+
+def find_compaction_boundary(state: Mapping[str, Any], keep_recent: int, budget: int = 0) -> tuple[int, int]:
+    """
+    Returns (start, end) indices of the messages to fold into the summary.
+    With a token *budget*, the boundary moves into the kept tail while the tail alone exceeds it,
+    so a compaction always brings the prompt back under the budget when the messages allow it.
+    The kept tail never starts with a ToolMessage, so tool-call/ToolMessage pairs stay intact.
+    """
+    messages = state["messages"]
+    start = max(_index_of(messages, state.get("compacted_until", "")), 0)
+    if start == 0 and messages and isinstance(messages[0], SystemMessage):
+        start = 1
+
+    end = max(len(messages) - max(keep_recent, 1), start)
+    if budget > 0:
+        tail_tokens = estimate_tokens(messages[end:])
+        while end < len(messages) - 1 and tail_tokens > budget:
+            tail_tokens -= estimate_tokens(messages[end : end + 1])
+            end += 1
+    while end > start and isinstance(messages[end], ToolMessage):
+        end -= 1
+    return start, end
+
+
+def spill_tool_messages(
+    messages: Sequence[BaseMessage], threshold: int, thread_id: str | None = None
+) -> list[ToolMessage]:
+    """
+    Moves large tool results out of the conversation.
+    Returns stub ToolMessages (same ids, so add_messages replaces in place) holding a preview
+    and an `output_handle` that the `read_tool_output` tool can resolve.
+    The outputs are kept until *thread_id* is deleted.
+    """
+    if threshold <= 0:
+        return []
+
+    stubs = []
+    for msg in messages:
+        if not isinstance(msg, ToolMessage) or msg.name in UNSPILLED_TOOLS:
+            continue
+        if not isinstance(msg.content, str) or len(msg.content) <= threshold:
+            continue
+
+        parsed = parse_tool_response(msg.content)
+        if "output_handle" in parsed.get("data", {}):
+            continue
+
+        handle = spill_output(msg.content, thread_id)
+        stub = build_tool_response(
+            parsed["success"],
+            f"{parsed['message']} Full output moved out of context, use `read_tool_output` with the handle to read it.",
+            {
+                "output_handle": handle,
+                "total_chars": len(msg.content),
+                "preview": msg.content[:SPILL_PREVIEW_CHARS],
+            },
+        )
+        stubs.append(ToolMessage(content=stub, tool_call_id=msg.tool_call_id, name=msg.name, id=msg.id))
+    return stubs
+
+
+def render_transcript(messages: Sequence[BaseMessage]) -> str:
+    """Render messages as compact plain text for the summarizer."""
+    lines = []
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            role = "User"
+        elif isinstance(msg, AIMessage):
+            role = "Assistant"
+        elif isinstance(msg, ToolMessage):
+            role = f"Tool {msg.name or ''}".strip()
+        else:
+            role = "System"
+
+        text = _content_text(msg.content)
+        if len(text) > TRANSCRIPT_MAX_CHARS:
+            text = text[:TRANSCRIPT_MAX_CHARS] + "...(truncated)"
+        if isinstance(msg, AIMessage) and msg.tool_calls:
+            calls = ", ".join(
+                f"{call['name']}({json.dumps(call.get('args', {}), ensure_ascii=False)})" for call in msg.tool_calls
+            )
+            text = f"{text}\n[called: {calls}]".strip()
+        if text:
+            lines.append(f"{role}: {text}")
+    return "\n\n".join(lines)
+
+
+def _estimate_content_tokens(content: Any) -> int:
+    if isinstance(content, str):
+        return len(content) // CHARS_PER_TOKEN
+    tokens = 0
+    for block in content or []:
+        if isinstance(block, str):
+            tokens += len(block) // CHARS_PER_TOKEN
+        elif isinstance(block, dict) and block.get("type") == "text":
+            tokens += len(block.get("text", "")) // CHARS_PER_TOKEN
+        else:
+            tokens += IMAGE_TOKENS
+    return tokens
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for block in content or []:
+        if isinstance(block, str):
+            parts.append(block)
+        elif isinstance(block, dict) and block.get("type") == "text":
+            parts.append(block.get("text", ""))
+        else:
+            parts.append("[attachment]")
+    return "\n".join(parts)
+
+
+def _index_of(messages: Sequence[BaseMessage], message_id: str) -> int:
+    if not message_id:
+        return -1
+    return next((idx for idx, msg in enumerate(messages) if msg.id == message_id), -1)
+
+
+def _last_human_index(messages: Sequence[BaseMessage]) -> int:
+    return next((idx for idx in range(len(messages) - 1, -1, -1) if isinstance(messages[idx], HumanMessage)), -1)
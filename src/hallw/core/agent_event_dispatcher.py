@@ -3,6 +3,9 @@ from typing import Any, Callable
 
 from hallw.tools import ToolResult, parse_tool_response
 
+# Runs tagged with this are internal housekeeping (e.g. context compaction) and are not rendered
+SILENT_TAG = "hallw:silent"
+
 
 class AgentEventDispatcher:
     def __init__(self, renderer: Any):
@@ -47,6 +50,8 @@ class AgentEventDispatcher:
 
     async def dispatch(self, event: dict[str, Any]):
         kind, name = event.get("event"), event.get("name")
+        if SILENT_TAG in event.get("tags", []):
+            return
         handler = self._handlers.get((kind, name)) or self._handlers.get((kind, None))
         if handler:
             try:
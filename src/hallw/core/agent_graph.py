@@ -1,37 +1,119 @@
 import asyncio
+import json
+import re
+import weakref
+from collections import OrderedDict
+from typing import Sequence, cast
 
 from langchain_core.callbacks.manager import dispatch_custom_event
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    message_chunk_to_message,
+)
 from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.state import CompiledStateGraph
 
 from hallw.tools import (
+    ToolResultCache,
     build_stages,
     build_tool_response,
     dummy_for_missed_tool,
     edit_stages,
     end_current_stage,
+    is_idempotent,
     load_tools,
     parse_tool_response,
 )
+from hallw.tools.playwright.playwright_mgr import DEFAULT_TAB
 from hallw.utils import config as app_config
-
+from hallw.utils.blob_store import resolve_message_blobs
+
+from .agent_context import (
+    build_prompt_messages,
+    estimate_tokens,
+    find_compaction_boundary,
+    render_transcript,
+    spill_tool_messages,
+)
+from .agent_event_dispatcher import SILENT_TAG
+from .agent_llm_mgr import AgentLLMManager
 from .agent_state import AgentState, AgentStats
 
+DEFAULT_STAGE_MAX_CHARS = 50
+SIMPLE_REQUEST_MAX_CHARS = 200
+MULTI_STEP_PATTERN = re.compile(
+    r"\b(then|after that|afterwards|finally|first|next|steps?)\b|^\s*\d+[.)]\s|然后|接着|之后|最后|首先|步骤",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+# Control-plane nodes that can run on their own (usually cheaper) model
+CONTROL_NODES = ("build", "proceed", "reflection", "compact")
+# Compiled graphs kept for reuse; one per distinct model/tool configuration in use
+GRAPH_CACHE_SIZE = 8
+
 
 class AgentGraphBuilder:
     """Encapsulates the construction of the LangGraph workflow to avoid deep function nesting."""
 
-    def __init__(self, model, checkpointer):
+    # Process-wide LRU: (model identities, tool names, checkpointer type) -> builder with compiled graph
+    _cache: OrderedDict[tuple[tuple[int, ...], tuple[str, ...], str], "AgentGraphBuilder"] = OrderedDict()
+    # Every live builder, cached or already evicted, so eager calls of a stopped run can still be found
+    _instances: "weakref.WeakSet[AgentGraphBuilder]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        model,
+        checkpointer,
+        tools_dict: dict[str, BaseTool] | None = None,
+        node_models: dict[str, BaseChatModel] | None = None,
+    ):
         self.model = model
         self.checkpointer = checkpointer
-        self.tools_dict = load_tools()
+        self.tools_dict = tools_dict if tools_dict is not None else load_tools()
+        # Nodes without a dedicated model share the main one
+        self.node_models = {node: (node_models or {}).get(node) or model for node in CONTROL_NODES}
+
+        # Pre-bind tools once so schema conversion stays off the per-turn hot path
+        self.build_model = self.node_models["build"].bind_tools([build_stages], tool_choice="required")
+        self.auto_model = model.bind_tools(list(self.tools_dict.values()), tool_choice="auto")
+        self.proceed_model = self.node_models["proceed"].bind_tools(
+            [end_current_stage, edit_stages], tool_choice="required"
+        )
+        self.plan_model = model.bind_tools([build_stages, *self.tools_dict.values()], tool_choice="auto")
+        self.reflection_model = self.node_models["reflection"]
+        self.summary_model = self.node_models["compact"].with_config(tags=[SILENT_TAG])
+        self.cache_providers = {
+            node: AgentLLMManager.get_cache_provider(node_model)
+            for node, node_model in {"model": model, **self.node_models}.items()
+        }
+        self.compiled: CompiledStateGraph[AgentState] | None = None
+        # Tool calls started while the response was still streaming: thread id -> call id -> (args, task).
+        # Per thread because one cached builder serves every session.
+        self._eager_calls: dict[str, dict[str, tuple[dict, asyncio.Task]]] = {}
+        AgentGraphBuilder._instances.add(self)
 
     # --- Nodes ---
 
     async def build_node(self, state: AgentState, config: RunnableConfig):
         steering_messages = self._drain_steering(state, config)
+        if app_config.model_planning_mode == "heuristic" and _is_simple_request(state["messages"] + steering_messages):
+            # Skip the planning round-trip; a single default stage is enough for simple requests
+            return {
+                "messages": steering_messages,
+                **_default_stage(state["messages"] + steering_messages, config),
+                "current_stage": 0,
+                "task_completed": False,
+            }
+
         append_prompt = """
             A new user request has been received. Now build the stages for the LATEST user input.
             <build_rules>
@@ -45,8 +127,8 @@ class AgentGraphBuilder:
         """
         append_msg = SystemMessage(content=append_prompt)
 
-        response = await self.model.bind_tools([build_stages], tool_choice="required").ainvoke(
-            state["messages"] + steering_messages + [append_msg], config=config
+        response = await self.build_model.ainvoke(
+            self._prompt(state, steering_messages + [append_msg], node="build"), config=config
         )
 
         return {
@@ -60,6 +142,9 @@ class AgentGraphBuilder:
 
     async def model_node(self, state: AgentState, config: RunnableConfig):
         steering_messages = self._drain_steering(state, config)
+        if state["total_stages"] == 0:
+            return await self._inline_plan(state, steering_messages, config)
+
         curr_stage = state["current_stage"]
         total_stages = state["total_stages"]
         stage_names = state["stage_names"]
@@ -68,14 +153,43 @@ class AgentGraphBuilder:
         """
         append_msg = SystemMessage(content=append_prompt)
 
-        response = await self.model.bind_tools(list(self.tools_dict.values()), tool_choice="auto").ainvoke(
-            state["messages"] + steering_messages + [append_msg], config=config
-        )
+        response = await self._generate(self.auto_model, self._prompt(state, steering_messages + [append_msg]), config)
 
-        return {
+        update = {
             "messages": steering_messages + [response],
             "stats": _extract_usage(response),
+            "proceed_attempts": 0,
         }
+        _auto_advance(update, response, curr_stage, total_stages, stage_names, config)
+        return update
+
+    async def _inline_plan(self, state: AgentState, steering_messages: list, config: RunnableConfig):
+        """
+        Planning and acting in one response: `build_stages` is offered next to the regular tools.
+        Falls back to a single default stage when the model acts without planning.
+        """
+        append_prompt = """
+            A new user request has been received.
+            In this response, call the `build_stages` tool for the LATEST user input, and in parallel
+            call any other tools you already know you need for the first stage.
+            If the request is simple, create only one stage to finish it quickly.
+        """
+        append_msg = SystemMessage(content=append_prompt)
+
+        response = await self._generate(self.plan_model, self._prompt(state, steering_messages + [append_msg]), config)
+
+        update = {
+            "messages": steering_messages + [response],
+            "stats": _extract_usage(response),
+            "current_stage": 0,
+            "total_stages": 0,
+            "stage_names": [],
+            "task_completed": False,
+        }
+        if not any(call["name"] == "build_stages" for call in response.tool_calls):
+            update.update(_default_stage(state["messages"] + steering_messages, config))
+            _auto_advance(update, response, 0, update["total_stages"], update["stage_names"], config)
+        return update
 
     async def proceed_node(self, state: AgentState, config: RunnableConfig):
         steering_messages = self._drain_steering(state, config)
@@ -84,11 +198,18 @@ class AgentGraphBuilder:
         Forces the agent to either advance stages or edit them.
         Only end_current_stage and edit_stages are available here.
         """
-        proceed_tools = [end_current_stage, edit_stages]
-
         curr_stage = state["current_stage"]
         remaining_stages = state["stage_names"][curr_stage:]
 
+        attempts = state.get("proceed_attempts", 0)
+        if attempts >= app_config.model_proceed_max_retries:
+            # The model keeps answering without a tool call; advance one stage instead of retrying forever
+            return {
+                "messages": steering_messages,
+                **_advance_stages(1, curr_stage, state["total_stages"], state["stage_names"], config),
+                "proceed_attempts": 0,
+            }
+
         append_prompt = f"""
             Stages are not finished yet.
             Remaining stages: {", ".join(remaining_stages)}
@@ -99,15 +220,23 @@ class AgentGraphBuilder:
         """
         append_msg = SystemMessage(content=append_prompt)
 
-        response = await self.model.bind_tools(proceed_tools, tool_choice="required").ainvoke(
-            state["messages"] + steering_messages + [append_msg], config=config
+        response = await self.proceed_model.ainvoke(
+            self._prompt(state, steering_messages + [append_msg], node="proceed"), config=config
         )
 
         return {
             "messages": steering_messages + [response],
             "stats": _extract_usage(response),
+            "proceed_attempts": 0 if response.tool_calls else attempts + 1,
         }
 
+    def _prompt(self, state: AgentState, trailing: Sequence[BaseMessage], node: str = "model") -> list[BaseMessage]:
+        """History view with cache breakpoints for the node's model, followed by the per-call trailing messages."""
+        provider = self.cache_providers[node]
+        history = AgentLLMManager.add_cache_markers(build_prompt_messages(state), provider)
+        # Attachments are stored as blob references; inline them only for the provider payload
+        return resolve_message_blobs([*history, *AgentLLMManager.trailing_messages(trailing, provider)])
+
     def _drain_steering(self, state: AgentState, config: RunnableConfig) -> list[SystemMessage | HumanMessage]:
         queue = state.get("steering_queue", [])
         steering_messages = list(queue)
@@ -133,37 +262,44 @@ class AgentGraphBuilder:
 
     async def tools_node(self, state: AgentState, config: RunnableConfig):
         ai_msg = state["messages"][-1]
+        # The model has seen earlier results at least once; move the large ones out of the prompt
+        spilled = spill_tool_messages(
+            state["messages"][:-1], app_config.tool_output_spill_chars, _thread_key(config) or None
+        )
         tool_messages: list[ToolMessage] = []
         stats_inc = {"tool_call_counts": 0, "failures": 0, "failures_since_last_reflection": 0}
         curr_idx = state["current_stage"]
         stage_names = list(state["stage_names"])
         total = state["total_stages"]
         is_done = False
+        loop = asyncio.get_running_loop()
+        step_timeout = app_config.tool_step_timeout
+        deadline = loop.time() + step_timeout if step_timeout > 0 else None
 
         async def _run_tool(call):
-            name, args = call["name"], call["args"]
-            if name in self.tools_dict:
-                tool = self.tools_dict[name]
-            elif name == "build_stages":
-                tool = build_stages
-            else:
-                tool = dummy_for_missed_tool
-                tool.name = name
-                args = {"name": name}
-
-            try:
-                output = await tool.ainvoke(args, config=config)
-                return call, output
-            except Exception as e:
-                output = build_tool_response(success=False, message=f"Tool error: {str(e)}")
-                return call, output
+            remaining = deadline - loop.time() if deadline else None
+            eager = self._pop_eager_call(config, call["id"]) if call.get("id") else None
+            if eager is not None:
+                eager_args, task = eager
+                if eager_args == call["args"]:
+                    return call, await _await_eager(call["name"], task, remaining)
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                remaining = deadline - loop.time() if deadline else None
+
+            return call, await self._invoke_tool(call, config, remaining)
+
+        async def _run_browser_tab(calls):
+            # Calls on the same tab depend on each other's page state, so they stay in order
+            return [await _run_tool(call) for call in calls]
 
         async def _run_browser_tools():
-            res = []
+            tabs: dict[str, list] = {}
             for call in ai_msg.tool_calls:
                 if call["name"].startswith("browser_"):
-                    res.append(await _run_tool(call))
-            return res
+                    tabs.setdefault(call["args"].get("tab_id", DEFAULT_TAB), []).append(call)
+            tab_results = await asyncio.gather(*[_run_browser_tab(calls) for calls in tabs.values()])
+            return [res for results in tab_results for res in results]
 
         async def _run_other_tools():
             return list(
@@ -173,7 +309,8 @@ class AgentGraphBuilder:
             )
 
         browser_res, other_res = await asyncio.gather(_run_browser_tools(), _run_other_tools())
-        results = browser_res + other_res
+        # Stages must exist before any end_current_stage/edit_stages issued in the same response
+        results = sorted(browser_res + other_res, key=lambda res: res[0]["name"] != "build_stages")
 
         for call, output in results:
             name, args, call_id = call["name"], call["args"], call["id"]
@@ -195,7 +332,7 @@ class AgentGraphBuilder:
             stats_inc["tool_call_counts"] += 1
 
         return {
-            "messages": tool_messages,
+            "messages": spilled + tool_messages,
             "current_stage": curr_idx,
             "stage_names": stage_names,
             "total_stages": total,
@@ -203,6 +340,94 @@ class AgentGraphBuilder:
             "stats": stats_inc,
         }
 
+    async def _invoke_tool(self, call: dict, config: RunnableConfig, remaining: float | None = None) -> str:
+        """Run one tool call with its timeout and the thread's result cache. Always returns a tool response."""
+        name, args = call["name"], call["args"]
+        if name in self.tools_dict:
+            tool = self.tools_dict[name]
+        elif name == "build_stages":
+            tool = build_stages
+        else:
+            tool = dummy_for_missed_tool
+            tool.name = name
+            args = {"name": name}
+
+        tool_cache: ToolResultCache | None = config.get("configurable", {}).get("tool_cache")
+        cache_key = tool_cache.key(tool, args) if tool_cache is not None else None
+        if tool_cache is not None and cache_key is not None and (cached := tool_cache.get(cache_key)) is not None:
+            return cached
+
+        timeout = _tool_timeout(name, remaining)
+        try:
+            output: str = await asyncio.wait_for(tool.ainvoke(args, config=config), timeout)
+            if tool_cache is not None and cache_key is not None and parse_tool_response(output).get("success"):
+                tool_cache.put(cache_key, output)
+            return output
+        except asyncio.TimeoutError:
+            return build_tool_response(
+                success=False,
+                message=f"Tool '{name}' timed out after {timeout:.0f}s and was cancelled.",
+                data={"timeout": timeout},
+            )
+        except Exception as e:
+            return build_tool_response(success=False, message=f"Tool error: {str(e)}")
+
+    async def _generate(self, model, messages: list[BaseMessage], config: RunnableConfig) -> AIMessage:
+        """
+        Invoke *model*. In eager mode the response is streamed instead, and each idempotent tool call
+        starts as soon as its arguments are complete; tools_node then picks up the running task.
+        """
+        if not app_config.tool_eager_execution:
+            invoked: AIMessage = await model.ainvoke(messages, config=config)
+            return invoked
+
+        response: AIMessageChunk | None = None
+        started: set[str] = set()
+        try:
+            async for chunk in model.astream(messages, config=config):
+                response = chunk if response is None else response + chunk
+                for call in response.tool_call_chunks:
+                    call_id, name = call.get("id"), call.get("name")
+                    if not call_id or call_id in started or not is_idempotent(name) or name not in self.tools_dict:
+                        continue
+                    args = _complete_args(call.get("args"))
+                    if args is None:
+                        continue
+                    started.add(call_id)
+                    task = asyncio.create_task(self._invoke_tool({"name": name, "args": args, "id": call_id}, config))
+                    self._eager_calls.setdefault(_thread_key(config), {})[call_id] = (args, task)
+        except BaseException:
+            self._drop_eager_calls(config, started)
+            raise
+
+        if response is None:
+            # The stream ended without a single chunk
+            return AIMessage(content="")
+        message = cast(AIMessage, message_chunk_to_message(response))
+        # Calls the final message does not contain will never reach tools_node
+        self._drop_eager_calls(config, started - {call["id"] for call in message.tool_calls})
+        return message
+
+    def _pop_eager_call(self, config: RunnableConfig, call_id: str) -> tuple[dict, asyncio.Task] | None:
+        thread_key = _thread_key(config)
+        eager_calls = self._eager_calls.get(thread_key, {})
+        eager = eager_calls.pop(call_id, None)
+        if not eager_calls:
+            self._eager_calls.pop(thread_key, None)
+        return eager
+
+    def _drop_eager_calls(self, config: RunnableConfig, call_ids: set[str]) -> None:
+        for call_id in call_ids:
+            if (eager := self._pop_eager_call(config, call_id)) is not None:
+                eager[1].cancel()
+
+    async def cancel_eager_calls(self, thread_id: str) -> None:
+        """Cancel and await the eager tool calls of a run that never reached tools_node."""
+        tasks = [task for _, task in self._eager_calls.pop(str(thread_id), {}).values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
     async def reflection_node(self, state: AgentState, config: RunnableConfig):
         steering_messages = self._drain_steering(state, config)
         fail_count = state["stats"]["failures_since_last_reflection"]
@@ -214,16 +439,72 @@ class AgentGraphBuilder:
         """
         append_msg = SystemMessage(content=append_prompt)
 
-        response = await self.model.ainvoke(state["messages"] + steering_messages + [append_msg], config=config)
+        response = await self.reflection_model.ainvoke(
+            self._prompt(state, steering_messages + [append_msg], node="reflection"), config=config
+        )
 
         return {
             "messages": steering_messages + [response],
             "stats": {**_extract_usage(response), "failures_since_last_reflection": -fail_count},
         }
 
+    async def compact_node(self, state: AgentState, config: RunnableConfig):
+        """
+        Folds older turns into the running context summary once the prompt exceeds the token budget.
+        Messages stay in state untouched; only the prompt view built by build_prompt_messages shrinks.
+        """
+        messages = state["messages"]
+        start, end = find_compaction_boundary(
+            state, app_config.model_context_keep_recent, app_config.model_context_budget
+        )
+        if end <= start:
+            return {}
+
+        before = estimate_tokens(build_prompt_messages(state))
+        previous_summary = state.get("context_summary", "")
+        summary_prompt = """
+            You compress the history of an AI agent's conversation so it can continue working with less context.
+            Write a concise summary that preserves:
+            - Every user request and preference, and whether it has been fulfilled.
+            - Key facts, findings, file paths, URLs and decisions produced so far.
+            - Work still pending and any errors worth avoiding.
+            Do not call tools. Output only the summary.
+        """
+        transcript = render_transcript(messages[start:end])
+        if previous_summary:
+            transcript = f"Existing summary:\n{previous_summary}\n\nNew turns:\n{transcript}"
+
+        response = await self.summary_model.ainvoke(
+            [SystemMessage(content=summary_prompt), HumanMessage(content=transcript)], config=config
+        )
+        summary = str(response.content).strip()
+        if not summary:
+            return {"stats": _extract_usage(response)}
+
+        compacted = {**state, "context_summary": summary, "compacted_until": messages[end].id}
+        saved = max(before - estimate_tokens(build_prompt_messages(compacted)), 0)
+
+        return {
+            "context_summary": summary,
+            "compacted_until": messages[end].id,
+            "stats": {**_extract_usage(response), "compacted_tokens": saved},
+        }
+
+    def _needs_compaction(self, state: AgentState) -> bool:
+        budget = app_config.model_context_budget
+        if budget <= 0:
+            return False
+        start, end = find_compaction_boundary(state, app_config.model_context_keep_recent, budget)
+        return end > start and estimate_tokens(build_prompt_messages(state)) > budget
+
     # --- Routing Logic ---
 
+    def route_start(self, state: AgentState):
+        return "compact" if self._needs_compaction(state) else self._plan_entry()
+
     def route_build(self, state: AgentState):
+        if state.get("total_stages"):
+            return "model"
         if isinstance(state["messages"][-1], AIMessage) and state["messages"][-1].tool_calls:
             return "tools"
         # Retry
@@ -232,6 +513,9 @@ class AgentGraphBuilder:
     def route_model(self, state: AgentState):
         if isinstance(state["messages"][-1], AIMessage) and state["messages"][-1].tool_calls:
             return "tools"
+        if state.get("task_completed"):
+            # Auto-advanced past the last stage
+            return self._next_after_tools(state)
         fails = state["stats"].get("failures_since_last_reflection", 0)
         if fails > 0 and fails % app_config.model_reflection_threshold == 0:
             return "reflection"
@@ -241,14 +525,29 @@ class AgentGraphBuilder:
     def route_proceed(self, state: AgentState):
         if isinstance(state["messages"][-1], AIMessage) and state["messages"][-1].tool_calls:
             return "tools"
+        if state.get("proceed_attempts", 0) == 0:
+            # Retry limit reached and the stage was advanced without the model
+            return self._next_after_tools(state)
         # Retry
         return "proceed"
 
     def route_tools(self, state: AgentState, config: RunnableConfig):
+        next_node = self._next_after_tools(state)
+        if next_node != END and self._needs_compaction(state):
+            return "compact"
+        return next_node
+
+    def route_compact(self, state: AgentState):
+        if not state.get("total_stages") and not state.get("task_completed"):
+            # Compacted at the start of a turn, before any plan exists
+            return self._plan_entry()
+        return self._next_after_tools(state)
+
+    def _next_after_tools(self, state: AgentState):
         # If task is completed, return END
         if state.get("task_completed"):
             if state.get("steering_queue"):
-                return "build"
+                return self._plan_entry()
             return END
         # If build output is empty, retry
         if state.get("total_stages") == 0:
@@ -259,6 +558,10 @@ class AgentGraphBuilder:
             return "reflection"
         return "model"
 
+    def _plan_entry(self) -> str:
+        # Inline planning lets the first model call build stages and act in the same response
+        return "model" if app_config.model_planning_mode == "inline" else "build"
+
     # --- Build Graph ---
 
     def build(self) -> CompiledStateGraph[AgentState]:
@@ -268,23 +571,52 @@ class AgentGraphBuilder:
         builder.add_node("proceed", self.proceed_node)
         builder.add_node("tools", self.tools_node)
         builder.add_node("reflection", self.reflection_node)
+        builder.add_node("compact", self.compact_node)
 
-        builder.add_edge(START, "build")
+        builder.add_conditional_edges(START, self.route_start)
         builder.add_conditional_edges("build", self.route_build)
         builder.add_conditional_edges("model", self.route_model)
         builder.add_conditional_edges("proceed", self.route_proceed)
         builder.add_conditional_edges("tools", self.route_tools)
+        builder.add_conditional_edges("compact", self.route_compact)
         builder.add_edge("reflection", "model")
 
         return builder.compile(checkpointer=self.checkpointer)
 
 
-def build_graph(model, checkpointer) -> CompiledStateGraph[AgentState]:
+def build_graph(
+    model, checkpointer, node_models: dict[str, BaseChatModel] | None = None
+) -> CompiledStateGraph[AgentState]:
     """
     Builds the LangGraph workflow.
-    Delegates to AgentGraphBuilder for modular construction.
+    Delegates to AgentGraphBuilder for modular construction and reuses the compiled
+    graph across tasks; only the checkpointer instance is swapped per call.
     """
-    return AgentGraphBuilder(model, checkpointer).build()
+    tools_dict = load_tools()
+    node_models = {node: (node_models or {}).get(node) or model for node in CONTROL_NODES}
+    models = (model, *(node_models[node] for node in CONTROL_NODES))
+    key = (tuple(id(m) for m in models), tuple(sorted(tools_dict)), type(checkpointer).__qualname__)
+
+    builder = AgentGraphBuilder._cache.get(key)
+    if (
+        builder is None
+        or builder.compiled is None
+        or any(a is not b for a, b in zip((builder.model, *builder.node_models.values()), models))
+    ):
+        builder = AgentGraphBuilder(model, checkpointer, tools_dict, node_models)
+        builder.compiled = builder.build()
+        AgentGraphBuilder._cache[key] = builder
+    AgentGraphBuilder._cache.move_to_end(key)
+    while len(AgentGraphBuilder._cache) > GRAPH_CACHE_SIZE:
+        AgentGraphBuilder._cache.popitem(last=False)
+
+    return builder.compiled.copy(update={"checkpointer": checkpointer})
+
+
+async def cancel_eager_calls(thread_id: str) -> None:
+    """Cancel the tool calls a stopped run started while streaming, so their side effects do not outlive it."""
+    for builder in list(AgentGraphBuilder._instances):
+        await builder.cancel_eager_calls(thread_id)
 
 
 # --- Helper Functions ---
@@ -303,6 +635,94 @@ def _handle_build_stages(output, config):
     return stages, total
 
 
+def _thread_key(config: RunnableConfig) -> str:
+    return str(config.get("configurable", {}).get("thread_id", ""))
+
+
+def _complete_args(raw: str | None) -> dict | None:
+    """Parsed tool call arguments once the streamed JSON is complete, otherwise None."""
+    if not raw:
+        return None
+    try:
+        args = json.loads(raw)
+    except ValueError:
+        return None
+    return args if isinstance(args, dict) else None
+
+
+async def _await_eager(name: str, task: asyncio.Task, remaining: float | None) -> str:
+    """Result of an eager tool call, cancelled like any other call once the step budget runs out."""
+    try:
+        return await asyncio.wait_for(task, remaining)
+    except asyncio.TimeoutError:
+        return build_tool_response(
+            success=False,
+            message=f"Tool '{name}' exceeded the step time budget and was cancelled.",
+            data={"timeout": remaining},
+        )
+
+
+def _tool_timeout(name: str, remaining: float | None) -> float | None:
+    """Seconds a tool call may run: its own limit, capped by what is left of the step budget."""
+    limit = app_config.tool_timeouts.get(name, app_config.tool_timeout)
+    limits = [t for t in (limit if limit > 0 else None, remaining) if t is not None]
+    return max(min(limits), 0) if limits else None
+
+
+def _default_stage(messages, config):
+    """Create a single stage named after the latest user request. Returns the stage state update."""
+    text = _latest_request_text(messages) or "Complete the request"
+    stage = text if len(text) <= DEFAULT_STAGE_MAX_CHARS else text[:DEFAULT_STAGE_MAX_CHARS].rstrip() + "..."
+    dispatch_custom_event("stages_built", {"stages": [stage]}, config=config)
+    return {"stage_names": [stage], "total_stages": 1}
+
+
+def _is_simple_request(messages) -> bool:
+    """Cheap local check for requests that need no multi-stage plan."""
+    last_human = next((msg for msg in reversed(messages) if isinstance(msg, HumanMessage)), None)
+    if last_human is None or not isinstance(last_human.content, str):
+        # Attachments usually mean real work
+        return False
+    text = last_human.content.strip()
+    if len(text) > SIMPLE_REQUEST_MAX_CHARS or text.count("\n") > 1:
+        return False
+    return not MULTI_STEP_PATTERN.search(text)
+
+
+def _latest_request_text(messages) -> str:
+    for msg in reversed(messages):
+        if isinstance(msg, HumanMessage):
+            content = msg.content
+            if isinstance(content, list):
+                content = next((b.get("text", "") for b in reversed(content) if isinstance(b, dict)), "")
+            return " ".join(str(content).split())
+    return ""
+
+
+def _is_final_answer(response: AIMessage, curr_idx: int, total: int) -> bool:
+    """A plain text answer on the last stage: the task is unambiguously finished."""
+    if response.tool_calls or total <= 0 or curr_idx != total - 1:
+        return False
+    content = response.content
+    if isinstance(content, list):
+        content = "".join(b.get("text", "") if isinstance(b, dict) else str(b) for b in content)
+    return bool(str(content).strip())
+
+
+def _auto_advance(update, response, curr_idx, total, stage_names, config):
+    """Finish the task in *update* when *response* is a final answer, saving the proceed round-trip."""
+    if app_config.model_auto_advance and _is_final_answer(response, curr_idx, total):
+        # A text answer on the last stage can only mean "done"; no need to ask the model again
+        update.update(_advance_stages(-1, curr_idx, total, stage_names, config))
+        update["stats"] = {**update["stats"], "proceed_calls_saved": 1}
+
+
+def _advance_stages(stage_count, curr_idx, total, stage_names, config):
+    """Advance stages without a model round-trip, as if end_current_stage was called. Returns the state update."""
+    curr_idx, is_done = _handle_end_stage({"stage_count": stage_count}, curr_idx, total, stage_names, config)
+    return {"current_stage": curr_idx, "task_completed": is_done}
+
+
 def _handle_end_stage(args, curr_idx, total, stage_names, config):
     """Handle end_current_stage tool result. Returns (curr_idx, is_done)."""
     stage_count = int(args.get("stage_count", 1))
@@ -351,10 +771,15 @@ def _handle_edit_stages(output, curr_idx, stage_names, config):
 
 def _extract_usage(response: AIMessage, tool_calls: int = 0) -> AgentStats:
     meta = getattr(response, "usage_metadata", {}) or {}
+    details = meta.get("input_token_details", {}) or {}
     return {
         "input_tokens": meta.get("input_tokens", 0),
         "output_tokens": meta.get("output_tokens", 0),
+        "cache_read_tokens": details.get("cache_read", 0) or 0,
+        "cache_creation_tokens": details.get("cache_creation", 0) or 0,
         "tool_call_counts": tool_calls or len(response.tool_calls),
         "failures": 0,
         "failures_since_last_reflection": 0,
+        "compacted_tokens": 0,
+        "proceed_calls_saved": 0,
     }
@@ -1,14 +1,25 @@
+import json
 import os
+from collections import OrderedDict
+from typing import Any, Sequence
 
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 from langchain_litellm import ChatLiteLLM, ChatLiteLLMRouter
 from litellm import Router
 
+from hallw.utils.prompt_mgr import VOLATILE_SECTION_TAG
+
+CACHE_CONTROL = {"type": "ephemeral"}
+# Distinct model settings kept alive; older ones are rebuilt on next use
+LLM_CACHE_SIZE = 16
+
 
 class AgentLLMManager:
     """Factory for LLM"""
 
     _router_cache: dict[str, Router] = {}
+    _llm_cache: OrderedDict[str, BaseChatModel] = OrderedDict()
 
     @classmethod
     def get_gemini_router(cls, model_name: str) -> Router:
@@ -38,8 +49,82 @@ class AgentLLMManager:
 
     @classmethod
     def get_llm(cls, model_name: str, **kwargs) -> BaseChatModel:
+        # Identical settings share one instance so downstream caches can key on model identity
+        cache_key = json.dumps({"model_name": model_name, **kwargs}, sort_keys=True, default=str)
+        if cache_key not in cls._llm_cache:
+            cls._llm_cache[cache_key] = cls._create_llm(model_name, **kwargs)
+        cls._llm_cache.move_to_end(cache_key)
+        while len(cls._llm_cache) > LLM_CACHE_SIZE:
+            cls._llm_cache.popitem(last=False)
+        return cls._llm_cache[cache_key]
+
+    @classmethod
+    def get_node_llms(
+        cls, node_model_names: dict[str, str], default: BaseChatModel, **kwargs
+    ) -> dict[str, BaseChatModel]:
+        """Models for the control-plane nodes; nodes without a model name fall back to *default*."""
+        return {node: cls.get_llm(name, **kwargs) if name else default for node, name in node_model_names.items()}
+
+    @classmethod
+    def _create_llm(cls, model_name: str, **kwargs) -> BaseChatModel:
         if "gemini" in model_name.lower():
             router = cls.get_gemini_router(model_name)
             return ChatLiteLLMRouter(router=router, model_name="gemini-pool", **kwargs)
 
         return ChatLiteLLM(model=model_name, **kwargs)
+
+    @classmethod
+    def get_cache_provider(cls, model: BaseChatModel) -> str | None:
+        """Returns the provider family that needs explicit prompt-cache markers, if any."""
+        name = str(getattr(model, "model", None) or getattr(model, "model_name", None) or "").lower()
+        if "claude" in name or "anthropic" in name:
+            return "anthropic"
+        # OpenAI and Gemini cache stable prefixes implicitly
+        return None
+
+    @classmethod
+    def add_cache_markers(cls, messages: list[BaseMessage], provider: str | None) -> list[BaseMessage]:
+        """
+        Marks the stable system prefix and the end of the history as cache breakpoints.
+        Returns copies for the marked messages; the originals in graph state are left untouched.
+        """
+        if provider != "anthropic" or not messages:
+            return messages
+
+        marked = list(messages)
+        first = marked[0]
+        if isinstance(first, SystemMessage) and isinstance(first.content, str):
+            stable, tag, volatile = first.content.partition(VOLATILE_SECTION_TAG)
+            blocks: list[Any] = [{"type": "text", "text": stable, "cache_control": CACHE_CONTROL}]
+            if tag:
+                blocks.append({"type": "text", "text": tag + volatile})
+            marked[0] = first.model_copy(update={"content": blocks})
+
+        for idx in range(len(marked) - 1, 0, -1):
+            if marked[idx].content:
+                marked[idx] = marked[idx].model_copy(update={"content": _mark_last_block(marked[idx].content)})
+                break
+
+        return marked
+
+    @classmethod
+    def trailing_messages(cls, messages: Sequence[BaseMessage], provider: str | None) -> list[BaseMessage]:
+        """
+        Per-call messages sent after the history breakpoint.
+        Anthropic lifts every system message into the top-level system block, ahead of both breakpoints,
+        so there they are sent as user turns instead.
+        """
+        if provider != "anthropic":
+            return list(messages)
+        return [HumanMessage(content=msg.content) if isinstance(msg, SystemMessage) else msg for msg in messages]
+
+
+def _mark_last_block(content: str | list) -> list:
+    if isinstance(content, str):
+        return [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    blocks = list(content)
+    last = blocks[-1]
+    if isinstance(last, str):
+        last = {"type": "text", "text": last}
+    blocks[-1] = {**last, "cache_control": CACHE_CONTROL}
+    return blocks
@@ -1,18 +1,23 @@
 import asyncio
-from typing import Self
+import time
+from typing import Any, Mapping, Self
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.runnables.config import RunnableConfig
 from langgraph.checkpoint.base import BaseCheckpointSaver
 
-from hallw.utils import config
+from hallw.tools import ToolResultCache
+from hallw.utils import config, logger
 
-from .agent_event_dispatcher import AgentEventDispatcher
-from .agent_graph import build_graph
+from .agent_event_dispatcher import SILENT_TAG, AgentEventDispatcher
+from .agent_graph import CONTROL_NODES, build_graph, cancel_eager_calls
 from .agent_llm_mgr import AgentLLMManager
 from .agent_renderer import AgentRenderer
 from .agent_state import AgentState
 
+# Tools that only manage the plan; calling them is not yet an action on the user's task
+PLANNING_TOOLS = {"build_stages", "end_current_stage", "edit_stages"}
+
 
 class AgentRunner:
     """
@@ -28,14 +33,20 @@ class AgentRunner:
         initial_state: AgentState,
         checkpointer: BaseCheckpointSaver,
         invocation_config: RunnableConfig,
+        node_llms: dict[str, BaseChatModel] | None = None,
     ):
         self.task_id = task_id
         self.task: asyncio.Task | None = None
         self.llm = llm
+        self.node_llms = node_llms
         self.dispatcher = dispatcher
         self.initial_state = initial_state
         self.checkpointer = checkpointer
         self.invocation_config = invocation_config
+        # Latency from task start to the first real tool call or answer text
+        self.first_action_ms: float | None = None
+        # Gaps between one graph node ending and the next starting; includes synchronous checkpoint writes
+        self.step_overhead_ms: list[float] = []
 
     @property
     def is_running(self) -> bool:
@@ -54,18 +65,39 @@ class AgentRunner:
 
     async def run(self) -> AgentState | None:
         """Internal async execution of the agent workflow. Returns the final agent state."""
-        workflow = build_graph(self.llm, self.checkpointer)
+        started = time.perf_counter()
+        workflow = build_graph(self.llm, self.checkpointer, self.node_llms)
         event = None
+        node_ended: float | None = None
 
         try:
             async for event in workflow.astream_events(
                 self.initial_state,
                 config=self.invocation_config,
                 version="v2",
+                durability=config.checkpoint_durability,
             ):
+                if self.first_action_ms is None and _is_first_action(event):
+                    self.first_action_ms = (time.perf_counter() - started) * 1000
+                    logger.info(f"Time to first action: {self.first_action_ms:.0f} ms")
+
+                boundary = _node_boundary(event)
+                if boundary == "end":
+                    node_ended = time.perf_counter()
+                elif boundary == "start" and node_ended is not None:
+                    self.step_overhead_ms.append((time.perf_counter() - node_ended) * 1000)
+                    node_ended = None
+
                 # Delegate event handling to the dispatcher
                 await self.dispatcher.dispatch(event)
 
+            if self.step_overhead_ms:
+                average = sum(self.step_overhead_ms) / len(self.step_overhead_ms)
+                logger.info(
+                    f"Step overhead ({config.checkpoint_durability} checkpoints): "
+                    f"{average:.1f} ms avg over {len(self.step_overhead_ms)} steps"
+                )
+
             # Get the final state after stream processing is complete
             final_state: AgentState = (await workflow.aget_state(self.invocation_config)).values
             return final_state
@@ -88,6 +120,9 @@ class AgentRunner:
                 return except_state
             except Exception:
                 return None
+        finally:
+            # A run stopped between model and tools must not leave eagerly started tools running
+            await cancel_eager_calls(str(self.invocation_config.get("configurable", {}).get("thread_id", "")))
 
     @classmethod
     def create(
@@ -96,22 +131,28 @@ class AgentRunner:
         thread_id: str,
         renderer: AgentRenderer,
         checkpointer: BaseCheckpointSaver,
+        tool_cache: ToolResultCache | None = None,
     ) -> Self:
         """Factory method to create and initialize a new AgentRunner instance."""
         # LLM Configuration
-        llm = AgentLLMManager.get_llm(
-            config.model_name,
-            temperature=config.model_temperature,
-            max_tokens=config.model_max_output_tokens,
-            streaming=True,
-            top_p=config.model_top_p,
-            top_k=config.model_top_k,
-            repetition_penalty=config.model_repetition_penalty,
-            stream_usage=True,
-            stream_options={"include_usage": True},
-            model_kwargs={
+        llm_kwargs = {
+            "temperature": config.model_temperature,
+            "max_tokens": config.model_max_output_tokens,
+            "streaming": True,
+            "top_p": config.model_top_p,
+            "top_k": config.model_top_k,
+            "repetition_penalty": config.model_repetition_penalty,
+            "stream_usage": True,
+            "stream_options": {"include_usage": True},
+            "model_kwargs": {
                 "reasoning_effort": config.model_reasoning_effort,
             },
+        }
+        llm = AgentLLMManager.get_llm(config.model_name, **llm_kwargs)
+        node_llms = AgentLLMManager.get_node_llms(
+            {node: getattr(config, f"model_{node}_name") for node in CONTROL_NODES},
+            default=llm,
+            **llm_kwargs,
         )
 
         invocation_config: RunnableConfig = {
@@ -119,14 +160,35 @@ class AgentRunner:
             "configurable": {
                 "thread_id": thread_id,
                 "renderer": renderer,
+                "tool_cache": tool_cache,
             },
         }
 
         return cls(
             task_id=thread_id,
             llm=llm,
+            node_llms=node_llms,
             dispatcher=AgentEventDispatcher(renderer),
             initial_state=state,
             checkpointer=checkpointer,
             invocation_config=invocation_config,
         )
+
+
+def _is_first_action(event: Mapping[str, Any]) -> bool:
+    if SILENT_TAG in event.get("tags", []):
+        return False
+    kind = event.get("event")
+    if kind == "on_tool_start":
+        return event.get("name") not in PLANNING_TOOLS
+    if kind == "on_chat_model_stream":
+        chunk = event.get("data", {}).get("chunk")
+        return bool(getattr(chunk, "content", None))
+    return False
+
+
+def _node_boundary(event: Mapping[str, Any]) -> str | None:
+    """Returns "start" or "end" when the event marks a graph node boundary, else None."""
+    if event.get("name") != event.get("metadata", {}).get("langgraph_node"):
+        return None
+    return {"on_chain_start": "start", "on_chain_end": "end"}.get(event.get("event", ""))
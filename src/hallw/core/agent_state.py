@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Annotated, TypedDict
+from typing import Annotated, NotRequired, TypedDict
 
 from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.graph.message import add_messages
@@ -22,9 +22,13 @@ def merge_stats(left: dict | None, right: dict | None) -> dict:
 class AgentStats(TypedDict):
     input_tokens: int
     output_tokens: int
+    cache_read_tokens: int
+    cache_creation_tokens: int
     tool_call_counts: int
     failures: int
     failures_since_last_reflection: int
+    compacted_tokens: int
+    proceed_calls_saved: int
 
 
 class AgentState(TypedDict):
@@ -37,3 +41,8 @@ class AgentState(TypedDict):
     stage_names: list[str]
     task_completed: bool
     steering_queue: list[HumanMessage]
+    # Running summary of compacted turns and the id of the first message it does not cover
+    context_summary: NotRequired[str]
+    compacted_until: NotRequired[str]
+    # Consecutive proceed_node calls that returned no tool call
+    proceed_attempts: NotRequired[int]
@@ -0,0 +1,139 @@
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from hallw.utils import logger
+
+# Pub/sub messages carry whole events, so allow long lines between workers and the hub
+HUB_LINE_LIMIT = 64 * 1024 * 1024
+HUB_RETRY_SECONDS = 1.0
+
+
+class PinnedEmitMixin(socketio.AsyncManager):
+    """
+    Sessions are pinned to the worker holding their connection, so emits addressed to a
+    locally connected sid are delivered directly instead of going through the message queue.
+    """
+
+    async def emit(self, event, data, namespace=None, room=None, skip_sid=None, callback=None, to=None, **kwargs):
+        room = to or room
+        if isinstance(room, str) and self.is_connected(room, namespace or "/"):
+            kwargs["ignore_queue"] = True
+        return await super().emit(
+            event, data, namespace=namespace, room=room, skip_sid=skip_sid, callback=callback, **kwargs
+        )
+
+
+class PinnedRedisManager(PinnedEmitMixin, socketio.AsyncRedisManager):
+    pass
+
+
+class HubManager(PinnedEmitMixin, AsyncPubSubManager):
+    """
+    Client manager that shares events between workers through the loopback hub from `run_hub`.
+    A stand-in for Redis on a single machine: messages are newline-delimited JSON over TCP.
+    """
+
+    name = "hallwhub"
+
+    def __init__(self, url: str, channel: str = "socketio", write_only: bool = False):
+        super().__init__(channel=channel, write_only=write_only)
+        self.host, self.port = hub_address(url)
+        self._writer: asyncio.StreamWriter | None = None
+
+    async def _publish(self, data):
+        line = self.json.dumps(data).encode("utf-8") + b"\n"
+        for attempt in range(2):
+            try:
+                if self._writer is None or self._writer.is_closing():
+                    _, self._writer = await asyncio.open_connection(self.host, self.port)
+                self._writer.write(line)
+                await self._writer.drain()
+                return
+            except OSError as e:
+                self._writer = None
+                if attempt:
+                    logger.error(f"Cannot publish to socket hub: {e}")
+
+    async def _listen(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=HUB_LINE_LIMIT)
+            except OSError as e:
+                logger.warning(f"Socket hub unavailable, retrying: {e}")
+                await asyncio.sleep(HUB_RETRY_SECONDS)
+                continue
+            try:
+                while line := await reader.readline():
+                    yield line
+            finally:
+                writer.close()
+            logger.warning("Socket hub connection closed, reconnecting")
+            await asyncio.sleep(HUB_RETRY_SECONDS)
+
+
+async def run_hub(host: str, port: int) -> None:
+    """Relays every line a worker sends to all other connected workers."""
+    writers: set[asyncio.StreamWriter] = set()
+
+    async def relay(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        writers.add(writer)
+        try:
+            while line := await reader.readline():
+                peers = [peer for peer in writers if peer is not writer]
+                for peer in peers:
+                    peer.write(line)
+                await asyncio.gather(*(peer.drain() for peer in peers), return_exceptions=True)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Socket hub client dropped: {e}")
+        finally:
+            writers.discard(writer)
+            writer.close()
+
+    server = await asyncio.start_server(relay, host, port, limit=HUB_LINE_LIMIT)
+    logger.info(f"Socket hub listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def start_hub(url: str) -> threading.Thread:
+    """Runs the hub in a daemon thread of the supervising process."""
+    host, port = hub_address(url)
+    thread = threading.Thread(
+        target=asyncio.run,
+        args=(run_hub(host, port),),
+        name="socket-hub",
+        daemon=True,
+    )
+    thread.start()
+    return thread
+
+
+def hub_address(url: str) -> tuple[str, int]:
+    """Host and port of a tcp://host:port hub URL."""
+    parsed = urlparse(url)
+    try:
+        port = parsed.port
+    except ValueError:
+        port = None
+    if port is None:
+        raise ValueError(f"Socket hub URL needs a port, e.g. tcp://127.0.0.1:8765: {url}")
+    return parsed.hostname or "127.0.0.1", port
+
+
+def create_client_manager(url: str) -> socketio.AsyncManager:
+    """
+    Client manager for `socket_manager_url`: in-process when empty, the built-in hub for
+    tcp://host:port, or Redis for redis:// URLs (requires the redis package).
+    """
+    scheme = urlparse(url).scheme if url else ""
+    if not scheme:
+        return socketio.AsyncManager()
+    if scheme == "tcp":
+        return HubManager(url)
+    if scheme in ("redis", "rediss"):
+        return PinnedRedisManager(url)
+    raise ValueError(f"Unsupported socket manager URL: {url}")
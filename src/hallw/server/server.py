@@ -1,14 +1,51 @@
+from urllib.parse import urlparse
+
 import socketio
 import uvicorn
 
+from hallw.server.client_manager import start_hub
+from hallw.server.session_mgr import session_mgr
 from hallw.server.socket_router import sio
+from hallw.tools.playwright.playwright_mgr import browser_pool
+from hallw.utils import config, history_mgr
+
+
+async def startup():
+    if config.server_workers <= 1:
+        # With several workers the supervisor runs maintenance, so the database is pruned by one process
+        history_mgr.start_maintenance()
+    session_mgr.start_eviction()
+
+
+async def shutdown():
+    """Stop running tasks first so write-behind checkpoints land before the database closes."""
+    await history_mgr.stop_maintenance()
+    await session_mgr.stop_eviction()
+    await session_mgr.shutdown_all(sio)
+    browser_pool.close_all()
+    await history_mgr.close_pool()
+
+
+def create_app() -> socketio.ASGIApp:
+    return socketio.ASGIApp(sio, on_startup=startup, on_shutdown=shutdown)
 
 
 # --- Main ---
 def main():
-    """Main entry point for the Uvicorn server."""
-    app = socketio.ASGIApp(sio)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    """
+    Main entry point for the Uvicorn server.
+    With several workers, every worker imports its own app; sessions live in the worker that
+    accepted the connection, and history is shared through the checkpoint database.
+    """
+    if urlparse(config.socket_manager_url).scheme == "tcp":
+        start_hub(config.socket_manager_url)
+    if config.server_workers > 1:
+        history_mgr.start_maintenance_thread()
+        uvicorn.run(
+            "hallw.server.server:create_app", factory=True, host="0.0.0.0", port=8000, workers=config.server_workers
+        )
+    else:
+        uvicorn.run(create_app(), host="0.0.0.0", port=8000)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,15 @@
 import asyncio
+import time
+from typing import Any
 
 import socketio
 from langchain_core.messages import BaseMessage, HumanMessage
 
 from hallw.core import AgentRunner, AgentState
 from hallw.server.socket_renderer import SocketRenderer
+from hallw.tools import ToolResultCache
 from hallw.tools.playwright.playwright_mgr import BrowserWorker
+from hallw.utils import config
 
 
 class Session:
@@ -24,29 +28,23 @@ class Session:
         self.session_id = session_id
         self.thread_id = thread_id if thread_id else session_id
         self.renderer = SocketRenderer(sio, sid, main_loop, session_id=session_id)
-        self.state: AgentState = {
-            "messages": [],
-            "stats": {
-                "input_tokens": 0,
-                "output_tokens": 0,
-                "tool_call_counts": 0,
-                "failures": 0,
-                "failures_since_last_reflection": 0,
-            },
-            "current_stage": 0,
-            "total_stages": 0,
-            "stage_names": [],
-            "task_completed": False,
-            "steering_queue": [],
-        }
+        self.state: AgentState = initial_state()
         self.active_runner: AgentRunner | None = None
 
         # asyncio.Task running run_wrapper on the main loop
         self.task: asyncio.Task | None = None
 
-        # Dedicated Playwright thread
+        # Browser handle; a pooled Playwright thread is leased on first browser use
         self.browser = BrowserWorker(session_id)
 
+        # Memoized results of idempotent tools, scoped to this thread
+        self.tool_cache = ToolResultCache(config.tool_cache_size)
+
+        # Idle sessions drop their state to the checkpointer and load it back on the next task
+        self.last_active = time.monotonic()
+        self.evicted = False
+        self.rehydrate_lock = asyncio.Lock()
+
     @property
     def messages(self) -> list[BaseMessage]:
         return self.state["messages"]
@@ -59,6 +57,10 @@ class Session:
     def output_tokens(self) -> int:
         return self.state["stats"].get("output_tokens", 0)
 
+    @property
+    def cache_read_tokens(self) -> int:
+        return self.state["stats"].get("cache_read_tokens", 0)
+
     @property
     def steering_queue(self) -> list[HumanMessage]:
         return self.state.setdefault("steering_queue", [])
@@ -66,8 +68,53 @@ class Session:
     def enqueue_steering(self, message: HumanMessage) -> None:
         self.steering_queue.append(message)
 
+    @property
+    def is_busy(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def touch(self) -> None:
+        self.last_active = time.monotonic()
+
+    def memory_size(self) -> int:
+        """Rough size in bytes of the message text and attachments held in memory."""
+        return sum(
+            _content_size(msg.content) + _content_size(getattr(msg, "tool_calls", None)) for msg in self.messages
+        )
+
     def close(self) -> None:
         """
         Clean up session resources.
         """
         self.browser.close()
+
+
+def initial_state() -> AgentState:
+    return {
+        "messages": [],
+        "stats": {
+            "input_tokens": 0,
+            "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_creation_tokens": 0,
+            "tool_call_counts": 0,
+            "failures": 0,
+            "failures_since_last_reflection": 0,
+            "compacted_tokens": 0,
+            "proceed_calls_saved": 0,
+        },
+        "current_stage": 0,
+        "total_stages": 0,
+        "stage_names": [],
+        "task_completed": False,
+        "steering_queue": [],
+    }
+
+
+def _content_size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_content_size(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_content_size(item) for item in value)
+    return 0
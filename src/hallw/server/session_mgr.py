@@ -1,17 +1,29 @@
 import asyncio
+import time
 import uuid
+from typing import cast
 
 import socketio
 
 from hallw.core import AgentState
-from hallw.utils import logger
+from hallw.utils import config, history_mgr, logger
 
-from .session import Session
+from .session import Session, initial_state
+from .wire_codec import JSON
 
 
 class SessionManager:
     def __init__(self):
         self.sessions: dict[str, dict[str, Session]] = {}
+        # Wire encoding negotiated by each connection
+        self.encodings: dict[str, str] = {}
+        self._sweep_task: asyncio.Task | None = None
+        self._budget_task: asyncio.Task | None = None
+
+    def set_encoding(self, sid: str, encoding: str) -> None:
+        self.encodings[sid] = encoding
+        for session in self.sessions.get(sid, {}).values():
+            session.renderer.encoding = encoding
 
     def resolve_session_id(self, data) -> str | None:
         if isinstance(data, dict):
@@ -51,8 +63,10 @@ class SessionManager:
             )
 
         session = client_sessions[resolved_session_id]
+        session.touch()
         session.renderer.sid = sid
         session.renderer.main_loop = main_loop
+        session.renderer.encoding = self.encodings.get(sid, JSON)
         return session, resolved_session_id
 
     async def shutdown_session(
@@ -81,8 +95,14 @@ class SessionManager:
         if session.input_tokens > 0 and session.output_tokens > 0:
             logger.info(f"[session={session_id}] Input tokens: {session.input_tokens}")
             logger.info(f"[session={session_id}] Output tokens: {session.output_tokens}")
+            logger.info(f"[session={session_id}] Cached input tokens: {session.cache_read_tokens}")
+            logger.info(
+                f"[session={session_id}] Tool cache hits/misses: {session.tool_cache.hits}/{session.tool_cache.misses}"
+            )
+            logger.debug(f"History db metrics: {history_mgr.get_db_metrics()}")
+            logger.debug(f"[session={session_id}] Socket outbox metrics: {session.renderer.outbox_metrics}")
 
-        # 2. Shut down the BrowserWorker (disconnects Playwright, joins thread).
+        # 2. Release the BrowserWorker (drops its pages, returns its host to the pool).
         loop = asyncio.get_running_loop()
         try:
             await loop.run_in_executor(None, session.close)
@@ -98,6 +118,12 @@ class SessionManager:
 
         return True
 
+    async def shutdown_all(self, sio: socketio.AsyncServer) -> None:
+        """Shut down every session, letting running tasks flush their pending checkpoints."""
+        for sid, client_sessions in list(self.sessions.items()):
+            for session_id in list(client_sessions):
+                await self.shutdown_session(sid, session_id, sio, emit_reset=False)
+
     async def restore_session_from_history(
         self,
         sid: str,
@@ -118,6 +144,101 @@ class SessionManager:
         session.state = state
         return session
 
+    # ── Eviction ─────────────────────────────────────────────────────────────
+
+    def resident_sessions(self) -> list[Session]:
+        return [s for client_sessions in self.sessions.values() for s in client_sessions.values() if not s.evicted]
+
+    def memory_size(self) -> int:
+        """Rough bytes of message state held by the sessions of this process."""
+        return sum(session.memory_size() for session in self.resident_sessions())
+
+    async def evict_session(self, session: Session) -> bool:
+        """
+        Drops an idle session's messages, tool cache and browser lease once its state is checkpointed.
+        The session stays registered; `rehydrate` loads its state back from the checkpointer.
+        """
+        if session.evicted or session.is_busy:
+            return False
+        observed = session.last_active
+        if session.messages and await history_mgr.get_message_count(session.thread_id) < len(session.messages):
+            return False  # Messages the checkpointer has not seen yet
+        if session.evicted or session.is_busy or session.last_active != observed:
+            return False
+
+        session.state = initial_state()
+        session.tool_cache.clear()
+        history_mgr.forget_thread(session.thread_id)
+        session.evicted = True
+        await asyncio.get_running_loop().run_in_executor(None, session.browser.close)
+        return True
+
+    async def rehydrate(self, session: Session) -> None:
+        """Restores an evicted session's state from the checkpointer."""
+        if not session.evicted:
+            return
+        async with session.rehydrate_lock:
+            if not session.evicted:
+                return
+            state = await history_mgr.load_state(session.thread_id)
+            session.state = cast(AgentState, state) if state is not None else initial_state()
+            session.evicted = False
+
+    async def sweep(self) -> int:
+        """
+        Evicts sessions idle longer than `session_idle_timeout`, then the least recently used ones
+        while the process is over `session_memory_budget_mb`. Returns the number of evicted sessions.
+        """
+        now = time.monotonic()
+        idle_timeout = config.session_idle_timeout
+        budget = config.session_memory_budget_mb * 1024 * 1024
+        sessions = self.resident_sessions()
+        sizes = {session.session_id: session.memory_size() for session in sessions}
+        total = sum(sizes.values())
+
+        evicted = 0
+        for session in sorted(sessions, key=lambda s: s.last_active):
+            idle = idle_timeout > 0 and now - session.last_active >= idle_timeout
+            if not idle and not (budget > 0 and total > budget):
+                break
+            if await self.evict_session(session):
+                evicted += 1
+                total -= sizes[session.session_id]
+        return evicted
+
+    def check_memory_budget(self) -> None:
+        """Starts a sweep right away when over the memory budget, instead of waiting for the next interval."""
+        budget = config.session_memory_budget_mb * 1024 * 1024
+        if budget <= 0 or (self._budget_task is not None and not self._budget_task.done()):
+            return
+        if self.memory_size() > budget:
+            self._budget_task = asyncio.get_running_loop().create_task(self._logged_sweep())
+
+    def start_eviction(self) -> None:
+        """Runs `sweep` periodically on the current loop, if enabled."""
+        if config.session_sweep_interval > 0 and (self._sweep_task is None or self._sweep_task.done()):
+            self._sweep_task = asyncio.get_running_loop().create_task(self._sweep_loop())
+
+    async def stop_eviction(self) -> None:
+        for task in (self._sweep_task, self._budget_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._sweep_task = self._budget_task = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(config.session_sweep_interval)
+            await self._logged_sweep()
+
+    async def _logged_sweep(self) -> None:
+        try:
+            evicted = await self.sweep()
+            if evicted:
+                logger.info(f"Evicted {evicted} idle sessions, {self.memory_size()} bytes of messages resident")
+        except Exception as e:
+            logger.error(f"Session eviction failed: {e}")
+
 
 # Singleton export
 session_mgr = SessionManager()
@@ -1,11 +1,20 @@
 import asyncio
 import json
+from collections import deque
 from typing import Any
 
 import socketio
 
 from hallw.core import AgentRenderer
 from hallw.utils import config, logger
+from hallw.utils.spill_store import preview_fields
+
+from .wire_codec import JSON, MSGPACK, WIRE_EVENT, encode_frame
+
+# Streamed events whose payload field can be concatenated with the previous frame of the same event
+MERGEABLE_EVENTS = {"llm_new_text": "text", "llm_new_reasoning": "reasoning"}
+# Dropped first when the outbox is full; the final answer does not depend on them
+DROPPABLE_EVENTS = {"llm_new_reasoning"}
 
 
 class SocketRenderer(AgentRenderer):
@@ -15,12 +24,30 @@ class SocketRenderer(AgentRenderer):
         super().__init__()
         self.sio, self.sid, self.main_loop = sio, sid, main_loop
         self.session_id = session_id
-        self._current_response = ""
+        # Negotiated per connection, see wire_codec.negotiate
+        self.encoding = JSON
+        self._response_parts: list[str] = []
         self._pending_confirmation: dict | None = None
+        # Streamed chunks are coalesced and sent at most once per flush interval
+        self._text_parts: list[str] = []
+        self._reasoning_parts: list[str] = []
+        self._buffered_chars = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        # Events are sent in order by a single sender draining a bounded outbox
+        self._outbox: deque[tuple[str, dict[str, Any]]] = deque()
+        self._sender: asyncio.Task | None = None
+        self.outbox_metrics = {"sent": 0, "merged": 0, "dropped": 0, "overflow": 0, "max_depth": 0}
+
+    @property
+    def outbox_depth(self) -> int:
+        return len(self._outbox)
 
     async def emit(self, event: str, data: Any = None):
         try:
-            await self.sio.emit(event, data, room=self.sid)
+            if self.encoding == MSGPACK:
+                await self.sio.emit(WIRE_EVENT, encode_frame(event, data), room=self.sid)
+            else:
+                await self.sio.emit(event, data, room=self.sid)
         except Exception as e:
             logger.error(f"Socket Error: {e}")
 
@@ -35,15 +62,56 @@ class SocketRenderer(AgentRenderer):
         return payload
 
     def _fire(self, event: str, data: Any = None):
-        coro = self.emit(event, self._with_session(data))
+        # Any other event must not overtake text that was streamed before it
+        self._flush_chunks()
+        self._send(event, data)
+
+    def _send(self, event: str, data: Any = None):
+        payload = self._with_session(data)
         try:
-            asyncio.get_running_loop().create_task(coro)
+            on_main_loop = asyncio.get_running_loop() is self.main_loop
         except RuntimeError:
-            # Fallback: no running loop (e.g. called during shutdown)
-            try:
-                asyncio.run_coroutine_threadsafe(coro, self.main_loop)
-            except RuntimeError:
-                logger.warning(f"No event loop available for socket event '{event}'")
+            on_main_loop = False
+        if on_main_loop:
+            self._enqueue(event, payload)
+            return
+        # Called from another thread or during shutdown: hand over to the main loop
+        try:
+            self.main_loop.call_soon_threadsafe(self._enqueue, event, payload)
+        except RuntimeError:
+            logger.warning(f"No event loop available for socket event '{event}'")
+
+    def _enqueue(self, event: str, payload: dict[str, Any]):
+        """Queue an event for the sender. Runs on the main loop."""
+        field = MERGEABLE_EVENTS.get(event)
+        if field and self._outbox and self._outbox[-1][0] == event:
+            # The client is behind; grow the pending frame instead of queueing another one
+            self._outbox[-1][1][field] += payload[field]
+            self.outbox_metrics["merged"] += 1
+            return
+
+        if len(self._outbox) >= config.socket_outbox_max_events:
+            victim = next((idx for idx, (name, _) in enumerate(self._outbox) if name in DROPPABLE_EVENTS), None)
+            if victim is not None:
+                del self._outbox[victim]
+                self.outbox_metrics["dropped"] += 1
+            elif event in DROPPABLE_EVENTS:
+                self.outbox_metrics["dropped"] += 1
+                return
+            else:
+                # Never lose state updates; the bound is exceeded until the client catches up
+                self.outbox_metrics["overflow"] += 1
+
+        self._outbox.append((event, payload))
+        self.outbox_metrics["max_depth"] = max(self.outbox_metrics["max_depth"], len(self._outbox))
+        if self._sender is None or self._sender.done():
+            self._sender = self.main_loop.create_task(self._drain())
+
+    async def _drain(self):
+        while self._outbox:
+            event, payload = self._outbox.popleft()
+            await self.emit(event, payload)
+            self.outbox_metrics["sent"] += 1
 
     def on_task_started(self):
         self._fire("task_started")
@@ -52,30 +120,65 @@ class SocketRenderer(AgentRenderer):
         self._fire("task_finished")
 
     def on_llm_start(self):
-        self._current_response = ""
+        self._response_parts = []
         self._fire("llm_started")
 
     def on_llm_chunk(self, text: str, reasoning: str):
         if reasoning:
-            self._fire("llm_new_reasoning", {"reasoning": reasoning})
+            self._reasoning_parts.append(reasoning)
         if text:
-            self._current_response += text
-            self._fire("llm_new_text", {"text": text})
+            self._response_parts.append(text)
+            self._text_parts.append(text)
+        self._buffered_chars += len(text) + len(reasoning)
+        if not self._buffered_chars:
+            return
+
+        interval = config.stream_flush_interval_ms / 1000
+        if interval <= 0 or self._buffered_chars >= config.stream_flush_max_chars:
+            self._flush_chunks()
+        elif self._flush_handle is None:
+            try:
+                self._flush_handle = asyncio.get_running_loop().call_later(interval, self._flush_chunks)
+            except RuntimeError:
+                self._flush_chunks()
 
     def on_llm_end(self):
-        if self._current_response:
+        response = "".join(self._response_parts)
+        self._response_parts = []
+        if response:
             max_len = config.logging_max_chars
-            self._current_response = self._current_response.replace("\n", " ").strip()
-            logger.info(f"AI: {self._current_response[:max_len]}...")
+            response = response.replace("\n", " ").strip()
+            logger.info(f"AI: {response[:max_len]}...")
         self._fire("llm_finished")
 
+    def _flush_chunks(self):
+        """Send buffered reasoning and text as one frame each."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._reasoning_parts:
+            reasoning, self._reasoning_parts = "".join(self._reasoning_parts), []
+            self._send("llm_new_reasoning", {"reasoning": reasoning})
+        if self._text_parts:
+            text, self._text_parts = "".join(self._text_parts), []
+            self._send("llm_new_text", {"text": text})
+        self._buffered_chars = 0
+
     def on_tool_start(self, run_id: str, name: str, args: Any):
         args_str = str(args)
         try:
             args_str = json.dumps(args, ensure_ascii=False)
         except Exception:
             pass
-        self._fire("tool_state_update", {"run_id": run_id, "tool_name": name, "status": "running", "args": args_str})
+        self._fire(
+            "tool_state_update",
+            {
+                "run_id": run_id,
+                "tool_name": name,
+                "status": "running",
+                **preview_fields("args", args_str, config.tool_state_preview_chars),
+            },
+        )
 
     def on_tool_end(self, run_id: str, name: str, output: Any, is_success: bool, log_msg: str):
         logger.info(log_msg)
@@ -89,7 +192,11 @@ class SocketRenderer(AgentRenderer):
 
         self._fire(
             "tool_state_update",
-            {"run_id": run_id, "status": "success" if is_success else "error", "result": result_str},
+            {
+                "run_id": run_id,
+                "status": "success" if is_success else "error",
+                **preview_fields("result", result_str, config.tool_state_preview_chars),
+            },
         )
 
     def on_tool_error(self, run_id: str, name: str, error: str):
@@ -173,13 +280,18 @@ class SocketRenderer(AgentRenderer):
                 else:
                     future.set_result(res_val)
 
-    async def on_request_cdp_page(self, timeout: int = 30, headless: bool = True, user_data_dir: str = None) -> str:
-        """Ask the frontend to open a new BrowserWindow for CDP, wait for success."""
+    async def on_request_cdp_page(
+        self, timeout: int = 30, headless: bool = True, user_data_dir: str = None, tab_id: str | None = None
+    ) -> str:
+        """Ask the frontend to open a new BrowserWindow for CDP (or an extra tab view), wait for success."""
         loop = asyncio.get_running_loop()
         future = loop.create_future()
         request_id = f"cdp_{id(future)}"
         self._pending_confirmation = {"request_id": request_id, "future": future, "loop": loop}
-        self._fire("request_cdp_page", {"request_id": request_id, "headless": headless, "userDataDir": user_data_dir})
+        self._fire(
+            "request_cdp_page",
+            {"request_id": request_id, "headless": headless, "userDataDir": user_data_dir, "tabId": tab_id},
+        )
         try:
             return await asyncio.wait_for(future, timeout)
         except asyncio.TimeoutError:
@@ -15,11 +15,20 @@ from hallw.utils import (
     parse_file,
     save_config_to_env,
 )
+from hallw.utils.spill_store import read_output
 
+from .client_manager import create_client_manager
 from .session import Session
 from .session_mgr import session_mgr
-
-sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
+from .wire_codec import negotiate
+
+sio = socketio.AsyncServer(
+    async_mode="asgi",
+    cors_allowed_origins="*",
+    client_manager=create_client_manager(config.socket_manager_url),
+    # Long-polling requests of one client could reach different workers; a websocket stays on one
+    transports=["websocket"] if config.server_workers > 1 else ["polling", "websocket"],
+)
 
 
 # ── Socket Events ────────────────────────────────────────────────────────────
@@ -42,6 +51,7 @@ async def start_task(sid, data):
         session_id=session_mgr.resolve_session_id(data),
         thread_id=data.get("thread_id"),
     )
+    await session_mgr.rehydrate(session)
 
     if session.active_runner and session.active_runner.is_running:
         await _enqueue_steering(session, session_id, sid, task_text, file_paths, data.get("message_id"))
@@ -59,6 +69,7 @@ async def start_task(sid, data):
     await sio.emit("user_message", echo, room=sid)
 
     session.task = asyncio.create_task(_run_agent(session, session_id, sid))
+    session_mgr.check_memory_budget()
 
 
 @sio.event
@@ -120,9 +131,16 @@ async def update_config(sid, data):
 
 
 @sio.event
-async def get_history(sid):
+async def get_history(sid, data=None):
+    params = data if isinstance(data, dict) else {}
     try:
-        await sio.emit("history_list", await history_mgr.get_all_threads(), room=sid)
+        threads = await history_mgr.get_all_threads(
+            limit=params.get("limit"),
+            offset=params.get("offset", 0),
+            sort=params.get("sort", "updated_at"),
+            order=params.get("order", "desc"),
+        )
+        await sio.emit("history_list", threads, room=sid)
     except Exception as e:
         logger.error(f"Fetch history failed: {e}")
         await sio.emit("error", {"message": str(e)}, room=sid)
@@ -221,6 +239,8 @@ async def edit_user_message(sid, data):
             room=sid,
         )
         return
+    session.touch()
+    await session_mgr.rehydrate(session)
 
     thread_id = data.get("thread_id") or session.thread_id
     message_id = data.get("message_id")
@@ -247,9 +267,13 @@ async def edit_user_message(sid, data):
         "stats": {
             "input_tokens": 0,
             "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_creation_tokens": 0,
             "tool_call_counts": 0,
             "failures": 0,
             "failures_since_last_reflection": 0,
+            "compacted_tokens": 0,
+            "proceed_calls_saved": 0,
         },
         "current_stage": 0,
         "total_stages": 0,
@@ -274,10 +298,50 @@ async def edit_user_message(sid, data):
     session.task = asyncio.create_task(_run_agent(session, session_id, sid))
 
 
+@sio.event
+async def get_tool_result(sid, data):
+    """Streams the full args or result of a tool card that was sent as a preview."""
+    if not isinstance(data, dict) or not isinstance(handle := data.get("handle"), str):
+        return
+    reply = {
+        "session_id": session_mgr.resolve_session_id(data),
+        "run_id": data.get("run_id"),
+        "field": "args" if data.get("field") == "args" else "result",
+    }
+    content = read_output(handle)
+    if content is None:
+        await sio.emit("tool_result_chunk", {**reply, "error": "Output no longer available", "done": True}, room=sid)
+        return
+
+    size = max(config.tool_result_chunk_chars, 1)
+    for offset in range(0, max(len(content), 1), size):
+        await sio.emit(
+            "tool_result_chunk",
+            {
+                **reply,
+                "offset": offset,
+                "chunk": content[offset : offset + size],
+                "total_chars": len(content),
+                "done": offset + size >= len(content),
+            },
+            room=sid,
+        )
+
+
+@sio.event
+async def set_wire_encoding(sid, data=None):
+    """Negotiates the encoding of server events for this connection; the ack carries the choice."""
+    offered = data.get("encodings") if isinstance(data, dict) else None
+    encoding = negotiate(offered)
+    session_mgr.set_encoding(sid, encoding)
+    return {"encoding": encoding}
+
+
 @sio.event
 async def disconnect(sid):
     for s_id in list(session_mgr.get_client_sessions(sid)):
         await session_mgr.shutdown_session(sid, s_id, sio, emit_reset=False)
+    session_mgr.encodings.pop(sid, None)
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
@@ -325,15 +389,15 @@ async def _enqueue_steering(
 async def _run_agent(s: Session, s_id: str, sid: str):
     """Core agent execution — runs as an asyncio.Task on the main loop."""
     ctx_token = set_session_browser(s.browser)
-    local_conn = None
     try:
-        local_conn, cp = await history_mgr.create_local_checkpointer()
+        cp = await history_mgr.get_checkpointer()
         runner_state = await _build_runner_state(s, cp)
         runner = AgentRunner.create(
             state=runner_state,
             thread_id=s.thread_id,
             renderer=s.renderer,
             checkpointer=cp,
+            tool_cache=s.tool_cache,
         )
         s.active_runner = runner
         runner.task = asyncio.current_task()
@@ -352,12 +416,9 @@ async def _run_agent(s: Session, s_id: str, sid: str):
         _emit_bg(sid, "fatal_error", {"session_id": s_id, "message": str(e)})
     finally:
         s.active_runner = None
+        s.touch()
         reset_session_browser(ctx_token)
-        if local_conn:
-            try:
-                await local_conn.close()
-            except Exception:
-                pass
+        session_mgr.check_memory_budget()
 
 
 async def _build_runner_state(s: Session, checkpointer) -> AgentState:
@@ -372,9 +433,13 @@ async def _build_runner_state(s: Session, checkpointer) -> AgentState:
         "stats": {
             "input_tokens": 0,
             "output_tokens": 0,
+            "cache_read_tokens": 0,
+            "cache_creation_tokens": 0,
             "tool_call_counts": 0,
             "failures": 0,
             "failures_since_last_reflection": 0,
+            "compacted_tokens": 0,
+            "proceed_calls_saved": 0,
         },
         "current_stage": 0,
         "total_stages": 0,
@@ -0,0 +1,47 @@
+import zlib
+from typing import Any
+
+import ormsgpack
+
+from hallw.utils import config
+
+# Binary frames carry the original event name inside; they all travel under this event
+WIRE_EVENT = "wire"
+JSON = "json"
+MSGPACK = "msgpack"
+
+# First byte of a binary frame
+FLAG_RAW = 0
+FLAG_DEFLATE = 1
+
+
+def negotiate(offered: Any) -> str:
+    """Picks the wire encoding for a connection from the encodings the client offers."""
+    if not config.socket_binary_encoding:
+        return JSON
+    if isinstance(offered, list) and MSGPACK in offered:
+        return MSGPACK
+    return JSON
+
+
+def encode_frame(event: str, data: Any) -> bytes:
+    """
+    Packs an event as a binary frame: one flag byte, then MessagePack of [event, data].
+    Bodies of at least `socket_compress_min_bytes` are deflated when that makes them smaller.
+    """
+    body = ormsgpack.packb([event, data], default=str)
+    min_size = config.socket_compress_min_bytes
+    if 0 < min_size <= len(body):
+        compressed = zlib.compress(body, 6)
+        if len(compressed) < len(body):
+            return bytes([FLAG_DEFLATE]) + compressed
+    return bytes([FLAG_RAW]) + body
+
+
+def decode_frame(frame: bytes) -> tuple[str, Any]:
+    """Inverse of `encode_frame`."""
+    body = frame[1:]
+    if frame[0] == FLAG_DEFLATE:
+        body = zlib.decompress(body)
+    event, data = ormsgpack.unpackb(body)
+    return event, data
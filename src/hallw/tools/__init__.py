@@ -8,10 +8,13 @@ from .excludes.build_stages import build_stages
 from .excludes.dummy_tool import dummy_for_missed_tool
 from .stages.edit_stages import edit_stages
 from .stages.end_stage import end_current_stage
+from .utils.tool_cache import ToolResultCache, file_validator, idempotent, is_idempotent, ttl_validator
 from .utils.tool_response import ToolResult, build_tool_response, parse_tool_response
 
 EXCLUDE_DIRS = ["excludes"]
 
+_tools_cache: dict[str, BaseTool] | None = None
+
 
 def _import_package_modules(package_name: str, tools_dict: dict[str, BaseTool]):
     """Recursively import all modules in a package so @tool decorators run."""
@@ -34,10 +37,14 @@ def _import_package_modules(package_name: str, tools_dict: dict[str, BaseTool]):
             continue
 
 
-def load_tools() -> dict[str, BaseTool]:
-    tools_dict: dict[str, BaseTool] = {}
-    _import_package_modules(__name__, tools_dict)
-    return tools_dict
+def load_tools(refresh: bool = False) -> dict[str, BaseTool]:
+    """Scan the tools package once per process; pass refresh=True to rescan."""
+    global _tools_cache
+    if _tools_cache is None or refresh:
+        tools_dict: dict[str, BaseTool] = {}
+        _import_package_modules(__name__, tools_dict)
+        _tools_cache = tools_dict
+    return dict(_tools_cache)
 
 
 __all__ = [
@@ -46,6 +53,11 @@ __all__ = [
     "parse_tool_response",
     "dummy_for_missed_tool",
     "ToolResult",
+    "ToolResultCache",
+    "idempotent",
+    "is_idempotent",
+    "file_validator",
+    "ttl_validator",
     "build_stages",
     "edit_stages",
     "end_current_stage",
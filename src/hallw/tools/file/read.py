@@ -4,13 +4,14 @@ from itertools import islice
 from docling.document_converter import DocumentConverter
 from langchain_core.tools import tool
 
-from hallw.tools import build_tool_response
+from hallw.tools import build_tool_response, file_validator, idempotent
 
 READ_LINES_LIMIT = 1000
 MAX_FILE_SIZE = 10 * 1024 * 1024
 SUPPORTED_EXTENSIONS = ["pdf", "xlsx", "xls", "doc", "docx", "pptx"]
 
 
+@idempotent(file_validator)
 @tool
 def read_file(file_path: str, start_line: int = 0, end_line: int = -1) -> str:
     """Read the content of a file.
@@ -1,26 +1,32 @@
 from langchain_core.tools import tool
+from playwright.async_api import Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from hallw.utils import config
 
 from ..utils.tool_response import build_tool_response
-from .playwright_mgr import get_page
+from .playwright_mgr import DEFAULT_TAB, get_page, run_in_browser
 
 
 @tool
-async def browser_click(element_id: str) -> str:
+async def browser_click(element_id: str, tab_id: str = DEFAULT_TAB) -> str:
     """Click an element by ID.
 
     Args:
         element_id (str): The ID of the element to click.
+        tab_id (str): The tab to operate on.
 
     Returns:
         The result of the click operation.
     """
-    page = await get_page()
+    page = await get_page(tab_id)
     if page is None:
         return build_tool_response(False, "Please launch browser first.")
 
+    return await run_in_browser(_click(page, element_id))
+
+
+async def _click(page: Page, element_id: str) -> str:
     # Support both native ID and injected data-hallw-id
     selector = f"[id='{element_id}'], [data-hallw-id='{element_id}']"
 
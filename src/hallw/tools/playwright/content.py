@@ -1,27 +1,37 @@
+import asyncio
+
 import trafilatura
 from langchain_core.tools import tool
+from playwright.async_api import Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 from hallw.utils import config
 
 from ..utils.tool_response import build_tool_response
 from .helpers import auto_consent, remove_overlays
-from .playwright_mgr import get_page
+from .playwright_mgr import DEFAULT_TAB, get_page, run_in_browser
 
 
 @tool
-async def browser_get_content() -> str:
+async def browser_get_content(tab_id: str = DEFAULT_TAB) -> str:
     """Get content from a page.
 
+    Args:
+        tab_id (str): The tab to read.
+
     Returns:
         Status message with the final page title, url and content in markdown format.
     """
     max_content_length = config.pw_content_max_length
 
-    page = await get_page()
+    page = await get_page(tab_id)
     if page is None:
         return build_tool_response(False, "Please launch browser first.")
 
+    return await run_in_browser(_get_content(page, max_content_length))
+
+
+async def _get_content(page: Page, max_content_length: int) -> str:
     try:
         await page.wait_for_load_state("domcontentloaded", timeout=5000)
 
@@ -40,7 +50,9 @@ async def browser_get_content() -> str:
         page_title = await page.title()
         url = page.url
 
-        extracted_text = trafilatura.extract(
+        # Off the browser loop, which is shared with other sessions
+        extracted_text = await asyncio.to_thread(
+            trafilatura.extract,
             html,
             output_format="markdown",
             include_links=True,
@@ -1,13 +1,14 @@
 from langchain_core.tools import tool
+from playwright.async_api import Page
 
 from hallw.utils import config
 
 from ..utils.tool_response import build_tool_response
-from .playwright_mgr import get_page
+from .playwright_mgr import DEFAULT_TAB, get_page, run_in_browser
 
 
 @tool
-async def browser_fill(element_id: str, text: str, submit_on_enter: bool = False) -> str:
+async def browser_fill(element_id: str, text: str, submit_on_enter: bool = False, tab_id: str = DEFAULT_TAB) -> str:
     """
     Fill a text input.
 
@@ -15,11 +16,16 @@ async def browser_fill(element_id: str, text: str, submit_on_enter: bool = False
         element_id (str): The ID of the element.
         text (str): The text to fill.
         submit_on_enter (bool): If True, press 'Enter' after filling. Useful for search bars.
+        tab_id (str): The tab to operate on.
     """
-    page = await get_page()
+    page = await get_page(tab_id)
     if page is None:
         return build_tool_response(False, "Please launch browser first.")
 
+    return await run_in_browser(_fill(page, element_id, text, submit_on_enter))
+
+
+async def _fill(page: Page, element_id: str, text: str, submit_on_enter: bool) -> str:
     # CSS Selector: "id='foo' OR data-hallw-id='foo'"
     selector = f"[id='{element_id}'], [data-hallw-id='{element_id}']"
 
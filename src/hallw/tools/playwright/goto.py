@@ -1,29 +1,49 @@
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
+from playwright.async_api import Page
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-from hallw.utils import config
+from hallw.utils import config as app_config
 
 from ..utils.tool_response import build_tool_response
 from .helpers import auto_consent, remove_overlays
-from .playwright_mgr import get_page
+from .init import open_tab
+from .playwright_mgr import DEFAULT_TAB, get_page, run_in_browser
 
 
 @tool
-async def browser_goto(url: str) -> str:
+async def browser_goto(url: str, config: RunnableConfig, tab_id: str = DEFAULT_TAB) -> str:
     """Navigate the page to a URL.
     Args:
         url (str): Target URL
+        tab_id (str): Tab to navigate. A new background tab is opened on first use of an id.
+        Navigate different tabs in the same response to load several pages in parallel.
 
     Returns:
         Status message with the final page title.
     """
-    page = await get_page()
-    if page is None:
+    if await get_page(DEFAULT_TAB) is None:
         return build_tool_response(False, "Please launch browser first.")
 
+    page = await get_page(tab_id)
+    if page is None:
+        try:
+            error = await open_tab(tab_id, True, config)
+        except Exception as e:
+            error = f"Failed to open tab '{tab_id}': {str(e)}"
+        if error:
+            return build_tool_response(False, error, {"tab_id": tab_id})
+        page = await get_page(tab_id)
+        if page is None:
+            return build_tool_response(False, f"Tab '{tab_id}' is not available.", {"tab_id": tab_id})
+
+    return await run_in_browser(_goto(page, url, tab_id))
+
+
+async def _goto(page: Page, url: str, tab_id: str) -> str:
     try:
         # 1. Basic Navigation
-        await page.goto(url, wait_until="domcontentloaded", timeout=config.pw_goto_timeout)
+        await page.goto(url, wait_until="domcontentloaded", timeout=app_config.pw_goto_timeout)
 
         # 2. Anti-Nuisance Measures
         # We run these concurrently or sequentially.
@@ -40,13 +60,15 @@ async def browser_goto(url: str) -> str:
 
         # 3. Return Success with Context
         final_title = await page.title()
-        return build_tool_response(True, f"Navigated to {url} successfully.", {"url": page.url, "title": final_title})
+        return build_tool_response(
+            True, f"Navigated to {url} successfully.", {"url": page.url, "title": final_title, "tab_id": tab_id}
+        )
 
     except PlaywrightTimeoutError:
         return build_tool_response(
             False,
             f"Timeout while navigating to {url}. Site might be slow or blocking bot traffic.",
-            {"url": url},
+            {"url": url, "tab_id": tab_id},
         )
     except Exception as e:
-        return build_tool_response(False, f"Error while navigating to {url}: {str(e)}", {"url": url})
+        return build_tool_response(False, f"Error while navigating to {url}: {str(e)}", {"url": url, "tab_id": tab_id})
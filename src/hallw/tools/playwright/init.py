@@ -4,7 +4,7 @@ from langchain_core.tools import tool
 from hallw.utils import config as app_config
 
 from ..utils.tool_response import build_tool_response
-from .playwright_mgr import browser_launch
+from .playwright_mgr import DEFAULT_TAB, browser_launch, get_page, get_session_browser
 
 
 @tool
@@ -19,17 +19,38 @@ async def browser_init(headless: bool = False, config: RunnableConfig = None) ->
         Status message.
     """
     try:
-        if config and "configurable" in config and "renderer" in config["configurable"]:
-            renderer = config["configurable"]["renderer"]
-            status = await renderer.on_request_cdp_page(
-                timeout=30, headless=headless, user_data_dir=app_config.chrome_user_data_dir
-            )
-            if status != "success":
-                return build_tool_response(False, f"Frontend failed to open CDP page: {status}.")
-        else:
-            return build_tool_response(False, "Renderer not found in config.")
-
-        await browser_launch()
+        error = await open_tab(DEFAULT_TAB, headless, config)
+        if error:
+            return build_tool_response(False, error)
         return build_tool_response(True, "Connected to Electron Chrome instance via CDP.")
     except Exception as e:
         return build_tool_response(False, f"Browser initialization failed: {str(e)}.")
+
+
+async def open_tab(tab_id: str, headless: bool, config: RunnableConfig | None) -> str | None:
+    """
+    Ask the frontend for the agent view backing *tab_id* and attach it.
+    Extra tabs are always headless; only the main tab is shown next to the chat.
+    Returns an error message, or None on success.
+    """
+    if not (config and "configurable" in config and "renderer" in config["configurable"]):
+        return "Renderer not found in config."
+    renderer = config["configurable"]["renderer"]
+
+    browser = get_session_browser()
+    if browser is None:
+        return "No browser worker in session context."
+
+    async with browser.tab_lock:
+        if tab_id != DEFAULT_TAB and await get_page(tab_id) is not None:
+            return None
+        status = await renderer.on_request_cdp_page(
+            timeout=30,
+            headless=headless if tab_id == DEFAULT_TAB else True,
+            user_data_dir=app_config.chrome_user_data_dir,
+            tab_id=None if tab_id == DEFAULT_TAB else tab_id,
+        )
+        if status != "success":
+            return f"Frontend failed to open CDP page: {status}."
+        await browser_launch(tab_id)
+    return None
@@ -1,4 +1,4 @@
-"""Playwright browser manager — per-session, thread-isolated via BrowserWorker."""
+"""Playwright browser manager — per-session browser state multiplexed over a bounded pool of loop threads."""
 
 import asyncio
 import socket
@@ -8,113 +8,278 @@ from contextvars import ContextVar, Token
 from typing import Any, Coroutine, TypeVar
 
 from langchain_core.tools import ToolException
-from playwright.async_api import BrowserContext, Page, Playwright, async_playwright
+from playwright.async_api import Browser, BrowserContext, Page, Playwright, async_playwright
 from playwright_stealth.stealth import Stealth
 
-from hallw.utils import config
+from hallw.utils import config, logger
 
 T = TypeVar("T")
 
+DEFAULT_TAB = "main"
+CDP_PORT = 9222
+
 
 # ──────────────────────────────────────────────────────────────────────────────
-# Internal Playwright state — lives exclusively on the BrowserWorker thread
+# BrowserHost — one pooled thread + event loop sharing a Playwright driver
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-class _PlaywrightState:
-    """Holds Playwright handles. Must only be accessed from its owning BrowserWorker thread."""
+class BrowserHost:
+    """
+    Thread + event loop that runs Playwright for every session leased to it.
+    Playwright handles are bound to the loop that created them, so a driver cannot be shared across
+    hosts: each host owns one driver and one CDP connection, shared by its sessions.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.leases = 0
+        self.idle_since = time.monotonic()
         self.pw: Playwright | None = None
-        self.main_app_page: Page | None = None
-        self.target_view: Page | None = None
+        self.browser: Browser | None = None
+        self._connect_lock = asyncio.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self._thread.start()
 
-    def reset(self) -> None:
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+        self._loop.close()
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> "asyncio.Future[T]":
+        """
+        Schedule *coro* on the host's event loop.
+        """
+        concurrent_future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return asyncio.wrap_future(concurrent_future)
+
+    def run_blocking(self, coro: Coroutine[Any, Any, T], timeout: float) -> T:
+        """Run *coro* on the host's loop and wait for it from a non-async thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result(timeout=timeout)
+
+    def call_later(self, delay: float, callback, *args) -> None:
+        self._loop.call_soon_threadsafe(self._loop.call_later, delay, callback, *args)
+
+    async def context(self, cdp_port: int, cdp_timeout: float) -> BrowserContext:
+        """
+        The shared browser context, connecting the driver over CDP on first use or after a disconnect.
+        The agent views are WebContentsViews created by the Electron frontend, which CDP exposes only in
+        the default context, so a context from `new_context()` would never contain them. Sessions are kept
+        apart by view id (each claims only pages tagged with its own), and cookies and storage by the
+        Electron session profile the frontend opens each view with.
+        """
+        async with self._connect_lock:
+            if self.browser is None or not self.browser.is_connected():
+                if not await asyncio.to_thread(_wait_for_port, "127.0.0.1", cdp_port, cdp_timeout):
+                    raise ToolException(f"Failed to connect via CDP on port {cdp_port}")
+                if self.pw is None:
+                    self.pw = await async_playwright().start()
+                self.browser = await self.pw.chromium.connect_over_cdp(f"http://127.0.0.1:{cdp_port}")
+                context = self.browser.contexts[0] if self.browser.contexts else await self.browser.new_context()
+                await _apply_stealth(context)
+            return self.browser.contexts[0]
+
+    async def stop_driver(self) -> None:
+        if self.pw:
+            try:
+                await self.pw.stop()
+            except Exception:
+                pass
         self.pw = None
-        self.main_app_page = None
-        self.target_view = None
+        self.browser = None
 
-    async def get_page(self) -> Page | None:
-        return self.target_view
+    def close(self, timeout: float = 5.0) -> None:
+        """Stops the driver and the loop. Blocks until the thread exits unless called from it."""
+        if not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._loop.create_task, self._shutdown())
+            except RuntimeError:
+                pass
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=timeout)
+
+    async def _shutdown(self) -> None:
+        await self.stop_driver()
+        self._loop.stop()
 
-    async def launch(self, cdp_port: int = 9222, cdp_timeout: float = 1000) -> None:
-        endpoint = f"http://127.0.0.1:{cdp_port}"
-        if not _wait_for_port("127.0.0.1", cdp_port, timeout=cdp_timeout):
-            raise ToolException(f"Failed to connect via CDP on port {cdp_port}")
 
-        self.pw = await async_playwright().start()
+class BrowserPool:
+    """
+    Bounded set of BrowserHosts. Sessions lease the least loaded host, starting a new one only
+    while the pool is below its size; hosts left without leases are stopped after an idle timeout.
+    """
+
+    def __init__(self, size: int | None = None, idle_timeout: float | None = None) -> None:
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self._hosts: list[BrowserHost] = []
+        self._lock = threading.Lock()
+        self._counter = 0
+        self.metrics = {"hosts_started": 0, "hosts_reclaimed": 0}
+
+    def acquire(self) -> BrowserHost:
+        size = max(self.size if self.size is not None else config.browser_pool_size, 1)
+        with self._lock:
+            host = min(self._hosts, key=lambda h: h.leases, default=None)
+            if host is None or (host.leases and len(self._hosts) < size):
+                self._counter += 1
+                host = BrowserHost(f"browser-{self._counter}")
+                self._hosts.append(host)
+                self.metrics["hosts_started"] += 1
+            host.leases += 1
+            return host
+
+    def release(self, host: BrowserHost) -> None:
+        idle_timeout = self.idle_timeout if self.idle_timeout is not None else config.browser_idle_timeout
+        with self._lock:
+            host.leases -= 1
+            if host.leases:
+                return
+            host.idle_since = time.monotonic()
+        if idle_timeout >= 0:
+            host.call_later(idle_timeout, self._reclaim, host, idle_timeout)
+
+    def _reclaim(self, host: BrowserHost, idle_timeout: float) -> None:
+        with self._lock:
+            if host.leases or time.monotonic() - host.idle_since < idle_timeout or host not in self._hosts:
+                return
+            self._hosts.remove(host)
+            self.metrics["hosts_reclaimed"] += 1
+        logger.debug(f"Reclaiming idle browser host {host.name}")
+        host.close()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self.metrics,
+                "hosts": len(self._hosts),
+                "leases": sum(host.leases for host in self._hosts),
+            }
+
+    def close_all(self) -> None:
+        with self._lock:
+            hosts, self._hosts = self._hosts, []
+        for host in hosts:
+            host.close()
+
+
+browser_pool = BrowserPool()
+
+
+# ──────────────────────────────────────────────────────────────────────────────
+# Per-session Playwright state — accessed only on its host's loop
+# ──────────────────────────────────────────────────────────────────────────────
+
+
+class _PlaywrightState:
+    """Holds a session's pages. Must only be accessed from its BrowserHost thread."""
+
+    def __init__(self) -> None:
+        self.main_app_page: Page | None = None
+        self.tabs: dict[str, Page] = {}
+
+    def reset(self) -> None:
+        self.main_app_page = None
+        self.tabs = {}
+
+    async def get_page(self, tab_id: str = DEFAULT_TAB) -> Page | None:
+        return self.tabs.get(tab_id)
+
+    async def launch(
+        self,
+        host: BrowserHost,
+        view_id: str,
+        tab_id: str = DEFAULT_TAB,
+        cdp_port: int = CDP_PORT,
+        cdp_timeout: float = 1000,
+    ) -> None:
         try:
-            browser = await self.pw.chromium.connect_over_cdp(endpoint)
-            context = browser.contexts[0] if browser.contexts else await browser.new_context()
-            await _apply_stealth(context)
+            context = await host.context(cdp_port, cdp_timeout)
 
+            claimed = set(self.tabs.values())
             for page in context.pages:
-                try:
-                    is_agent_view = await page.evaluate("() => window.__IS_AGENT_VIEW__ === true")
-                except Exception:
-                    is_agent_view = False
-
+                if page in claimed:
+                    continue
                 if page.url.startswith("file://") or "localhost:" in page.url:
                     self.main_app_page = page
-                elif is_agent_view:
-                    self.target_view = page
+                    continue
+                try:
+                    page_view_id = await page.evaluate(
+                        "() => window.__IS_AGENT_VIEW__ === true && window.__AGENT_VIEW_ID__"
+                    )
+                except Exception:
+                    page_view_id = None
+                if page_view_id == view_id:
+                    self.tabs[tab_id] = page
 
+        except ToolException:
+            raise
         except Exception as e:
             raise ToolException(f"Failed to connect via CDP: {e}")
 
+        if tab_id not in self.tabs:
+            raise ToolException(f"Agent view for tab '{tab_id}' not found via CDP")
+
     async def disconnect(self) -> None:
-        if self.pw:
-            try:
-                await self.pw.stop()
-            except Exception:
-                pass
         self.reset()
 
 
 # ──────────────────────────────────────────────────────────────────────────────
-# BrowserWorker — one per Session, runs Playwright on a dedicated thread
+# BrowserWorker — one per Session, leases a pooled host on first browser use
 # ──────────────────────────────────────────────────────────────────────────────
 
 
 class BrowserWorker:
     """
-    Dedicated thread + event loop for Playwright operations.
+    Session handle for Playwright operations.
+    Creating one is cheap: a BrowserHost is leased from the pool only when the session first launches a browser.
     """
 
-    def __init__(self, session_id: str) -> None:
+    def __init__(self, session_id: str, pool: BrowserPool | None = None) -> None:
         self.session_id = session_id
+        self._pool = pool or browser_pool
+        self._host: BrowserHost | None = None
         self._state = _PlaywrightState()
-        self._loop = asyncio.new_event_loop()
-        self._thread = threading.Thread(
-            target=self._run_loop,
-            name=f"browser-{session_id[:8]}",
-            daemon=True,
-        )
-        self._thread.start()
+        # Serializes frontend view requests, which resolve one at a time
+        self.tab_lock = asyncio.Lock()
 
-    def _run_loop(self) -> None:
-        asyncio.set_event_loop(self._loop)
-        self._loop.run_forever()
+    @property
+    def host(self) -> BrowserHost:
+        if self._host is None:
+            self._host = self._pool.acquire()
+        return self._host
 
     def run(self, coro: Coroutine[Any, Any, T]) -> "asyncio.Future[T]":
         """
-        Schedule *coro* on the browser thread's event loop.
+        Schedule *coro* on the session's browser host.
         """
-        concurrent_future = asyncio.run_coroutine_threadsafe(coro, self._loop)
-        return asyncio.wrap_future(concurrent_future)
+        return self.host.run(coro)
+
+    async def get_page(self, tab_id: str = DEFAULT_TAB) -> Page | None:
+        if self._host is None:
+            return None
+        return await self.run(self._state.get_page(tab_id))
 
-    async def get_page(self) -> Page | None:
-        return await self.run(self._state.get_page())
+    def view_id(self, tab_id: str = DEFAULT_TAB) -> str:
+        """The id the frontend assigns to the agent view backing *tab_id*."""
+        return self.session_id if tab_id == DEFAULT_TAB else f"{self.session_id}:{tab_id}"
 
-    async def launch(self) -> None:
+    async def launch(self, tab_id: str = DEFAULT_TAB) -> None:
         await self.run(
             self._state.launch(
-                cdp_port=9222,
+                self.host,
+                self.view_id(tab_id),
+                tab_id=tab_id,
+                cdp_port=CDP_PORT,
                 cdp_timeout=config.pw_cdp_timeout,
             )
         )
 
     async def disconnect(self) -> None:
+        if self._host is None:
+            return
         try:
             await asyncio.wait_for(self.run(self._state.disconnect()), timeout=5.0)
         except Exception:
@@ -122,17 +287,17 @@ class BrowserWorker:
 
     def close(self) -> None:
         """
-        Synchronously shut down the browser worker.
-        Disconnects Playwright, stops the event loop, and joins the thread.
+        Synchronously drop the session's pages and return its host to the pool.
         Called from session cleanup (may block briefly).
         """
+        host, self._host = self._host, None
+        if host is None:
+            return
         try:
-            future = asyncio.run_coroutine_threadsafe(self._state.disconnect(), self._loop)
-            future.result(timeout=5.0)
+            host.run_blocking(self._state.disconnect(), timeout=5.0)
         except Exception:
             pass
-        self._loop.call_soon_threadsafe(self._loop.stop)
-        self._thread.join(timeout=5.0)
+        self._pool.release(host)
 
 
 # ──────────────────────────────────────────────────────────────────────────────
@@ -162,20 +327,32 @@ def get_session_browser() -> BrowserWorker | None:
 # ──────────────────────────────────────────────────────────────────────────────
 
 
-async def get_page() -> Page | None:
-    """Get the active Playwright page for the current session."""
+async def get_page(tab_id: str = DEFAULT_TAB) -> Page | None:
+    """Get the Playwright page of a tab for the current session."""
     browser = get_session_browser()
     if browser is None:
         return None
-    return await browser.get_page()
+    return await browser.get_page(tab_id)
+
+
+async def run_in_browser(coro: Coroutine[Any, Any, T]) -> T:
+    """
+    Run *coro* on the current session's browser thread.
+    Pages are bound to that thread's event loop, so every page operation must go through here.
+    """
+    browser = get_session_browser()
+    if browser is None:
+        coro.close()
+        raise ToolException("No BrowserWorker in session context. Was set_session_browser called?")
+    return await browser.run(coro)
 
 
-async def browser_launch() -> None:
-    """Launch the browser for the current session."""
+async def browser_launch(tab_id: str = DEFAULT_TAB) -> None:
+    """Attach the frontend's agent view for *tab_id* in the current session."""
     browser = get_session_browser()
     if browser is None:
         raise ToolException("No BrowserWorker in session context. Was set_session_browser called?")
-    await browser.launch()
+    await browser.launch(tab_id)
 
 
 async def browser_disconnect() -> None:
@@ -1,8 +1,9 @@
 from langchain_core.tools import tool
+from playwright.async_api import Page
 
 from ..utils.tool_response import build_tool_response
 from .helpers import auto_consent, remove_overlays
-from .playwright_mgr import get_page
+from .playwright_mgr import DEFAULT_TAB, get_page, run_in_browser
 
 # JavaScript for robustly extracting page structure
 SCRIPT = """
@@ -116,17 +117,24 @@ SCRIPT = """
 
 
 @tool
-async def browser_get_structure() -> str:
+async def browser_get_structure(tab_id: str = DEFAULT_TAB) -> str:
     """Get interactive elements on the page.
 
+    Args:
+        tab_id (str): The tab to inspect.
+
     Returns:
         The url, title and a list of interactive elements of the page.
     """
 
-    page = await get_page()
+    page = await get_page(tab_id)
     if page is None:
         return build_tool_response(False, "Please launch browser first.")
 
+    return await run_in_browser(_get_structure(page))
+
+
+async def _get_structure(page: Page) -> str:
     # 1. Preprocess: Wait for load, remove overlays, handle consent
     try:
         await page.wait_for_load_state("load", timeout=3000)
@@ -3,6 +3,7 @@ from langchain_core.tools import tool
 
 from hallw.utils.config_mgr import config
 
+from ..utils.tool_cache import idempotent, ttl_validator
 from ..utils.tool_response import build_tool_response
 
 TAVILY_EXTRACT_ENDPOINT = "https://api.tavily.com/extract"
@@ -121,6 +122,7 @@ async def _shuyan_extract(url: str) -> str:
         return build_tool_response(False, f"Error reading page {url}: {str(e)}")
 
 
+@idempotent(ttl_validator(lambda: config.tool_cache_web_ttl))
 @tool
 async def extract_page(url: str) -> str:
     """
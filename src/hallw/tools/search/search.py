@@ -3,6 +3,7 @@ from langchain_core.tools import tool
 
 from hallw.utils.config_mgr import config
 
+from ..utils.tool_cache import idempotent, ttl_validator
 from ..utils.tool_response import build_tool_response
 
 TAVILY_SEARCH_ENDPOINT = "https://api.tavily.com/search"
@@ -128,6 +129,7 @@ async def _shuyan_search(query: str) -> str:
     )
 
 
+@idempotent(ttl_validator(lambda: config.tool_cache_web_ttl))
 @tool
 async def search(query: str) -> str:
     """
@@ -0,0 +1,42 @@
+from langchain_core.tools import tool
+
+from hallw.tools import build_tool_response
+from hallw.utils.spill_store import read_output
+
+MAX_SLICE_LENGTH = 10000
+
+
+@tool
+def read_tool_output(handle: str, offset: int = 0, length: int = 4000) -> str:
+    """Read a slice of an earlier tool output that was moved out of the conversation.
+    Older large tool results are replaced by a short preview with an `output_handle`.
+
+    Args:
+        handle (str): The `output_handle` from the stored tool result.
+        offset (int): The character offset to start reading from.
+        length (int): The number of characters to read. Max 10000.
+
+    Returns:
+        The requested slice and the offset to continue from.
+    """
+    content = read_output(handle)
+    if content is None:
+        return build_tool_response(False, f"No stored output found for handle: {handle}")
+
+    offset = max(offset, 0)
+    length = min(max(length, 1), MAX_SLICE_LENGTH)
+    total = len(content)
+    if offset >= total:
+        return build_tool_response(False, f"Offset {offset} is beyond the end of the output ({total} chars).")
+
+    end = min(offset + length, total)
+    return build_tool_response(
+        True,
+        f"Read chars {offset}-{end} of {total}.",
+        {
+            "handle": handle,
+            "content": content[offset:end],
+            "total_chars": total,
+            "next_offset": end if end < total else -1,
+        },
+    )
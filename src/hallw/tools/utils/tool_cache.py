@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel
+
+# Returns a value that changes whenever the cached result may be stale (e.g. file mtime/size),
+# or None when the call must not be cached at all
+Validator = Callable[[dict[str, Any]], Hashable]
+
+_idempotent_tools: dict[str, Validator | None] = {}
+
+
+def idempotent(validator: Validator | None = None) -> Callable[[BaseTool], BaseTool]:
+    """
+    Mark a tool as safe to memoize within a thread.
+    Apply on top of @tool. Results are reused while the validator returns the same value.
+    """
+
+    def decorator(tool: BaseTool) -> BaseTool:
+        _idempotent_tools[tool.name] = validator
+        return tool
+
+    return decorator
+
+
+def is_idempotent(tool_name: str | None) -> bool:
+    """Whether a tool was registered with @idempotent."""
+    return tool_name in _idempotent_tools
+
+
+def file_validator(args: dict[str, Any]) -> Hashable:
+    """Validator for file tools: the file's mtime and size. Files that cannot be stat'ed are not cached."""
+    try:
+        stat = os.stat(os.path.normpath(args.get("file_path", "")))
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def ttl_validator(get_ttl: Callable[[], float]) -> Validator:
+    """
+    Validator for network tools: results expire with the current `get_ttl()`-second time bucket.
+    A TTL of 0 or less disables caching for the tool.
+    """
+
+    def validator(args: dict[str, Any]) -> Hashable:
+        ttl = get_ttl()
+        return int(time.time() // ttl) if ttl > 0 else None
+
+    return validator
+
+
+class ToolResultCache:
+    """
+    LRU cache of successful tool results for one conversation thread.
+    Only tools registered with @idempotent are cached.
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def key(self, tool: BaseTool, args: dict[str, Any]) -> str | None:
+        """Cache key for a call, or None when the call must not be cached."""
+        if self.max_entries <= 0 or tool.name not in _idempotent_tools:
+            return None
+
+        schema = tool.tool_call_schema
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            try:
+                # Fill in defaults so `f(x)` and `f(x, default)` share an entry
+                args = schema.model_validate(args).model_dump()
+            except Exception:
+                pass
+
+        validator = _idempotent_tools[tool.name]
+        version = None
+        if validator is not None:
+            version = validator(args)
+            if version is None:
+                return None
+        return json.dumps([tool.name, args, version], sort_keys=True, ensure_ascii=False, default=str)
+
+    def get(self, key: str) -> str | None:
+        output = self._entries.get(key)
+        if output is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return output
+
+    def put(self, key: str, output: str) -> None:
+        self._entries[key] = output
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from langchain_core.messages import BaseMessage
+
+from hallw.utils.config_mgr import config
+
+# Stands in for a data URL inside message content: blob:<mime>;sha256,<digest>
+BLOB_URL_PATTERN = re.compile(r"blob:(?P<mime>[\w.+-]+/[\w.+-]+);sha256,(?P<digest>[0-9a-f]{64})")
+# Recently inlined data URLs are reused across the calls of a turn; bounded by size, not count
+RESOLVED_CACHE_BYTES = 32 * 1024 * 1024
+# Larger attachments are re-read on every call instead of evicting everything else
+RESOLVED_ENTRY_MAX_BYTES = 8 * 1024 * 1024
+
+_resolved: OrderedDict[tuple[str, str], str] = OrderedDict()
+_resolved_bytes = 0
+_resolved_lock = threading.Lock()
+
+
+def put_blob(data: bytes, mime: str) -> str:
+    """
+    Stores attachment bytes once and returns a blob URL referencing them.
+    Blobs are addressed by content hash, so the same attachment is written only once.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    path = _blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    return f"blob:{mime};sha256,{digest}"
+
+
+def resolve_blob_url(url: str) -> str:
+    """Returns the data URL for a blob URL. Other URLs are returned unchanged."""
+    match = BLOB_URL_PATTERN.fullmatch(url)
+    if not match:
+        return url
+    return _data_url(match["mime"], match["digest"])
+
+
+def resolve_message_blobs(messages: list[BaseMessage]) -> list[BaseMessage]:
+    """
+    Inlines blob references as data URLs for the provider payload.
+    Messages without references are passed through; the others are copied, never mutated.
+    """
+    resolved = []
+    for msg in messages:
+        if isinstance(msg.content, list) and any(_blob_ref(block) for block in msg.content):
+            content = [_resolve_block(block) for block in msg.content]
+            msg = msg.model_copy(update={"content": content})
+        resolved.append(msg)
+    return resolved
+
+
+def _resolve_block(block: Any) -> Any:
+    url = _blob_ref(block)
+    if not url:
+        return block
+    try:
+        return {**block, "image_url": {**block["image_url"], "url": resolve_blob_url(url)}}
+    except OSError:
+        return {"type": "text", "text": "(attachment no longer available)"}
+
+
+def _blob_ref(block: Any) -> str | None:
+    if not isinstance(block, dict) or block.get("type") != "image_url":
+        return None
+    image_url = block.get("image_url")
+    url = image_url.get("url", "") if isinstance(image_url, dict) else ""
+    return url if url.startswith("blob:") else None
+
+
+def _data_url(mime: str, digest: str) -> str:
+    global _resolved_bytes
+    key = (mime, digest)
+    with _resolved_lock:
+        url = _resolved.get(key)
+        if url is not None:
+            _resolved.move_to_end(key)
+            return url
+
+    data = _blob_path(digest).read_bytes()
+    url = f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+    if len(url) > RESOLVED_ENTRY_MAX_BYTES:
+        return url
+    with _resolved_lock:
+        if key not in _resolved:
+            _resolved[key] = url
+            _resolved_bytes += len(url)
+        while _resolved_bytes > RESOLVED_CACHE_BYTES:
+            _, evicted = _resolved.popitem(last=False)
+            _resolved_bytes -= len(evicted)
+    return url
+
+
+def _blob_path(digest: str) -> Path:
+    return Path(config.attachment_blob_dir) / digest[:2] / digest
@@ -0,0 +1,360 @@
+import hashlib
+import json
+import weakref
+from collections import OrderedDict
+from typing import Any, AsyncIterator
+
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+MESSAGES_CHANNEL = "messages"
+MANIFEST_KEY = "__message_refs__"
+# Stay well below SQLite's host parameter limit
+SELECT_BATCH_SIZE = 500
+# Bound on the stored-ref memo when one saver is shared by many threads
+KNOWN_REFS_MAX = 20000
+DEFAULT_TITLE = "New Conversation"
+
+
+class DeltaSqliteSaver(AsyncSqliteSaver):
+    """
+    AsyncSqliteSaver that stores every message once instead of once per checkpoint.
+    Messages go append-only into `checkpoint_messages`, keyed by message id plus a content digest
+    (so in-place replacements get a new row); the checkpoint itself only keeps the list of refs.
+    Checkpoints written by the plain saver still load unchanged.
+    A `threads` summary row is kept up to date on every write so listing history needs no checkpoint loads.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._messages_ready = False
+        # (thread_id, message id) -> (weak ref to the message last written, its row ref); holds no message objects
+        self._known_refs: OrderedDict[tuple[str, str], tuple[weakref.ref, str]] = OrderedDict()
+
+    async def setup(self) -> None:
+        await super().setup()
+        if self._messages_ready:
+            return
+        async with self.lock:
+            await self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoint_messages (
+                    thread_id TEXT NOT NULL,
+                    ref TEXT NOT NULL,
+                    type TEXT,
+                    message BLOB,
+                    PRIMARY KEY (thread_id, ref)
+                );
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    created_at TEXT,
+                    updated_at TEXT,
+                    message_count INTEGER NOT NULL DEFAULT 0,
+                    input_tokens INTEGER NOT NULL DEFAULT 0,
+                    output_tokens INTEGER NOT NULL DEFAULT 0
+                );
+                CREATE INDEX IF NOT EXISTS threads_updated_at ON threads (updated_at);
+                CREATE INDEX IF NOT EXISTS threads_created_at ON threads (created_at);
+                """
+            )
+            await self.conn.commit()
+            self._messages_ready = True
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        messages = checkpoint["channel_values"].get(MESSAGES_CHANNEL)
+        if not isinstance(messages, list) or not messages:
+            return await super().aput(config, checkpoint, metadata, new_versions)
+
+        await self.setup()
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        refs, rows = self._message_refs(thread_id, messages)
+        manifest: Checkpoint = {
+            **checkpoint,
+            "channel_values": {**checkpoint["channel_values"], MESSAGES_CHANNEL: {MANIFEST_KEY: refs}},
+        }
+        type_, blob = self.serde.dumps_typed(manifest)
+        serialized_metadata = json.dumps(get_checkpoint_metadata(config, metadata), ensure_ascii=False).encode(
+            "utf-8", "ignore"
+        )
+        # Message rows and the manifest that references them commit together, so pruning never
+        # sees the rows without the checkpoint that keeps them alive
+        async with self.lock:
+            if rows:
+                await self.conn.executemany(
+                    "INSERT OR IGNORE INTO checkpoint_messages (thread_id, ref, type, message) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+            if not checkpoint_ns:
+                await self._index_thread(thread_id, checkpoint)
+            await self.conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "type, checkpoint, metadata) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    blob,
+                    serialized_metadata,
+                ),
+            )
+            await self.conn.commit()
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        checkpoint_tuple = await super().aget_tuple(config)
+        if checkpoint_tuple is None:
+            return None
+        return await self._hydrate(checkpoint_tuple)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # The parent holds the connection lock while iterating, so collect before hydrating
+        checkpoint_tuples = [t async for t in super().alist(config, filter=filter, before=before, limit=limit)]
+        for checkpoint_tuple in checkpoint_tuples:
+            yield await self._hydrate(checkpoint_tuple)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await super().adelete_thread(thread_id)
+        await self.setup()
+        async with self.lock:
+            await self.conn.execute("DELETE FROM checkpoint_messages WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.execute("DELETE FROM threads WHERE thread_id = ?", (str(thread_id),))
+            await self.conn.commit()
+        self.forget_thread(thread_id)
+
+    async def abackfill_threads(self) -> int:
+        """Index threads written before the `threads` table existed. Returns the number indexed."""
+        await self.setup()
+        async with self.lock:
+            async with self.conn.execute(
+                "SELECT DISTINCT thread_id FROM checkpoints WHERE checkpoint_ns = '' "
+                "AND thread_id NOT IN (SELECT thread_id FROM threads)"
+            ) as cursor:
+                thread_ids = [row[0] for row in await cursor.fetchall()]
+
+        for thread_id in thread_ids:
+            latest = await self.aget_tuple({"configurable": {"thread_id": thread_id}})
+            if latest is None:
+                continue
+            async with self.lock:
+                await self._index_thread(thread_id, latest.checkpoint)
+                await self.conn.commit()
+        return len(thread_ids)
+
+    async def aprune_thread(self, thread_id: str, keep_last: int) -> dict[str, int]:
+        """
+        Deletes old checkpoints of a thread with their writes and the messages only they referenced.
+        The newest `keep_last` checkpoints per namespace are kept, older ones only at user-message
+        boundaries (checkpoints written for new input), so time travel to past turns still works.
+        """
+        await self.setup()
+        thread_id = str(thread_id)
+        keep_last = max(keep_last, 1)
+        async with self.lock:
+            # Take the write lock up front, so no writer (in any process) commits between the orphan scan and delete
+            await self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                doomed, writes, orphans = await self._prune_locked(thread_id, keep_last)
+                await self.conn.commit()
+            except BaseException:
+                await self.conn.rollback()
+                raise
+
+        # Never hand out a ref whose row is gone
+        for key in [key for key, (_, ref) in self._known_refs.items() if key[0] == thread_id and ref in orphans]:
+            del self._known_refs[key]
+        return {"checkpoints": len(doomed), "writes": writes, "messages": len(orphans)}
+
+    async def _prune_locked(self, thread_id: str, keep_last: int) -> tuple[list[tuple], int, set[str]]:
+        """Deletes the pruned checkpoints, their writes and orphaned messages. Caller holds the lock and commits."""
+        async with self.conn.execute(
+            "SELECT checkpoint_ns, checkpoint_id, json_extract(CAST(metadata AS TEXT), '$.source') "
+            "FROM checkpoints WHERE thread_id = ? ORDER BY checkpoint_ns, checkpoint_id DESC",
+            (thread_id,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        seen: dict[str, int] = {}
+        doomed = []
+        for checkpoint_ns, checkpoint_id, source in rows:
+            seen[checkpoint_ns] = seen.get(checkpoint_ns, 0) + 1
+            if seen[checkpoint_ns] > keep_last and source != "input":
+                doomed.append((thread_id, checkpoint_ns, checkpoint_id))
+        if not doomed:
+            return [], 0, set()
+
+        await self.conn.executemany(
+            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", doomed
+        )
+        cursor = await self.conn.executemany(
+            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?", doomed
+        )
+        orphans = await self._orphan_refs(thread_id)
+        await self.conn.executemany(
+            "DELETE FROM checkpoint_messages WHERE thread_id = ? AND ref = ?",
+            [(thread_id, ref) for ref in orphans],
+        )
+        return doomed, cursor.rowcount, orphans
+
+    def forget_thread(self, thread_id: str) -> None:
+        """Drop the stored-ref memo of one thread, e.g. when its session is evicted."""
+        thread_id = str(thread_id)
+        for key in [key for key in self._known_refs if key[0] == thread_id]:
+            del self._known_refs[key]
+
+    def forget_all(self) -> None:
+        """Drop the stored-ref memo, e.g. after the message table was cleared externally."""
+        self._known_refs.clear()
+
+    async def _index_thread(self, thread_id: str, checkpoint: Checkpoint) -> None:
+        """Upsert the thread summary row. Caller holds the lock and commits."""
+        channel_values = checkpoint.get("channel_values", {})
+        messages = channel_values.get(MESSAGES_CHANNEL) or []
+        stats = channel_values.get("stats") or {}
+        await self.conn.execute(
+            """
+            INSERT INTO threads (thread_id, title, created_at, updated_at, message_count, input_tokens, output_tokens)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (thread_id) DO UPDATE SET
+                title = excluded.title,
+                updated_at = excluded.updated_at,
+                message_count = excluded.message_count,
+                input_tokens = excluded.input_tokens,
+                output_tokens = excluded.output_tokens
+            """,
+            (
+                thread_id,
+                thread_title(messages),
+                checkpoint.get("ts"),
+                checkpoint.get("ts"),
+                len(messages),
+                int(stats.get("input_tokens", 0) or 0),
+                int(stats.get("output_tokens", 0) or 0),
+            ),
+        )
+
+    async def _orphan_refs(self, thread_id: str) -> set[str]:
+        """Refs of stored messages no remaining checkpoint of the thread points to. Caller holds the lock."""
+        live: set[str] = set()
+        async with self.conn.execute(
+            "SELECT type, checkpoint FROM checkpoints WHERE thread_id = ?", (thread_id,)
+        ) as cursor:
+            async for type_, blob in cursor:
+                manifest = self.serde.loads_typed((type_, blob)).get("channel_values", {}).get(MESSAGES_CHANNEL)
+                if isinstance(manifest, dict):
+                    live.update(manifest.get(MANIFEST_KEY, []))
+        async with self.conn.execute("SELECT ref FROM checkpoint_messages WHERE thread_id = ?", (thread_id,)) as cursor:
+            return {row[0] async for row in cursor} - live
+
+    def _message_refs(self, thread_id: str, messages: list[Any]) -> tuple[list[str], list[tuple]]:
+        """
+        Returns the refs for *messages* and the rows for the ones not stored yet.
+        Messages are replaced rather than mutated by the graph, so a message object already written
+        keeps its ref and is not serialized again; only new or replaced messages are.
+        """
+        refs, rows = [], []
+        for msg in messages:
+            message_id = str(getattr(msg, "id", "") or "")
+            key = (thread_id, message_id)
+            known = self._known_refs.get(key) if message_id else None
+            if known is not None and known[0]() is msg:
+                self._known_refs.move_to_end(key)
+                refs.append(known[1])
+                continue
+
+            type_, blob = self.serde.dumps_typed(msg)
+            ref = f"{message_id}:{hashlib.sha256(blob).hexdigest()[:16]}"
+            refs.append(ref)
+            # An equal copy (e.g. a rehydrated message) is already stored under the same ref
+            if known is None or known[1] != ref:
+                rows.append((thread_id, ref, type_, blob))
+            if message_id:
+                self._remember(key, msg, ref)
+        return refs, rows
+
+    def _remember(self, key: tuple[str, str], msg: Any, ref: str) -> None:
+        self._known_refs[key] = (weakref.ref(msg), ref)
+        self._known_refs.move_to_end(key)
+        while len(self._known_refs) > KNOWN_REFS_MAX:
+            self._known_refs.popitem(last=False)
+
+    async def _hydrate(self, checkpoint_tuple: CheckpointTuple) -> CheckpointTuple:
+        """Replace a message manifest with the stored messages."""
+        channel_values = checkpoint_tuple.checkpoint.get("channel_values", {})
+        manifest = channel_values.get(MESSAGES_CHANNEL)
+        if not isinstance(manifest, dict) or MANIFEST_KEY not in manifest:
+            return checkpoint_tuple
+
+        refs: list[str] = manifest[MANIFEST_KEY]
+        thread_id = str(checkpoint_tuple.config["configurable"]["thread_id"])
+        await self.setup()
+        stored: dict[str, Any] = {}
+        unique_refs = list(dict.fromkeys(refs))
+        async with self.lock:
+            for start in range(0, len(unique_refs), SELECT_BATCH_SIZE):
+                batch = unique_refs[start : start + SELECT_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                async with self.conn.execute(
+                    "SELECT ref, type, message FROM checkpoint_messages "
+                    f"WHERE thread_id = ? AND ref IN ({placeholders})",
+                    (thread_id, *batch),
+                ) as cursor:
+                    async for ref, type_, blob in cursor:
+                        stored[ref] = self.serde.loads_typed((type_, blob))
+
+        missing = [ref for ref in unique_refs if ref not in stored]
+        if missing:
+            raise ValueError(f"Checkpoint references {len(missing)} missing messages in thread {thread_id}")
+        # The next write of this thread starts from these objects, so it need not serialize them again
+        for ref in unique_refs:
+            message_id = str(getattr(stored[ref], "id", "") or "")
+            if message_id:
+                self._remember((thread_id, message_id), stored[ref], ref)
+
+        checkpoint: Checkpoint = {
+            **checkpoint_tuple.checkpoint,
+            "channel_values": {**channel_values, MESSAGES_CHANNEL: [stored[ref] for ref in refs]},
+        }
+        return checkpoint_tuple._replace(checkpoint=checkpoint)
+
+
+def thread_title(messages: list[Any]) -> str:
+    """Title of a thread: the text of its first user message."""
+    for msg in messages:
+        if isinstance(msg, HumanMessage):
+            if isinstance(msg.content, list):
+                last = msg.content[-1] if msg.content else ""
+                content = last.get("text", "") if isinstance(last, dict) else str(last)
+                return content.strip() or "Attached Files"
+            return str(msg.content).strip()
+    return DEFAULT_TITLE
@@ -0,0 +1,166 @@
+import argparse
+import asyncio
+import os
+import zlib
+from typing import Any
+
+import aiosqlite
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from hallw.utils.config_mgr import config
+
+try:
+    from compression import zstd  # Python 3.14+
+except ImportError:  # pragma: no cover
+    zstd = None  # type: ignore[assignment]
+
+# Blob columns written through the serializer: (table, type column, blob column)
+BLOB_COLUMNS = (
+    ("checkpoints", "type", "checkpoint"),
+    ("writes", "type", "value"),
+    ("checkpoint_messages", "type", "message"),
+)
+MIGRATE_BATCH_SIZE = 200
+
+
+def _compress(data: bytes) -> tuple[str, bytes]:
+    if zstd is not None:
+        return "zstd", zstd.compress(data)
+    return "zlib", zlib.compress(data)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == "zstd":
+        if zstd is None:
+            raise ValueError("Checkpoint was compressed with zstd, which needs Python 3.14+")
+        return zstd.decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown checkpoint codec: {codec}")
+
+
+class CompressedSerializer(SerializerProtocol):
+    """
+    Serializer that compresses blobs of at least `min_size` bytes.
+    The codec is appended to the type (e.g. "msgpack+zstd"), so uncompressed rows keep loading as before.
+    """
+
+    def __init__(self, min_size: int = 1024, serde: SerializerProtocol | None = None) -> None:
+        self.min_size = min_size
+        self.serde = serde or JsonPlusSerializer()
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        return compress_typed(type_, data, self.min_size)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, blob = data
+        if not type_ or "+" not in type_:
+            return self.serde.loads_typed(data)
+        type_, codec = type_.rsplit("+", 1)
+        return self.serde.loads_typed((type_, _decompress(codec, blob)))
+
+
+def compress_typed(type_: str, data: bytes, min_size: int) -> tuple[str, bytes]:
+    """Compresses an already serialized blob when that makes it smaller."""
+    if min_size <= 0 or not type_ or data is None or len(data) < min_size or "+" in type_:
+        return type_, data
+    codec, compressed = _compress(data)
+    if len(compressed) >= len(data):
+        return type_, data
+    return f"{type_}+{codec}", compressed
+
+
+async def blob_stats(conn: aiosqlite.Connection) -> dict[str, dict[str, int]]:
+    """Row count, stored bytes and compressed rows per checkpoint table."""
+    stats = {}
+    for table, type_column, blob_column in BLOB_COLUMNS:
+        try:
+            async with conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(LENGTH({blob_column})), 0), "
+                f"COALESCE(SUM({type_column} LIKE '%+%'), 0) FROM {table}"
+            ) as cursor:
+                rows, size, compressed = await cursor.fetchone() or (0, 0, 0)
+        except aiosqlite.OperationalError:
+            continue
+        stats[table] = {"rows": rows, "bytes": size, "compressed_rows": compressed}
+    return stats
+
+
+async def migrate_database(path: str, min_size: int = 1024, vacuum: bool = True) -> dict[str, Any]:
+    """
+    Compresses existing uncompressed blobs in place and reports the sizes before and after.
+    Blobs are re-encoded without deserializing them, so the migration does not depend on stored classes.
+    """
+    async with aiosqlite.connect(path) as conn:
+        before = await blob_stats(conn)
+        file_before = os.path.getsize(path)
+        for table, type_column, blob_column in BLOB_COLUMNS:
+            if table not in before:
+                continue
+            async with conn.execute(
+                f"SELECT rowid FROM {table} WHERE {type_column} NOT LIKE '%+%' AND LENGTH({blob_column}) >= ?",
+                (max(min_size, 1),),
+            ) as cursor:
+                rowids = [row[0] for row in await cursor.fetchall()]
+
+            for start in range(0, len(rowids), MIGRATE_BATCH_SIZE):
+                batch = rowids[start : start + MIGRATE_BATCH_SIZE]
+                placeholders = ", ".join("?" for _ in batch)
+                async with conn.execute(
+                    f"SELECT rowid, {type_column}, {blob_column} FROM {table} WHERE rowid IN ({placeholders})",
+                    batch,
+                ) as cursor:
+                    rows = await cursor.fetchall()
+                updates = [(*compress_typed(type_, data, min_size), rowid) for rowid, type_, data in rows]
+                await conn.executemany(
+                    f"UPDATE {table} SET {type_column} = ?, {blob_column} = ? WHERE rowid = ?",
+                    updates,
+                )
+                await conn.commit()
+
+        if vacuum:
+            await conn.execute("VACUUM")
+        after = await blob_stats(conn)
+    return {
+        "before": before,
+        "after": after,
+        "file_bytes_before": file_before,
+        "file_bytes_after": os.path.getsize(path),
+    }
+
+
+def _print_stats(stats: dict[str, dict[str, int]]) -> None:
+    for table, values in stats.items():
+        print(f"  {table}: {values['rows']} rows, {values['bytes']} bytes, {values['compressed_rows']} compressed")
+
+
+async def _main(args: argparse.Namespace) -> None:
+    if args.stats:
+        async with aiosqlite.connect(args.db) as conn:
+            stats = await blob_stats(conn)
+        print(f"{args.db}: {os.path.getsize(args.db)} bytes on disk")
+        _print_stats(stats)
+        return
+
+    report = await migrate_database(args.db, min_size=args.min_size, vacuum=not args.no_vacuum)
+    print("Before:")
+    _print_stats(report["before"])
+    print("After:")
+    _print_stats(report["after"])
+    print(f"File size: {report['file_bytes_before']} -> {report['file_bytes_after']} bytes")
+
+
+def main():
+    """Compress an existing checkpoint database, or report its blob sizes with --stats."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--db", default="checkpoints.db", help="Path to the checkpoint database")
+    parser.add_argument("--stats", action="store_true", help="Only report sizes, do not migrate")
+    parser.add_argument("--min-size", type=int, default=config.checkpoint_compress_min_bytes)
+    parser.add_argument("--no-vacuum", action="store_true", help="Skip VACUUM after migrating")
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,16 @@ class Settings(BaseSettings):
     model_reasoning_effort: str = "low"  # low, medium, high
     model_reflection_threshold: int = 3
     model_max_recursion: int = 99
+    model_auto_advance: bool = True  # finish without a proceed call when the last stage ends with an answer
+    model_proceed_max_retries: int = 2  # proceed calls without a tool call before advancing one stage
+    model_planning_mode: str = "build"  # build, inline, heuristic
+    model_context_budget: int = 100000  # estimated prompt tokens before compaction, 0 to disable
+    model_context_keep_recent: int = 12  # recent messages kept verbatim when compacting
+    # Control-plane models per node, empty to use model_name
+    model_build_name: str = ""
+    model_proceed_name: str = ""
+    model_reflection_name: str = ""
+    model_compact_name: str = ""
 
     # =================================================
     # 2. Provider API Keys
@@ -75,6 +85,62 @@ class Settings(BaseSettings):
     pw_goto_timeout: int = 10000
     pw_click_timeout: int = 6000
     pw_cdp_timeout: int = 1000
+    # Threads shared by all sessions for Playwright, each with one driver; idle ones stop after the timeout (seconds)
+    browser_pool_size: int = 2
+    browser_idle_timeout: int = 300
+
+    # =================================================
+    # 8. Tool Execution
+    # =================================================
+    # Older tool results larger than this move out of the prompt into the spill store, 0 to disable
+    tool_output_spill_chars: int = 2000
+    tool_output_spill_dir: str = "tool_outputs"
+    # Timeouts (in seconds), 0 to disable
+    tool_timeout: int = 120  # per tool call
+    tool_timeouts: dict[str, int] = {}  # per-tool overrides, e.g. {"exec": 300}
+    tool_step_timeout: int = 300  # all tool calls of one model response
+    # Results of idempotent tools (read_file, search, ...) reused within a thread, 0 to disable
+    tool_cache_size: int = 128
+    # Seconds cached web results (search, extract_page) stay fresh, 0 to never reuse them
+    tool_cache_web_ttl: int = 300
+    # Start idempotent tool calls while the model response is still streaming
+    tool_eager_execution: bool = False
+
+    # =================================================
+    # 9. History
+    # =================================================
+    history_db_readers: int = 2  # pooled reader connections for history queries
+    # Newest checkpoints kept per thread; older ones only at user-message boundaries. 0 to keep all
+    history_keep_checkpoints: int = 20
+    history_maintenance_interval: int = 3600  # seconds between pruning/vacuum runs, 0 to disable
+    # When checkpoints are written: "sync" (before the next step), "async" (write-behind, in order), "exit" (task end)
+    checkpoint_durability: str = "async"
+    checkpoint_compress_min_bytes: int = 1024  # checkpoint blobs at least this large are compressed, 0 to disable
+    attachment_blob_dir: str = "attachments"  # content-addressed store for attached images and PDF pages
+
+    # =================================================
+    # 10. Server
+    # =================================================
+    # Streamed model output is sent to the UI in batches: every interval, or once this many chars are buffered
+    stream_flush_interval_ms: int = 50  # 0 to send every chunk immediately
+    stream_flush_max_chars: int = 2048
+    # Events queued per session for a slow client before reasoning chunks are dropped
+    socket_outbox_max_events: int = 256
+    # Send renderer events as MessagePack frames to clients that support it, deflating large ones
+    socket_binary_encoding: bool = False
+    socket_compress_min_bytes: int = 1024  # 0 to never compress
+    # Tool args/results longer than this are sent as previews; the full text is fetched when a tool card is opened
+    tool_state_preview_chars: int = 2000  # 0 to always send everything
+    tool_result_chunk_chars: int = 65536
+    # Worker processes; each client connection and its sessions stay on the worker that accepted it
+    server_workers: int = 1
+    # Event delivery between workers: "" in-process, "tcp://127.0.0.1:8765" built-in hub, or a redis:// URL
+    socket_manager_url: str = ""
+    # Idle sessions drop their messages to the checkpointer and reload them on the next task
+    session_idle_timeout: int = 1800  # seconds, 0 to disable
+    # Per-process budget for in-memory session messages; least recently used sessions are evicted beyond it
+    session_memory_budget_mb: int = 512  # 0 for no budget
+    session_sweep_interval: int = 60  # seconds between eviction sweeps, 0 to disable
 
     # =================================================
     # Pydantic config
@@ -101,8 +167,8 @@ def save_config_to_env(updates: dict):
         return
 
     def format_env_value(val):
-        """Format a value for .env file. Lists are JSON-encoded with double quotes."""
-        if isinstance(val, list):
+        """Format a value for .env file. Lists and dicts are JSON-encoded with double quotes."""
+        if isinstance(val, (list, dict)):
             return json.dumps(val)  # Returns ["item1", "item2"] format
         elif isinstance(val, bool):
             return str(val)
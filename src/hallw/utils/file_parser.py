@@ -1,10 +1,12 @@
-import base64
 import concurrent.futures
+import copy
 import datetime
 import io
 import os
 import subprocess
+from collections import OrderedDict
 
+from hallw.utils.blob_store import put_blob
 from hallw.utils.hallw_logger import logger
 
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -13,6 +15,8 @@ PDF_RENDER_SCALE = 2.0
 PDF_MAX_IMAGE_DIMENSION = 1568
 PDF_JPEG_QUALITY = 75
 PDF_MAX_WORKERS = 4
+# Parsed blocks are small once images live in the blob store, so repeated attachments are cheap to keep
+PARSE_CACHE_SIZE = 64
 
 IMAGE_EXTENSIONS = {
     ".png",
@@ -67,6 +71,8 @@ IMAGE_MIME_MAP = {
     ".tif": "image/tiff",
 }
 
+_parse_cache: OrderedDict[tuple[str, int, int], list[dict]] = OrderedDict()
+
 
 def parse_file(file_path: str) -> list[dict] | None:
     """
@@ -94,34 +100,45 @@ def parse_file(file_path: str) -> list[dict] | None:
     if file_size == 0:
         return [{"type": "text", "text": "(empty file)"}]
 
+    # Same path, size and mtime means the same content; skip parsing it again
+    stat = os.stat(file_path)
+    cache_key = (file_path, stat.st_mtime_ns, stat.st_size)
+    if cache_key in _parse_cache:
+        _parse_cache.move_to_end(cache_key)
+        return copy.deepcopy(_parse_cache[cache_key])
+
     ext = os.path.splitext(file_path)[1].lower()
 
     prefix_block = {"type": "text", "text": f"File: {file_path}"}
 
     # Route to appropriate handler
     if ext in IMAGE_EXTENSIONS:
-        return [prefix_block, *_parse_image(file_path, ext)]
+        blocks = [prefix_block, *_parse_image(file_path, ext)]
     elif ext in PDF_EXTENSIONS:
-        return [prefix_block, *_parse_pdf(file_path)]
+        blocks = [prefix_block, *_parse_pdf(file_path)]
     elif ext in DOCLING_EXTENSIONS:
-        return [prefix_block, *_parse_document(file_path)]
+        blocks = [prefix_block, *_parse_document(file_path)]
     elif ext in BINARY_EXTENSIONS:
-        return [prefix_block, *_parse_binary(file_path, ext)]
+        blocks = [prefix_block, *_parse_binary(file_path, ext)]
     else:
-        return [prefix_block, *_parse_text_or_fallback(file_path)]
+        blocks = [prefix_block, *_parse_text_or_fallback(file_path)]
+
+    _parse_cache[cache_key] = copy.deepcopy(blocks)
+    while len(_parse_cache) > PARSE_CACHE_SIZE:
+        _parse_cache.popitem(last=False)
+    return blocks
 
 
 def _parse_image(file_path: str, ext: str) -> list[dict]:
-    """Read image file and convert to base64."""
+    """Store the image in the blob store and reference it."""
     try:
         mime = IMAGE_MIME_MAP.get(ext, "image/png")
         with open(file_path, "rb") as f:
             data = f.read()
-        b64 = base64.b64encode(data).decode("utf-8")
         return [
             {
                 "type": "image_url",
-                "image_url": {"url": f"data:{mime};base64,{b64}"},
+                "image_url": {"url": put_blob(data, mime)},
             }
         ]
     except Exception as e:
@@ -177,8 +194,7 @@ def _render_pdf_page(file_path: str, page_index: int) -> list[dict]:
 
         buffer = io.BytesIO()
         bitmap.save(buffer, format="JPEG", quality=PDF_JPEG_QUALITY, optimize=True)
-        b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        return [{"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{b64}"}}]
+        return [{"type": "image_url", "image_url": {"url": put_blob(buffer.getvalue(), "image/jpeg")}}]
     except Exception as e:
         logger.error(f"Failed to render PDF page {page_index} of {file_path}: {e}")
         return [{"type": "text", "text": f"(failed to render page {page_index + 1}: {e})"}]
@@ -1,117 +1,245 @@
+import asyncio
 import json
 import logging
 import os
+import threading
 from typing import Any
 
-import aiosqlite
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 from hallw.tools import parse_tool_response
 
-logger = logging.getLogger("hallw")
+from .checkpoint_saver import DeltaSqliteSaver
+from .checkpoint_serde import CompressedSerializer
+from .config_mgr import config
+from .spill_store import delete_all_outputs, delete_thread_outputs, preview_fields, prune_outputs
+from .sqlite_pool import SqlitePool
 
+logger = logging.getLogger("hallw")
 
-async def create_local_checkpointer() -> tuple[aiosqlite.Connection, AsyncSqliteSaver]:
-    """Creates a new db connection and checkpointer bound to the current asyncio loop."""
-    local_conn = await aiosqlite.connect("checkpoints.db", check_same_thread=False)
-    local_cp = AsyncSqliteSaver(local_conn)
-    await local_cp.setup()
-    return local_conn, local_cp
+DB_PATH = "checkpoints.db"
+
+THREAD_SORT_COLUMNS = ("updated_at", "created_at", "title", "message_count")
+
+_pool: SqlitePool | None = None
+_maintenance_task: asyncio.Task | None = None
+
+
+async def get_pool() -> SqlitePool:
+    """The process-wide connection pool for the current event loop."""
+    global _pool
+    if _pool is None or _pool.loop is not asyncio.get_running_loop():
+        if _pool is not None:
+            # Connections of a pool from an earlier loop would otherwise leak
+            await _pool.close()
+        _pool = SqlitePool(
+            DB_PATH,
+            max_readers=config.history_db_readers,
+            serde=CompressedSerializer(config.checkpoint_compress_min_bytes),
+        )
+    return _pool
+
+
+async def get_checkpointer() -> DeltaSqliteSaver:
+    """The shared checkpointer on the pool's writer connection."""
+    return await (await get_pool()).writer()
+
+
+async def close_pool() -> None:
+    """Close all pooled connections, e.g. on server shutdown."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def get_db_metrics() -> dict[str, int]:
+    """Connection churn counters of the pool."""
+    return dict(_pool.metrics) if _pool is not None else {}
+
+
+async def get_all_threads(
+    limit: int | None = None, offset: int = 0, sort: str = "updated_at", order: str = "desc"
+) -> list[dict[str, Any]]:
+    """Fetches a page of conversation thread summaries from the thread index."""
+    column = sort if sort in THREAD_SORT_COLUMNS else "updated_at"
+    direction = "ASC" if str(order).lower() == "asc" else "DESC"
+    async with (await get_pool()).reader() as cp:
+        async with (
+            cp.lock,
+            cp.conn.execute(
+                "SELECT thread_id, title, created_at, updated_at, message_count, input_tokens, output_tokens "
+                f"FROM threads ORDER BY {column} {direction}, thread_id LIMIT ? OFFSET ?",
+                (-1 if limit is None else max(int(limit), 0), max(int(offset), 0)),
+            ) as cursor,
+        ):
+            rows = await cursor.fetchall()
 
+    return [
+        {
+            "id": thread_id,
+            "title": title,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "message_count": message_count,
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+        }
+        for thread_id, title, created_at, updated_at, message_count, input_tokens, output_tokens in rows
+    ]
 
-async def get_all_threads() -> list[dict[str, Any]]:
-    """Fetches a summary list of all conversation threads."""
-    local_conn, cp = await create_local_checkpointer()
 
-    try:
-        async with local_conn.execute("SELECT DISTINCT thread_id FROM checkpoints") as cursor:
-            rows = await cursor.fetchall()
-            thread_ids = [row[0] for row in rows]
-
-        threads = []
-        for tid in thread_ids:
-            # Get latest checkpoint for this thread to find some metadata
-            latest = await cp.aget_tuple({"configurable": {"thread_id": tid}})
-            if latest:
-                # Extract Title from first HumanMessage
-                title = "New Conversation"
-                created_at = None
-
-                # Check messages in channel values
-                if latest.checkpoint and "channel_values" in latest.checkpoint:
-                    messages = latest.checkpoint["channel_values"].get("messages", [])
-                    for msg in messages:
-                        if isinstance(msg, HumanMessage):
-                            content = ""
-                            if isinstance(msg.content, list):
-                                content = msg.content[-1].get("text", "")
-                                if not content:
-                                    content = "Attached Files"
-                            else:
-                                content = str(msg.content)
-                            title = content.strip()
-                            break
-
-                # Extract Timestamp
-                if latest.metadata:
-                    created_at = latest.metadata.get("created_at") or latest.metadata.get("ts")
-
-                # Fallback to checkpoint timestamp
-                if not created_at and latest.checkpoint:
-                    created_at = latest.checkpoint.get("ts")
-
-                threads.append({"id": tid, "title": title, "created_at": created_at, "metadata": latest.metadata})
-
-        # Sort by created_at desc
-        threads.sort(key=lambda x: str(x.get("created_at", "")), reverse=True)
-        return threads
-    finally:
-        await local_conn.close()
+async def load_state(thread_id: str) -> dict[str, Any] | None:
+    """Loads the latest checkpointed state of a thread."""
+    async with (await get_pool()).reader() as cp:
+        checkpoint_tuple = await cp.aget_tuple({"configurable": {"thread_id": thread_id}})
+    return checkpoint_tuple.checkpoint["channel_values"] if checkpoint_tuple else None
 
 
 async def load_thread(thread_id: str) -> dict[str, Any] | None:
     """Loads state for a specific thread."""
-    local_conn, cp = await create_local_checkpointer()
-    try:
-        checkpoint_tuple = await cp.aget_tuple({"configurable": {"thread_id": thread_id}})
-        if not checkpoint_tuple:
-            return None
+    state = await load_state(thread_id)
+    if state is None:
+        return None
 
-        state = checkpoint_tuple.checkpoint["channel_values"]
-        messages = state.get("messages", [])
+    messages = state.get("messages", [])
 
-        serialized_msgs, tool_states = serialize_messages(messages)
+    serialized_msgs, tool_states = serialize_messages(messages)
+
+    return {
+        "state": state,
+        "serialized_msgs": serialized_msgs,  # For frontend
+        "tool_states": tool_states,  # For frontend
+    }
 
-        return {
-            "state": state,
-            "serialized_msgs": serialized_msgs,  # For frontend
-            "tool_states": tool_states,  # For frontend
-        }
-    finally:
-        await local_conn.close()
+
+async def get_message_count(thread_id: str) -> int:
+    """Number of messages in the latest checkpoint of a thread, from the thread index."""
+    async with (await get_pool()).reader() as cp:
+        async with (
+            cp.lock,
+            cp.conn.execute("SELECT message_count FROM threads WHERE thread_id = ?", (thread_id,)) as cursor,
+        ):
+            row = await cursor.fetchone()
+    return row[0] if row else 0
 
 
 async def delete_thread(thread_id: str) -> None:
-    """Deletes a thread and all associated checkpoints."""
-    local_conn, _ = await create_local_checkpointer()
-    try:
-        await local_conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
-        await local_conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
-        await local_conn.commit()
-    finally:
-        await local_conn.close()
+    """Deletes a thread, all associated checkpoints and the tool outputs spilled from it."""
+    cp = await get_checkpointer()
+    await cp.adelete_thread(thread_id)
+    await asyncio.to_thread(delete_thread_outputs, thread_id)
+
+
+def forget_thread(thread_id: str) -> None:
+    """Drops the checkpointer's stored-ref memo for a thread whose session left memory."""
+    if _pool is not None and _pool.writer_saver is not None:
+        _pool.writer_saver.forget_thread(thread_id)
 
 
 async def delete_all_threads() -> None:
-    """Deletes all threads and all associated checkpoints."""
-    local_conn, _ = await create_local_checkpointer()
-    try:
-        await local_conn.execute("DELETE FROM checkpoints")
-        await local_conn.execute("DELETE FROM writes")
-        await local_conn.commit()
-    finally:
-        await local_conn.close()
+    """Deletes all threads, all associated checkpoints and spilled tool outputs, and returns the space to the OS."""
+    cp = await get_checkpointer()
+    async with cp.lock:
+        await cp.conn.execute("DELETE FROM checkpoints")
+        await cp.conn.execute("DELETE FROM writes")
+        await cp.conn.execute("DELETE FROM checkpoint_messages")
+        await cp.conn.execute("DELETE FROM threads")
+        await cp.conn.commit()
+    cp.forget_all()
+    await asyncio.to_thread(delete_all_outputs)
+    await _reclaim_space(cp)
+
+
+async def run_maintenance(keep_last: int | None = None) -> dict[str, int]:
+    """
+    Applies the retention policy to every thread, then reclaims the freed pages and the spilled
+    tool outputs no remaining thread refers to.
+    Returns the number of rows deleted per table, the spill files removed and the bytes given back to the OS.
+    """
+    keep_last = config.history_keep_checkpoints if keep_last is None else keep_last
+    cp = await get_checkpointer()
+    report = {"threads": 0, "checkpoints": 0, "writes": 0, "messages": 0, "spill_files": 0, "bytes_reclaimed": 0}
+
+    async with cp.lock, cp.conn.execute("SELECT DISTINCT thread_id FROM checkpoints") as cursor:
+        thread_ids = [row[0] for row in await cursor.fetchall()]
+    if keep_last > 0:
+        for thread_id in thread_ids:
+            # One thread at a time, so running agents only ever wait for a single thread's pruning
+            pruned = await cp.aprune_thread(thread_id, keep_last)
+            if any(pruned.values()):
+                report["threads"] += 1
+            for key, count in pruned.items():
+                report[key] += count
+
+    report["spill_files"] = await asyncio.to_thread(prune_outputs, thread_ids)
+    report["bytes_reclaimed"] = await _reclaim_space(cp)
+    return report
+
+
+def start_maintenance() -> None:
+    """Runs `run_maintenance` periodically on the current loop, if enabled."""
+    global _maintenance_task
+    if config.history_maintenance_interval > 0 and (_maintenance_task is None or _maintenance_task.done()):
+        _maintenance_task = asyncio.get_running_loop().create_task(_maintenance_loop())
+
+
+def start_maintenance_thread() -> threading.Thread | None:
+    """
+    Runs the maintenance loop on its own event loop in a daemon thread, if enabled.
+    Used by the supervisor of several server workers, so only one process prunes and vacuums.
+    """
+    if config.history_maintenance_interval <= 0:
+        return None
+    thread = threading.Thread(target=asyncio.run, args=(_maintenance_loop(),), name="history-maintenance", daemon=True)
+    thread.start()
+    return thread
+
+
+async def stop_maintenance() -> None:
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        await asyncio.gather(_maintenance_task, return_exceptions=True)
+        _maintenance_task = None
+
+
+async def _maintenance_loop() -> None:
+    while True:
+        await asyncio.sleep(config.history_maintenance_interval)
+        try:
+            report = await run_maintenance()
+            logger.info(f"History maintenance: {report}")
+        except Exception as e:
+            logger.error(f"History maintenance failed: {e}")
+
+
+async def _reclaim_space(cp: DeltaSqliteSaver) -> int:
+    """Returns free pages to the OS. Returns the number of bytes the database shrank by."""
+    async with cp.lock:
+        before = await _db_size(cp)
+        mode = await _pragma(cp, "auto_vacuum")
+        try:
+            if mode == 2:
+                await cp.conn.execute("PRAGMA incremental_vacuum")
+            else:
+                # Databases created before incremental auto-vacuum need one full VACUUM to switch
+                await cp.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                await cp.conn.execute("VACUUM")
+            await cp.conn.commit()
+        except Exception as e:
+            logger.warning(f"Vacuum skipped: {e}")
+        return max(before - await _db_size(cp), 0)
+
+
+async def _db_size(cp: DeltaSqliteSaver) -> int:
+    return await _pragma(cp, "page_count") * await _pragma(cp, "page_size")
+
+
+async def _pragma(cp: DeltaSqliteSaver, name: str) -> int:
+    async with cp.conn.execute(f"PRAGMA {name}") as cursor:
+        row = await cursor.fetchone()
+    return int(row[0]) if row else 0
 
 
 def serialize_messages(messages: list[Any]) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
@@ -219,15 +347,16 @@ def serialize_messages(messages: list[Any]) -> tuple[list[dict[str, Any]], list[
                 }
                 serialized_msgs.append(decision_message)
 
+            args_str = (
+                json.dumps(tool_args, ensure_ascii=False) if isinstance(tool_args, (dict, list)) else str(tool_args)
+            )
             restored_tool_states.append(
                 {
                     "run_id": msg.id,
                     "tool_name": tool_name,
                     "status": "success" if parsed["success"] else "error",
-                    "args": json.dumps(tool_args, ensure_ascii=False)
-                    if isinstance(tool_args, (dict, list))
-                    else str(tool_args),
-                    "result": str(msg.content),
+                    **preview_fields("args", args_str, config.tool_state_preview_chars),
+                    **preview_fields("result", str(msg.content), config.tool_state_preview_chars),
                 }
             )
 
@@ -97,15 +97,27 @@ def get_memory() -> str:
     return "\n".join(recent_memories)
 
 
+# Everything from this tag on changes between conversations and is kept out of the cacheable prefix
+VOLATILE_SECTION_TAG = "<session_context>"
+
+
 def get_system_prompt() -> str:
     """
     Generates the general system prompt for HALLW.
+    Sections are ordered so the prompt starts with a byte-stable prefix (identity and rules)
+    that providers can cache, followed by the volatile per-conversation context.
+    """
+    return f"{get_stable_prompt()}\n\n{get_volatile_prompt()}"
+
+
+def get_stable_prompt() -> str:
+    """
+    Returns the part of the system prompt that is identical across conversations.
     """
     return dedent(f"""
     <identity>
     You are HALLW, an AI automation agent.
     You are running in a {platform.system()} environment.
-    Conversation start time is {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}.
     Current working directory is {os.getcwd()}.
     </identity>
 
@@ -140,10 +152,6 @@ def get_system_prompt() -> str:
     {get_skills_desc()}
     </available_skills>
 
-    <user_profile>
-    {get_user_profile()}
-    </user_profile>
-
     <memory_management>
     - You are born with a permanent memory and 3 days of recent memory, they are your long-term and short-term memory.
     - Summarize conversations, write down learnings, and list pending items to daily memory **ACTIVELY**.
@@ -151,10 +159,6 @@ def get_system_prompt() -> str:
     - At the start of each conversation, **ALWAYS** present the pending items to the user if there are any.
     </memory_management>
 
-    <memories>
-    {get_memory()}
-    </memories>
-
     <formats>
     - Never return an empty response.
     - Don't invent tool names, only use the provided tools without any prefix.
@@ -162,3 +166,22 @@ def get_system_prompt() -> str:
     - Prefer markdown to save files and structure them gracefully for better readability.
     </formats>
     """).strip()
+
+
+def get_volatile_prompt() -> str:
+    """
+    Returns the per-conversation context: start time, user profile and memories.
+    """
+    return dedent(f"""
+    {VOLATILE_SECTION_TAG}
+    Conversation start time is {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}.
+
+    <user_profile>
+    {get_user_profile()}
+    </user_profile>
+
+    <memories>
+    {get_memory()}
+    </memories>
+    </session_context>
+    """).strip()
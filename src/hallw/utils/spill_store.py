@@ -0,0 +1,142 @@
+import hashlib
+import os
+import re
+import time
+from pathlib import Path
+from typing import Iterable
+
+from hallw.utils.config_mgr import config
+
+HANDLE_PATTERN = re.compile(r"[0-9a-f]{16}")
+# Per-thread lists of the handles a thread's messages refer to
+THREAD_INDEX_DIR = "threads"
+# Outputs no thread refers to (UI previews) are rebuilt from history on load, so they only need to outlive a run
+UNINDEXED_MAX_AGE = 24 * 3600
+
+
+def spill_output(content: str, thread_id: str | None = None) -> str:
+    """
+    Stores a tool output out of band and returns its handle.
+    Handles are content hashes, so identical outputs are stored only once.
+    With a *thread_id*, the output is kept until that thread is deleted or pruned.
+    """
+    handle = hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    if thread_id:
+        index = _index_path(thread_id)
+        index.parent.mkdir(parents=True, exist_ok=True)
+        with index.open("a", encoding="utf-8") as f:
+            f.write(handle + "\n")
+    path = _handle_path(handle)
+    if path.exists():
+        # Keeps a shared output from looking stale to prune_outputs
+        os.utime(path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+    return handle
+
+
+def preview_fields(field: str, content: str, max_chars: int) -> dict[str, str | int]:
+    """
+    Bounded form of a payload field for the UI: `{field: content}` when short enough, otherwise a
+    preview plus `{field}_handle` and `{field}_chars` so the full text can be fetched on demand.
+    """
+    if max_chars <= 0 or len(content) <= max_chars:
+        return {field: content}
+    return {
+        field: content[:max_chars],
+        f"{field}_handle": spill_output(content),
+        f"{field}_chars": len(content),
+    }
+
+
+def read_output(handle: str) -> str | None:
+    """Returns the stored output for a handle, or None if it is unknown."""
+    if not HANDLE_PATTERN.fullmatch(handle):
+        return None
+    path = _handle_path(handle)
+    if not path.exists():
+        return None
+    return path.read_text(encoding="utf-8")
+
+
+def delete_thread_outputs(thread_id: str) -> int:
+    """Removes the outputs only *thread_id* refers to. Returns the number of files removed."""
+    index = _index_path(thread_id)
+    handles = _read_index(index)
+    index.unlink(missing_ok=True)
+    return _remove_outputs(handles - _indexed_handles())
+
+
+def delete_all_outputs() -> int:
+    """Removes every stored output. Returns the number of files removed."""
+    for index in _index_dir().glob("*.idx"):
+        index.unlink(missing_ok=True)
+    return _remove_outputs(path.stem for path in _output_paths())
+
+
+def prune_outputs(live_thread_ids: Iterable[str], max_age: float = UNINDEXED_MAX_AGE) -> int:
+    """
+    Retention for the spill store: removes the outputs of threads that no longer exist, and the
+    outputs no thread refers to once they are older than *max_age* seconds.
+    Returns the number of files removed.
+    """
+    live = {_index_path(thread_id).name for thread_id in live_thread_ids}
+    orphaned: set[str] = set()
+    for index in _index_dir().glob("*.idx"):
+        if index.name not in live:
+            orphaned |= _read_index(index)
+            index.unlink(missing_ok=True)
+
+    kept = _indexed_handles()
+    cutoff = time.time() - max_age
+    stale = orphaned - kept
+    for path in _output_paths():
+        try:
+            if path.stem not in kept and path.stat().st_mtime < cutoff:
+                stale.add(path.stem)
+        except OSError:
+            continue
+    return _remove_outputs(stale)
+
+
+def _remove_outputs(handles: Iterable[str]) -> int:
+    removed = 0
+    for handle in handles:
+        try:
+            _handle_path(handle).unlink()
+            removed += 1
+        except OSError:
+            continue
+    return removed
+
+
+def _indexed_handles() -> set[str]:
+    handles: set[str] = set()
+    for index in _index_dir().glob("*.idx"):
+        handles |= _read_index(index)
+    return handles
+
+
+def _read_index(index: Path) -> set[str]:
+    try:
+        lines = index.read_text(encoding="utf-8").split()
+    except OSError:
+        return set()
+    return {line for line in lines if HANDLE_PATTERN.fullmatch(line)}
+
+
+def _output_paths() -> list[Path]:
+    return list(Path(config.tool_output_spill_dir).glob("??/*.txt"))
+
+
+def _index_dir() -> Path:
+    return Path(config.tool_output_spill_dir) / THREAD_INDEX_DIR
+
+
+def _index_path(thread_id: str) -> Path:
+    return _index_dir() / f"{hashlib.sha256(str(thread_id).encode('utf-8')).hexdigest()[:16]}.idx"
+
+
+def _handle_path(handle: str) -> Path:
+    return Path(config.tool_output_spill_dir) / handle[:2] / f"{handle}.txt"
@@ -0,0 +1,109 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import aiosqlite
+from langgraph.checkpoint.serde.base import SerializerProtocol
+
+from .checkpoint_saver import DeltaSqliteSaver
+
+# WAL lets readers run next to the single writer; the rest trades a little durability for latency
+PRAGMAS = (
+    # Only takes effect on new databases; older ones are converted by the first maintenance VACUUM
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+class SqlitePool:
+    """
+    Long-lived aiosqlite connections for one database, bound to one event loop.
+    A single writer connection backs the checkpointer shared by all runs; up to `max_readers`
+    reader connections serve history queries. Each connection carries its own saver so that
+    the schema is set up once per connection instead of once per call.
+    """
+
+    def __init__(self, path: str, max_readers: int = 2, serde: SerializerProtocol | None = None) -> None:
+        self.path = path
+        self.max_readers = max(max_readers, 1)
+        self.serde = serde
+        self.loop = asyncio.get_running_loop()
+        self._writer: DeltaSqliteSaver | None = None
+        self._writer_lock = asyncio.Lock()
+        self._readers: asyncio.Queue[DeltaSqliteSaver] = asyncio.Queue()
+        self._reader_count = 0
+        self._all: list[aiosqlite.Connection] = []
+        self.metrics = {
+            "connections_opened": 0,
+            "connections_closed": 0,
+            "writer_acquires": 0,
+            "reader_acquires": 0,
+            "reader_waits": 0,
+        }
+
+    async def writer(self) -> DeltaSqliteSaver:
+        """The shared checkpointer on the writer connection."""
+        self.metrics["writer_acquires"] += 1
+        if self._writer is None:
+            async with self._writer_lock:
+                if self._writer is None:
+                    self._writer = await self._open()
+                    # Databases from before the thread index get it filled in once
+                    await self._writer.abackfill_threads()
+        return self._writer
+
+    @property
+    def writer_saver(self) -> DeltaSqliteSaver | None:
+        """The writer's checkpointer if it is open, without opening it."""
+        return self._writer
+
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[DeltaSqliteSaver]:
+        """Borrow a checkpointer on a reader connection."""
+        self.metrics["reader_acquires"] += 1
+        if self._readers.empty() and self._reader_count < self.max_readers:
+            self._reader_count += 1
+            try:
+                # The writer sets up the schema first, so readers never race on DDL
+                await self.writer()
+                saver = await self._open()
+            except Exception:
+                self._reader_count -= 1
+                raise
+        else:
+            if self._readers.empty():
+                self.metrics["reader_waits"] += 1
+            saver = await self._readers.get()
+        try:
+            yield saver
+        finally:
+            # A saver borrowed before `close` has a closed connection; never hand it out again
+            if saver.conn in self._all:
+                self._readers.put_nowait(saver)
+
+    async def close(self) -> None:
+        conns, self._all = self._all, []
+        self._writer = None
+        self._readers = asyncio.Queue()
+        self._reader_count = 0
+        for conn in conns:
+            try:
+                await conn.close()
+                self.metrics["connections_closed"] += 1
+            except Exception:
+                pass
+
+    async def _open(self) -> DeltaSqliteSaver:
+        conn = await aiosqlite.connect(self.path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            await conn.execute(pragma)
+        self._all.append(conn)
+        self.metrics["connections_opened"] += 1
+        saver = DeltaSqliteSaver(conn, serde=self.serde)
+        await saver.setup()
+        return saver
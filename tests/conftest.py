@@ -1,8 +1,10 @@
-"""Pytest configuration and fixtures for tool tests."""
+"""Pytest configuration and shared fixtures."""
+
+from unittest.mock import MagicMock
 
 import pytest
 
-from hallw.utils import config
+from hallw.utils import config, history_mgr
 
 
 @pytest.fixture
@@ -31,3 +33,38 @@ def sample_json_file(workspace_dir):
     data = {"name": "test", "value": 123, "items": [1, 2, 3]}
     file_path.write_text(json.dumps(data))
     return file_path
+
+
+@pytest.fixture
+def history_db(tmp_path, monkeypatch):
+    """Point the history database and spill store to an isolated temp directory, with a fresh pool."""
+    db_path = tmp_path / "checkpoints.db"
+    monkeypatch.setattr(history_mgr, "DB_PATH", str(db_path))
+    monkeypatch.setattr(history_mgr, "_pool", None)
+    monkeypatch.setattr(config, "tool_output_spill_dir", str(tmp_path / "tool_outputs"))
+    return db_path
+
+
+@pytest.fixture
+def inline_browser(monkeypatch):
+    """Run a tool module's browser coroutines inline instead of on the session's BrowserWorker thread."""
+
+    async def run_inline(coro):
+        return await coro
+
+    def patch(module):
+        monkeypatch.setattr(module, "run_in_browser", run_inline)
+
+    return patch
+
+
+@pytest.fixture
+def chat_model():
+    """Factory for chat model stand-ins whose `bind_tools` always returns the same runnable."""
+
+    def make():
+        model = MagicMock()
+        model.bind_tools = MagicMock(return_value=MagicMock())
+        return model
+
+    return make
@@ -0,0 +1,63 @@
+"""Tests for context compaction helpers."""
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from hallw.core.agent_context import (
+    SUMMARY_PREFIX,
+    build_prompt_messages,
+    estimate_tokens,
+    find_compaction_boundary,
+)
+
+
+def _history():
+    return [
+        SystemMessage(content="system", id="s"),
+        HumanMessage(content="first request", id="h1"),
+        AIMessage(content="", id="a1", tool_calls=[{"name": "search", "args": {"query": "x"}, "id": "c1"}]),
+        ToolMessage(content="x" * 400, tool_call_id="c1", name="search", id="t1"),
+        AIMessage(content="", id="a2", tool_calls=[{"name": "search", "args": {"query": "y"}, "id": "c2"}]),
+        ToolMessage(content="y" * 400, tool_call_id="c2", name="search", id="t2"),
+        AIMessage(content="done", id="a3"),
+    ]
+
+
+def test_boundary_never_starts_tail_with_tool_message():
+    state = {"messages": _history()}
+
+    start, end = find_compaction_boundary(state, keep_recent=2)
+
+    assert start == 1
+    assert state["messages"][end].id == "a2"
+
+
+def test_boundary_moves_into_tail_over_budget():
+    state = {"messages": _history()}
+
+    assert state["messages"][find_compaction_boundary(state, keep_recent=4)[1]].id == "a1"
+    assert state["messages"][find_compaction_boundary(state, keep_recent=4, budget=150)[1]].id == "a2"
+
+
+def test_boundary_leaves_nothing_to_fold_when_last_tool_group_exceeds_budget():
+    state = {"messages": _history()[:6], "compacted_until": "a2"}
+
+    start, end = find_compaction_boundary(state, keep_recent=1, budget=10)
+
+    assert end <= start
+
+
+def test_prompt_view_replaces_compacted_turns():
+    state = {"messages": _history(), "context_summary": "searched x", "compacted_until": "a2"}
+
+    view = build_prompt_messages(state)
+
+    assert [m.id for m in view[:1]] == ["s"]
+    assert view[1].content.startswith(SUMMARY_PREFIX)
+    assert [m.id for m in view[2:]] == ["h1", "a2", "t2", "a3"]
+    assert estimate_tokens(view) < estimate_tokens(state["messages"])
+
+
+def test_prompt_view_without_summary_is_unchanged():
+    state = {"messages": _history(), "context_summary": "", "compacted_until": ""}
+
+    assert build_prompt_messages(state) == state["messages"]
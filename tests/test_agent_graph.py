@@ -0,0 +1,152 @@
+"""Tests for building, caching and routing the agent graph."""
+
+from collections import OrderedDict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from hallw.core.agent_graph import AgentGraphBuilder, _is_simple_request, build_graph
+from hallw.utils import config as app_config
+
+
+def test_build_graph_reuses_compiled_graph(monkeypatch, chat_model):
+    monkeypatch.setattr(AgentGraphBuilder, "_cache", OrderedDict())
+    model = chat_model()
+
+    first = build_graph(model, InMemorySaver())
+    bind_calls = model.bind_tools.call_count
+    second = build_graph(model, InMemorySaver())
+
+    assert model.bind_tools.call_count == bind_calls == 4
+    assert len(AgentGraphBuilder._cache) == 1
+    assert first.nodes.keys() == second.nodes.keys()
+
+
+def test_build_graph_swaps_checkpointer(monkeypatch, chat_model):
+    monkeypatch.setattr(AgentGraphBuilder, "_cache", OrderedDict())
+    model = chat_model()
+    cp_a, cp_b = InMemorySaver(), InMemorySaver()
+
+    assert build_graph(model, cp_a).checkpointer is cp_a
+    assert build_graph(model, cp_b).checkpointer is cp_b
+
+
+def test_build_graph_separates_models(monkeypatch, chat_model):
+    monkeypatch.setattr(AgentGraphBuilder, "_cache", OrderedDict())
+
+    build_graph(chat_model(), InMemorySaver())
+    build_graph(chat_model(), InMemorySaver())
+
+    assert len(AgentGraphBuilder._cache) == 2
+
+
+def test_build_graph_cache_is_bounded(monkeypatch, chat_model):
+    monkeypatch.setattr(AgentGraphBuilder, "_cache", OrderedDict())
+    monkeypatch.setattr("hallw.core.agent_graph.GRAPH_CACHE_SIZE", 2)
+    models = [chat_model() for _ in range(3)]
+
+    for model in models:
+        build_graph(model, InMemorySaver())
+    build_graph(models[1], InMemorySaver())
+
+    assert [builder.model for builder in AgentGraphBuilder._cache.values()] == [models[2], models[1]]
+
+
+def test_build_graph_uses_control_node_models(monkeypatch, chat_model):
+    monkeypatch.setattr(AgentGraphBuilder, "_cache", OrderedDict())
+    model, cheap = chat_model(), chat_model()
+
+    build_graph(model, InMemorySaver())
+    build_graph(model, InMemorySaver(), {"build": cheap, "proceed": cheap})
+    builder = next(b for b in AgentGraphBuilder._cache.values() if b.node_models["build"] is cheap)
+
+    assert len(AgentGraphBuilder._cache) == 2
+    assert cheap.bind_tools.call_count == 2
+    assert builder.build_model is cheap.bind_tools.return_value
+    assert builder.reflection_model is model
+
+
+def test_simple_request_heuristic():
+    assert _is_simple_request([HumanMessage(content="What is the capital of France?")])
+    assert not _is_simple_request([HumanMessage(content="Search the news, then write a summary to a file")])
+    assert not _is_simple_request([HumanMessage(content=[{"type": "text", "text": "describe"}])])
+
+
+def _distinct_model():
+    model = MagicMock()
+    model.bind_tools = MagicMock(side_effect=lambda *args, **kwargs: MagicMock())
+    return model
+
+
+async def _run_graph(builder, text):
+    state = {
+        "messages": [HumanMessage(content=text)],
+        "stats": {},
+        "current_stage": 0,
+        "total_stages": 0,
+        "stage_names": [],
+        "task_completed": False,
+        "steering_queue": [],
+    }
+    graph = builder.build()
+    return await graph.ainvoke(state, {"configurable": {"thread_id": "t"}})
+
+
+@pytest.mark.asyncio
+async def test_final_answer_on_last_stage_skips_proceed(monkeypatch):
+    monkeypatch.setattr(app_config, "model_planning_mode", "heuristic")
+    monkeypatch.setattr(app_config, "model_context_budget", 0)
+    builder = AgentGraphBuilder(_distinct_model(), InMemorySaver(), {})
+    builder.auto_model.ainvoke = AsyncMock(return_value=AIMessage(content="Paris."))
+    builder.proceed_model.ainvoke = AsyncMock()
+
+    final = await _run_graph(builder, "What is the capital of France?")
+
+    assert final["task_completed"]
+    assert final["stats"]["proceed_calls_saved"] == 1
+    builder.proceed_model.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_inline_final_answer_skips_proceed(monkeypatch):
+    monkeypatch.setattr(app_config, "model_planning_mode", "inline")
+    monkeypatch.setattr(app_config, "model_context_budget", 0)
+    monkeypatch.setattr(app_config, "tool_eager_execution", False)
+    builder = AgentGraphBuilder(_distinct_model(), InMemorySaver(), {})
+    builder.plan_model.ainvoke = AsyncMock(return_value=AIMessage(content="Paris."))
+    builder.proceed_model.ainvoke = AsyncMock()
+
+    final = await _run_graph(builder, "What is the capital of France?")
+
+    assert final["task_completed"]
+    assert final["total_stages"] == 1
+    assert final["stats"]["proceed_calls_saved"] == 1
+    builder.proceed_model.ainvoke.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_proceed_retries_are_bounded(monkeypatch):
+    monkeypatch.setattr(app_config, "model_planning_mode", "heuristic")
+    monkeypatch.setattr(app_config, "model_context_budget", 0)
+    monkeypatch.setattr(app_config, "model_auto_advance", False)
+    monkeypatch.setattr(app_config, "model_proceed_max_retries", 2)
+    builder = AgentGraphBuilder(_distinct_model(), InMemorySaver(), {})
+    builder.auto_model.ainvoke = AsyncMock(return_value=AIMessage(content="Paris."))
+    builder.proceed_model.ainvoke = AsyncMock(return_value=AIMessage(content="Done."))
+
+    final = await _run_graph(builder, "What is the capital of France?")
+
+    assert final["task_completed"]
+    assert builder.proceed_model.ainvoke.call_count == 2
+
+
+def test_compaction_before_first_plan_continues_to_plan_entry(monkeypatch):
+    builder = AgentGraphBuilder(_distinct_model(), InMemorySaver(), {})
+    state = {"total_stages": 0, "task_completed": False, "stats": {}}
+
+    monkeypatch.setattr(app_config, "model_planning_mode", "inline")
+    assert builder.route_compact(state) == "model"
+    monkeypatch.setattr(app_config, "model_planning_mode", "build")
+    assert builder.route_compact(state) == "build"
@@ -0,0 +1,240 @@
+"""Tests for tool execution in the agent graph's tools node."""
+
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from hallw.core.agent_graph import AgentGraphBuilder, _tool_timeout, cancel_eager_calls
+from hallw.tools import idempotent, parse_tool_response
+from hallw.utils import config as app_config
+
+
+@pytest.mark.asyncio
+async def test_browser_tabs_run_concurrently(chat_model):
+    events = []
+
+    @tool
+    async def browser_goto(url: str, tab_id: str = "main") -> str:
+        """Fake navigation."""
+        events.append(("start", tab_id, url))
+        await asyncio.sleep(0.2)
+        events.append(("end", tab_id, url))
+        return '{"success": true, "message": "ok", "data": {}}'
+
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {"browser_goto": browser_goto})
+    calls = [
+        {"name": "browser_goto", "args": {"url": "a", "tab_id": "t1"}, "id": "1"},
+        {"name": "browser_goto", "args": {"url": "b", "tab_id": "t2"}, "id": "2"},
+        {"name": "browser_goto", "args": {"url": "c", "tab_id": "t1"}, "id": "3"},
+    ]
+    state = {
+        "messages": [HumanMessage(content="go"), AIMessage(content="", tool_calls=calls)],
+        "current_stage": 0,
+        "stage_names": [],
+        "total_stages": 0,
+    }
+
+    started = time.perf_counter()
+    result = await builder.tools_node(state, {})
+    elapsed = time.perf_counter() - started
+
+    assert elapsed < 0.6
+    assert [msg.tool_call_id for msg in result["messages"]] == ["1", "3", "2"]
+    # Same-tab calls stay ordered
+    t1 = [event for event in events if event[1] == "t1"]
+    assert t1 == [("start", "t1", "a"), ("end", "t1", "a"), ("start", "t1", "c"), ("end", "t1", "c")]
+
+
+@pytest.mark.asyncio
+async def test_tool_timeout_cancels_only_the_slow_call(monkeypatch, chat_model):
+    monkeypatch.setattr(app_config, "tool_timeouts", {"slow_tool": 1})
+    cancelled = []
+
+    @tool
+    async def slow_tool() -> str:
+        """Hangs."""
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "never"
+
+    @tool
+    async def fast_tool() -> str:
+        """Returns at once."""
+        return '{"success": true, "message": "ok", "data": {}}'
+
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {"slow_tool": slow_tool, "fast_tool": fast_tool})
+    calls = [{"name": "slow_tool", "args": {}, "id": "1"}, {"name": "fast_tool", "args": {}, "id": "2"}]
+    state = {
+        "messages": [HumanMessage(content="go"), AIMessage(content="", tool_calls=calls)],
+        "current_stage": 0,
+        "stage_names": [],
+        "total_stages": 0,
+    }
+
+    result = await builder.tools_node(state, {})
+    outputs = {msg.tool_call_id: parse_tool_response(msg.content) for msg in result["messages"]}
+
+    assert cancelled == [True]
+    assert not outputs["1"]["success"] and "timed out" in outputs["1"]["message"]
+    assert outputs["2"]["success"]
+    assert result["stats"]["failures"] == 1
+
+
+def test_tool_timeout_respects_step_budget(monkeypatch):
+    monkeypatch.setattr(app_config, "tool_timeout", 120)
+    monkeypatch.setattr(app_config, "tool_timeouts", {"exec": 0})
+
+    assert _tool_timeout("read_file", None) == 120
+    assert _tool_timeout("read_file", 30) == 30
+    assert _tool_timeout("read_file", -5) == 0
+    assert _tool_timeout("exec", None) is None
+    assert _tool_timeout("exec", 30) == 30
+
+
+@pytest.mark.asyncio
+async def test_eager_execution_starts_tools_while_streaming(monkeypatch, chat_model):
+    monkeypatch.setattr(app_config, "tool_eager_execution", True)
+    started = []
+
+    @idempotent()
+    @tool
+    async def lookup(query: str) -> str:
+        """Fake idempotent lookup."""
+        started.append(query)
+        return '{"success": true, "message": "ok", "data": {}}'
+
+    async def astream(messages, config=None):
+        yield AIMessageChunk(
+            content="", tool_call_chunks=[{"name": "lookup", "args": '{"query"', "id": "1", "index": 0}]
+        )
+        yield AIMessageChunk(content="", tool_call_chunks=[{"args": ': "a"}', "index": 0}])
+        await asyncio.sleep(0.05)
+        # The first call is already running while the second one is still streaming
+        assert started == ["a"]
+        yield AIMessageChunk(
+            content="", tool_call_chunks=[{"name": "lookup", "args": '{"query": "b"}', "id": "2", "index": 1}]
+        )
+
+    model = MagicMock()
+    model.astream = astream
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {"lookup": lookup})
+
+    response = await builder._generate(model, [], {})
+    state = {
+        "messages": [HumanMessage(content="go"), response],
+        "current_stage": 0,
+        "stage_names": [],
+        "total_stages": 0,
+    }
+    result = await builder.tools_node(state, {})
+
+    assert [call["args"] for call in response.tool_calls] == [{"query": "a"}, {"query": "b"}]
+    assert started == ["a", "b"]
+    assert builder._eager_calls == {}
+    assert all(parse_tool_response(msg.content)["success"] for msg in result["messages"])
+
+
+@pytest.mark.asyncio
+async def test_eager_calls_are_bounded_by_the_step_budget(monkeypatch, chat_model):
+    monkeypatch.setattr(app_config, "tool_eager_execution", True)
+    monkeypatch.setattr(app_config, "tool_step_timeout", 0.1)
+    cancelled = []
+
+    @idempotent()
+    @tool
+    async def lookup(query: str) -> str:
+        """Fake slow lookup."""
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return "never"
+
+    async def astream(messages, config=None):
+        yield AIMessageChunk(content="", tool_call_chunks=[{"name": "lookup", "args": '{"query": "a"}', "id": "1"}])
+        yield AIMessageChunk(content="", tool_call_chunks=[{"name": "lookup", "args": '{"query": "b"}', "id": "2"}])
+
+    model = MagicMock()
+    model.astream = astream
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {"lookup": lookup})
+    response = await builder._generate(model, [], {})
+    # The final message changed the second call's arguments, so its eager task is replaced
+    response.tool_calls[1]["args"] = {"query": "c"}
+    state = {
+        "messages": [HumanMessage(content="go"), response],
+        "current_stage": 0,
+        "stage_names": [],
+        "total_stages": 0,
+    }
+
+    started = time.monotonic()
+    result = await builder.tools_node(state, {})
+
+    assert time.monotonic() - started < 5
+    assert sorted(cancelled) == ["a", "b", "c"]
+    assert not any(parse_tool_response(msg.content)["success"] for msg in result["messages"])
+
+
+@pytest.mark.asyncio
+async def test_eager_calls_are_per_thread_and_cancelled_with_the_run(monkeypatch, chat_model):
+    monkeypatch.setattr(app_config, "tool_eager_execution", True)
+    cancelled = []
+
+    @idempotent()
+    @tool
+    async def lookup(query: str) -> str:
+        """Fake slow lookup."""
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return "never"
+
+    async def astream(messages, config=None):
+        thread_id = config["configurable"]["thread_id"]
+        yield AIMessageChunk(
+            content="", tool_call_chunks=[{"name": "lookup", "args": f'{{"query": "{thread_id}"}}', "id": "1"}]
+        )
+
+    model = MagicMock()
+    model.astream = astream
+    # Not in the graph cache: evicted builders still have their eager calls cancelled
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {"lookup": lookup})
+
+    # Both runs use the same call id; neither reaches tools_node
+    await builder._generate(model, [], {"configurable": {"thread_id": "a"}})
+    await builder._generate(model, [], {"configurable": {"thread_id": "b"}})
+    await asyncio.sleep(0.01)
+    threads = set(builder._eager_calls)
+    await cancel_eager_calls("a")
+
+    assert threads == {"a", "b"}
+    assert set(builder._eager_calls) == {"b"}
+    assert cancelled == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_eager_execution_handles_empty_stream(monkeypatch, chat_model):
+    monkeypatch.setattr(app_config, "tool_eager_execution", True)
+
+    async def astream(messages, config=None):
+        return
+        yield
+
+    model = MagicMock()
+    model.astream = astream
+    builder = AgentGraphBuilder(chat_model(), InMemorySaver(), {})
+
+    response = await builder._generate(model, [], {})
+
+    assert isinstance(response, AIMessage) and not response.tool_calls
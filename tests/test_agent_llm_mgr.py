@@ -0,0 +1,76 @@
+"""Tests for model caching and prompt-cache markers in AgentLLMManager."""
+
+from collections import OrderedDict
+from unittest.mock import MagicMock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_litellm.chat_models.litellm import _convert_message_to_dict
+from litellm.llms.anthropic.chat.transformation import AnthropicConfig
+
+from hallw.core.agent_llm_mgr import CACHE_CONTROL, AgentLLMManager
+from hallw.utils.prompt_mgr import VOLATILE_SECTION_TAG
+
+
+def _messages():
+    return [
+        SystemMessage(content=f"rules\n{VOLATILE_SECTION_TAG}\ntime"),
+        HumanMessage(content="hello"),
+        AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "c1"}]),
+    ]
+
+
+def test_markers_split_stable_prefix_and_mark_history_end():
+    messages = _messages()
+
+    marked = AgentLLMManager.add_cache_markers(messages, "anthropic")
+
+    system_blocks = marked[0].content
+    assert system_blocks[0] == {"type": "text", "text": "rules\n", "cache_control": CACHE_CONTROL}
+    assert "cache_control" not in system_blocks[1]
+    assert marked[1].content[-1]["cache_control"] == CACHE_CONTROL
+    assert messages[1].content == "hello"
+
+
+def test_markers_skipped_for_implicit_cache_providers():
+    messages = _messages()
+
+    assert AgentLLMManager.add_cache_markers(messages, None) is messages
+
+
+def test_trailing_instructions_stay_after_both_breakpoints_in_anthropic_payload():
+    history = AgentLLMManager.add_cache_markers(
+        [*_messages()[:2], AIMessage(content="ok"), HumanMessage(content="next")], "anthropic"
+    )
+    trailing = AgentLLMManager.trailing_messages([SystemMessage(content="per-call instructions")], "anthropic")
+
+    payload = AnthropicConfig().transform_request(
+        "claude-sonnet-4-5", [_convert_message_to_dict(msg) for msg in [*history, *trailing]], {}, {}, {}
+    )
+
+    # The system block is only the stable prefix plus the volatile section, identical every turn
+    assert [block["text"] for block in payload["system"]] == ["rules\n", f"{VOLATILE_SECTION_TAG}\ntime"]
+    last_turn = payload["messages"][-1]["content"]
+    assert last_turn[0] == {"type": "text", "text": "next", "cache_control": CACHE_CONTROL}
+    assert last_turn[-1] == {"type": "text", "text": "per-call instructions"}
+
+
+def test_trailing_system_messages_kept_for_other_providers():
+    trailing = [SystemMessage(content="per-call instructions")]
+
+    assert AgentLLMManager.trailing_messages(trailing, None) == trailing
+
+
+def test_llm_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(AgentLLMManager, "_llm_cache", OrderedDict())
+    monkeypatch.setattr("hallw.core.agent_llm_mgr.LLM_CACHE_SIZE", 2)
+    monkeypatch.setattr(AgentLLMManager, "_create_llm", classmethod(lambda cls, name, **kwargs: MagicMock()))
+
+    first = AgentLLMManager.get_llm("model-a", temperature=0)
+    AgentLLMManager.get_llm("model-a", temperature=1)
+    assert AgentLLMManager.get_llm("model-a", temperature=0) is first
+    AgentLLMManager.get_llm("model-b", temperature=0)
+
+    # The least recently used settings were dropped
+    assert len(AgentLLMManager._llm_cache) == 2
+    assert all('"temperature": 1' not in key for key in AgentLLMManager._llm_cache)
+    assert AgentLLMManager.get_llm("model-a", temperature=0) is first
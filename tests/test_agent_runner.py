@@ -0,0 +1,142 @@
+"""Tests for checkpoint durability modes of the agent runner."""
+
+import asyncio
+from typing import TypedDict
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from hallw.core import agent_runner
+from hallw.core.agent_runner import AgentRunner
+from hallw.utils import config as app_config
+
+
+class _State(TypedDict):
+    n: int
+
+
+class _SlowSaver(InMemorySaver):
+    async def aput(self, *args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await super().aput(*args, **kwargs)
+
+
+async def _run(monkeypatch, durability):
+    monkeypatch.setattr(app_config, "checkpoint_durability", durability)
+    saver = _SlowSaver()
+
+    builder = StateGraph(_State)
+    builder.add_node("first", lambda state: {"n": state["n"] + 1})
+    builder.add_node("second", lambda state: {"n": state["n"] + 1})
+    builder.add_edge(START, "first")
+    builder.add_edge("first", "second")
+    builder.add_edge("second", END)
+    monkeypatch.setattr(agent_runner, "build_graph", lambda *args: builder.compile(checkpointer=saver))
+
+    dispatcher = MagicMock()
+    dispatcher.dispatch = AsyncMock()
+    config = {"configurable": {"thread_id": "t"}}
+    runner = AgentRunner("t", MagicMock(), dispatcher, {"n": 0}, saver, config)
+    final = await runner.run()
+    return runner, final, len(list(saver.list(config)))
+
+
+@pytest.mark.asyncio
+async def test_sync_durability_waits_for_checkpoints_between_steps(monkeypatch):
+    runner, final, checkpoints = await _run(monkeypatch, "sync")
+
+    assert final == {"n": 2}
+    assert checkpoints == 4
+    assert len(runner.step_overhead_ms) == 1
+    assert runner.step_overhead_ms[0] >= 40
+
+
+@pytest.mark.asyncio
+async def test_write_behind_durability_keeps_steps_off_the_write_path(monkeypatch):
+    runner, final, checkpoints = await _run(monkeypatch, "async")
+    assert final == {"n": 2}
+    assert checkpoints == 4
+    assert runner.step_overhead_ms[0] < 40
+
+    runner, final, checkpoints = await _run(monkeypatch, "exit")
+    assert final == {"n": 2}
+    assert checkpoints == 1
+
+
+@pytest.mark.asyncio
+async def test_run_cancels_its_eager_tool_calls(monkeypatch):
+    cancelled = []
+
+    async def fake_cancel(thread_id):
+        cancelled.append(thread_id)
+
+    monkeypatch.setattr(agent_runner, "cancel_eager_calls", fake_cancel)
+    await _run(monkeypatch, "sync")
+
+    assert cancelled == ["t"]
+
+
+async def _run_actions(monkeypatch, act):
+    """Runs a graph whose first node only plans and whose second node calls *act*; returns the runner and log."""
+    monkeypatch.setattr(app_config, "checkpoint_durability", "sync")
+    monkeypatch.setattr(agent_runner, "logger", MagicMock())
+
+    @tool
+    async def build_stages() -> str:
+        """Planning only."""
+        return "ok"
+
+    async def plan(state):
+        await build_stages.ainvoke({})
+        await asyncio.sleep(0.05)
+        return {"n": state["n"] + 1}
+
+    async def second(state):
+        await act()
+        await act()
+        return {"n": state["n"] + 1}
+
+    builder = StateGraph(_State)
+    builder.add_node("plan", plan)
+    builder.add_node("act", second)
+    builder.add_edge(START, "plan")
+    builder.add_edge("plan", "act")
+    builder.add_edge("act", END)
+    saver = InMemorySaver()
+    monkeypatch.setattr(agent_runner, "build_graph", lambda *args: builder.compile(checkpointer=saver))
+
+    dispatcher = MagicMock()
+    dispatcher.dispatch = AsyncMock()
+    runner = AgentRunner("t", MagicMock(), dispatcher, {"n": 0}, saver, {"configurable": {"thread_id": "t"}})
+    await runner.run()
+    logged = [call for call in agent_runner.logger.info.call_args_list if "first action" in call.args[0]]
+    return runner, logged
+
+
+@pytest.mark.asyncio
+async def test_first_action_is_the_first_non_planning_tool(monkeypatch):
+    @tool
+    async def lookup() -> str:
+        """A real action."""
+        return "ok"
+
+    runner, logged = await _run_actions(monkeypatch, lambda: lookup.ainvoke({}))
+
+    # Planning tools do not count, and later actions do not overwrite the first measurement
+    assert runner.first_action_ms is not None and runner.first_action_ms >= 40
+    assert len(logged) == 1
+
+
+@pytest.mark.asyncio
+async def test_first_action_is_the_first_visible_output(monkeypatch):
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="Paris is the capital."), AIMessage(content="x")]))
+
+    runner, logged = await _run_actions(monkeypatch, lambda: model.ainvoke("capital?"))
+
+    assert runner.first_action_ms is not None and runner.first_action_ms >= 40
+    assert len(logged) == 1
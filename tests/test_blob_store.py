@@ -0,0 +1,51 @@
+"""Tests for the content-addressed attachment store."""
+
+import base64
+
+from langchain_core.messages import HumanMessage
+
+from hallw.utils import blob_store, config, parse_file
+from hallw.utils.blob_store import put_blob, resolve_blob_url, resolve_message_blobs
+
+
+def test_attachments_are_stored_once_and_resolved_for_the_provider(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "attachment_blob_dir", str(tmp_path / "blobs"))
+    png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+    first = tmp_path / "a.png"
+    copy = tmp_path / "b.png"
+    first.write_bytes(png)
+    copy.write_bytes(png)
+
+    blocks_a = parse_file(str(first))
+    blocks_b = parse_file(str(copy))
+    assert parse_file(str(first)) == blocks_a
+
+    ref = blocks_a[1]["image_url"]["url"]
+    assert ref.startswith("blob:image/png;sha256,")
+    assert blocks_b[1]["image_url"]["url"] == ref
+    assert len([p for p in (tmp_path / "blobs").rglob("*") if p.is_file()]) == 1
+
+    message = HumanMessage(content=[*blocks_a, {"type": "text", "text": "what is this?"}], id="m1")
+    text_only = HumanMessage(content="hi", id="m2")
+    resolved = resolve_message_blobs([message, text_only])
+
+    assert resolved[0].content[1]["image_url"]["url"] == f"data:image/png;base64,{base64.b64encode(png).decode()}"
+    assert resolved[0].id == "m1"
+    assert resolved[1] is text_only
+    assert message.content[1]["image_url"]["url"] == ref
+
+
+def test_resolved_data_urls_are_bounded_by_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "attachment_blob_dir", str(tmp_path / "blobs"))
+    monkeypatch.setattr(blob_store, "RESOLVED_CACHE_BYTES", 3000)
+    monkeypatch.setattr(blob_store, "RESOLVED_ENTRY_MAX_BYTES", 2000)
+    monkeypatch.setattr(blob_store, "_resolved", type(blob_store._resolved)())
+    monkeypatch.setattr(blob_store, "_resolved_bytes", 0)
+
+    refs = [put_blob(bytes([i]) * 1000, "image/png") for i in range(3)]
+    urls = [resolve_blob_url(ref) for ref in refs]
+    resolve_blob_url(put_blob(b"\xff" * 3000, "image/png"))
+
+    assert [resolve_blob_url(ref) for ref in refs] == urls
+    assert len(blob_store._resolved) == 2
+    assert blob_store._resolved_bytes == sum(len(url) for url in blob_store._resolved.values()) <= 3000
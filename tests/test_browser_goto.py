@@ -10,11 +10,14 @@ from hallw.tools.playwright import goto
 
 
 @pytest.mark.asyncio
-async def test_browser_goto_success(monkeypatch):
+async def test_browser_goto_success(monkeypatch, inline_browser):
     page = AsyncMock()
     page.goto = AsyncMock()
+    page.url = "https://x.com"
+    page.title = AsyncMock(return_value="X")
 
     monkeypatch.setattr(goto, "get_page", AsyncMock(return_value=page))
+    inline_browser(goto)
 
     data = json.loads(await goto.browser_goto.ainvoke({"page_index": 0, "url": "https://x.com"}))
 
@@ -23,11 +26,12 @@ async def test_browser_goto_success(monkeypatch):
 
 
 @pytest.mark.asyncio
-async def test_browser_goto_timeout(monkeypatch):
+async def test_browser_goto_timeout(monkeypatch, inline_browser):
     page = AsyncMock()
     page.goto = AsyncMock(side_effect=PlaywrightTimeoutError("timeout"))
 
     monkeypatch.setattr(goto, "get_page", AsyncMock(return_value=page))
+    inline_browser(goto)
 
     data = json.loads(await goto.browser_goto.ainvoke({"page_index": 0, "url": "https://x.com"}))
 
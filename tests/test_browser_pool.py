@@ -0,0 +1,38 @@
+"""Tests for the pooled Playwright browser hosts."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from hallw.tools.playwright.playwright_mgr import BrowserPool, BrowserWorker
+
+
+async def _thread_name():
+    return threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_workers_lease_hosts_lazily_from_a_bounded_pool():
+    pool = BrowserPool(size=2, idle_timeout=0)
+    workers = [BrowserWorker(f"session-{idx}", pool=pool) for idx in range(3)]
+    assert pool.stats["hosts"] == 0
+    assert await workers[0].get_page() is None
+    assert pool.stats["hosts"] == 0
+
+    names = [await worker.run(_thread_name()) for worker in workers]
+
+    assert len(set(names)) == 2
+    assert pool.stats == {"hosts_started": 2, "hosts_reclaimed": 0, "hosts": 2, "leases": 3}
+
+    for worker in workers:
+        worker.close()
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and (
+        pool.stats["hosts"] or any(thread.name in names for thread in threading.enumerate())
+    ):
+        await asyncio.sleep(0.01)
+
+    assert pool.stats == {"hosts_started": 2, "hosts_reclaimed": 2, "hosts": 0, "leases": 0}
+    assert not any(thread.name in names for thread in threading.enumerate())
@@ -9,7 +9,7 @@ from hallw.tools.playwright import structure
 
 
 @pytest.mark.asyncio
-async def test_browser_get_structure_filters_visible(monkeypatch):
+async def test_browser_get_structure_filters_visible(monkeypatch, inline_browser):
     page = AsyncMock()
     page.accessibility.snapshot = AsyncMock(
         return_value={
@@ -27,6 +27,7 @@ async def test_browser_get_structure_filters_visible(monkeypatch):
     page.url = "https://example.com"
 
     monkeypatch.setattr(structure, "get_page", AsyncMock(return_value=page))
+    inline_browser(structure)
 
     data = json.loads(await structure.browser_get_structure.ainvoke({"page_index": 0}))
 
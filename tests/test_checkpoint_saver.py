@@ -0,0 +1,112 @@
+"""Tests for the delta checkpoint saver."""
+
+import asyncio
+import weakref
+from typing import Annotated, TypedDict
+
+import aiosqlite
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+
+from hallw.utils.checkpoint_saver import DeltaSqliteSaver
+
+
+class _State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(checkpointer):
+    def reply(state: _State):
+        return {"messages": [AIMessage(content="x" * 1000 + str(len(state["messages"])))]}
+
+    builder = StateGraph(_State)
+    builder.add_node("reply", reply)
+    builder.add_edge(START, "reply")
+    return builder.compile(checkpointer=checkpointer)
+
+
+@pytest.fixture
+async def conn(tmp_path):
+    async with aiosqlite.connect(tmp_path / "checkpoints.db") as conn:
+        yield conn
+
+
+async def _scalar(conn, sql):
+    async with conn.execute(sql) as cursor:
+        return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_delta_saver_round_trips_messages(conn):
+    saver = DeltaSqliteSaver(conn)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    for turn in range(3):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+
+    state = (await graph.aget_state(config)).values
+    history = [t async for t in saver.alist(config)]
+    stored_rows = await _scalar(conn, "SELECT COUNT(*) FROM checkpoint_messages")
+    largest_checkpoint = await _scalar(conn, "SELECT MAX(LENGTH(checkpoint)) FROM checkpoints")
+    await saver.adelete_thread("t1")
+
+    assert [msg.content for msg in state["messages"] if isinstance(msg, HumanMessage)] == ["turn 0", "turn 1", "turn 2"]
+    assert len(state["messages"]) == 6
+    assert all(isinstance(t.checkpoint["channel_values"].get("messages", []), list) for t in history)
+    # Each message is stored once, and checkpoints only hold refs
+    assert stored_rows == 6
+    assert largest_checkpoint < 1000
+    assert await _scalar(conn, "SELECT COUNT(*) FROM checkpoint_messages") == 0
+
+
+@pytest.mark.asyncio
+async def test_delta_saver_memo_keeps_refs_only(conn):
+    saver = DeltaSqliteSaver(conn)
+    graph = _graph(saver)
+    await graph.ainvoke({"messages": [HumanMessage(content="hi", id="h1")]}, {"configurable": {"thread_id": "t1"}})
+    memo = dict(saver._known_refs)
+    saver.forget_thread("t1")
+
+    assert memo and all(isinstance(wref, weakref.ref) for wref, _ in memo.values())
+    assert all(key[0] == "t1" and ref.startswith(f"{key[1]}:") for key, (_, ref) in memo.items())
+    assert len(saver._known_refs) == 0
+
+
+@pytest.mark.asyncio
+async def test_delta_saver_serializes_each_message_once(conn, monkeypatch):
+    saver = DeltaSqliteSaver(conn)
+    serialized: list[str] = []
+    dumps_typed = saver.serde.dumps_typed
+
+    def counting_dumps(obj):
+        if isinstance(obj, BaseMessage):
+            serialized.append(obj.id)
+        return dumps_typed(obj)
+
+    monkeypatch.setattr(saver.serde, "dumps_typed", counting_dumps)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "t1"}}
+    for turn in range(4):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+
+    assert len(serialized) == 8
+    assert len(set(serialized)) == 8
+
+
+@pytest.mark.asyncio
+async def test_prune_racing_a_write_keeps_the_new_messages(conn):
+    saver = DeltaSqliteSaver(conn)
+    graph = _graph(saver)
+    config = {"configurable": {"thread_id": "t"}}
+    for turn in range(3):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}")]}, config)
+        await asyncio.gather(
+            graph.ainvoke({"messages": [HumanMessage(content=f"more {turn}")]}, config),
+            saver.aprune_thread("t", 1),
+        )
+
+    state = (await graph.aget_state(config)).values
+
+    assert len(state["messages"]) == 12
@@ -0,0 +1,57 @@
+"""Tests for compressed checkpoint blobs and the migration."""
+
+import aiosqlite
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from hallw.utils.checkpoint_saver import DeltaSqliteSaver
+from hallw.utils.checkpoint_serde import CompressedSerializer, blob_stats, migrate_database
+
+
+def _checkpoint(messages):
+    return {
+        "v": 1,
+        "id": str(len(messages)),
+        "ts": "2026-01-01T00:00:00+00:00",
+        "channel_values": {"messages": messages, "context_summary": "summary " * 500},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+
+
+def test_compressed_serializer_round_trips_and_skips_small_values():
+    serde = CompressedSerializer(min_size=100)
+
+    small_type, _ = serde.dumps_typed("tiny")
+    big = {"text": "repeated " * 1000}
+    big_type, big_blob = serde.dumps_typed(big)
+
+    assert "+" not in small_type
+    assert big_type.split("+")[1] in ("zstd", "zlib")
+    assert len(big_blob) < 1000
+    assert serde.loads_typed((big_type, big_blob)) == big
+    assert serde.loads_typed(serde.serde.dumps_typed(big)) == big
+
+
+@pytest.mark.asyncio
+async def test_migration_compresses_existing_database(tmp_path):
+    db_path = str(tmp_path / "checkpoints.db")
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+    messages = [HumanMessage(content="question " * 300, id="m1"), AIMessage(content="answer " * 300, id="m2")]
+    async with aiosqlite.connect(db_path) as conn:
+        await DeltaSqliteSaver(conn).aput(config, _checkpoint(messages), {}, {})
+
+    report = await migrate_database(db_path, min_size=256)
+
+    async with aiosqlite.connect(db_path) as conn:
+        loaded = await DeltaSqliteSaver(conn, serde=CompressedSerializer()).aget_tuple(config)
+        stats = await blob_stats(conn)
+
+    before, after = report["before"], report["after"]
+    assert after["checkpoint_messages"]["compressed_rows"] == 2
+    assert after["checkpoints"]["compressed_rows"] == 1
+    assert after["checkpoint_messages"]["bytes"] < before["checkpoint_messages"]["bytes"] / 5
+    assert after["checkpoints"]["bytes"] < before["checkpoints"]["bytes"]
+    assert stats == after
+    assert [msg.content for msg in loaded.checkpoint["channel_values"]["messages"]] == [m.content for m in messages]
+    assert loaded.checkpoint["channel_values"]["context_summary"] == "summary " * 500
@@ -0,0 +1,45 @@
+"""Tests for the socket client managers used by multi-worker deployments."""
+
+import asyncio
+import socket
+
+import pytest
+import socketio
+
+from hallw.server.client_manager import HubManager, create_client_manager, run_hub
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_create_client_manager_by_url():
+    assert type(create_client_manager("")) is socketio.AsyncManager
+    assert isinstance(create_client_manager("tcp://127.0.0.1:8765"), HubManager)
+    with pytest.raises(ValueError):
+        create_client_manager("amqp://localhost")
+    with pytest.raises(ValueError, match="port"):
+        create_client_manager("tcp://127.0.0.1")
+
+
+@pytest.mark.asyncio
+async def test_hub_relays_messages_to_other_workers():
+    port = _free_port()
+    url = f"tcp://127.0.0.1:{port}"
+    hub = asyncio.create_task(run_hub("127.0.0.1", port))
+    await asyncio.sleep(0.1)
+    sender, receiver = HubManager(url), HubManager(url)
+    listener = receiver._listen()
+    first = asyncio.ensure_future(anext(listener))
+    await asyncio.sleep(0.1)
+
+    await sender._publish({"method": "emit", "event": "ping", "data": ["x" * 100_000]})
+    line = await asyncio.wait_for(first, 2)
+    await listener.aclose()
+    hub.cancel()
+    message = receiver.json.loads(line)
+
+    assert message["event"] == "ping"
+    assert message["data"] == ["x" * 100_000]
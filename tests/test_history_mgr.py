@@ -0,0 +1,139 @@
+"""Tests for the thread index, retention maintenance and pool lifecycle in history_mgr."""
+
+import asyncio
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import START, StateGraph
+from langgraph.graph.message import add_messages
+
+from hallw.utils import history_mgr
+
+
+def _checkpoint(idx, text):
+    return {
+        "v": 1,
+        "id": str(idx),
+        "ts": f"2026-01-0{idx}T00:00:00+00:00",
+        "channel_values": {
+            "messages": [HumanMessage(content=text, id=f"m{idx}")],
+            "stats": {"input_tokens": idx * 10, "output_tokens": idx},
+        },
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+
+
+async def _count(cp, table):
+    async with cp.conn.execute(f"SELECT COUNT(*) FROM {table}") as cursor:
+        return (await cursor.fetchone())[0]
+
+
+@pytest.mark.asyncio
+async def test_thread_index_pages_sorts_and_backfills(history_db):
+    cp = await history_mgr.get_checkpointer()
+    for idx, text in enumerate(["b", "a", "c"], start=1):
+        await cp.aput({"configurable": {"thread_id": f"t{idx}", "checkpoint_ns": ""}}, _checkpoint(idx, text), {}, {})
+
+    newest_first = await history_mgr.get_all_threads()
+    page = await history_mgr.get_all_threads(limit=1, offset=1, sort="title", order="asc")
+    bogus_sort = await history_mgr.get_all_threads(sort="1; DROP TABLE threads")
+
+    # Simulate a database written before the index existed
+    async with cp.lock:
+        await cp.conn.execute("DELETE FROM threads")
+        await cp.conn.commit()
+    await history_mgr.close_pool()
+    backfilled = await history_mgr.get_all_threads()
+
+    await history_mgr.delete_thread("t2")
+    after_delete = await history_mgr.get_all_threads()
+    await history_mgr.close_pool()
+
+    assert [t["id"] for t in newest_first] == ["t3", "t2", "t1"]
+    assert newest_first[0] == {
+        "id": "t3",
+        "title": "c",
+        "created_at": "2026-01-03T00:00:00+00:00",
+        "updated_at": "2026-01-03T00:00:00+00:00",
+        "message_count": 1,
+        "input_tokens": 30,
+        "output_tokens": 3,
+    }
+    assert [t["title"] for t in page] == ["b"]
+    assert [t["id"] for t in bogus_sort] == ["t3", "t2", "t1"]
+    assert backfilled == newest_first
+    assert [t["id"] for t in after_delete] == ["t3", "t1"]
+
+
+@pytest.mark.asyncio
+async def test_maintenance_prunes_to_retention_policy_and_reclaims_space(history_db):
+    class State(TypedDict):
+        messages: Annotated[list, add_messages]
+
+    def draft(state):
+        return {"messages": [AIMessage(content="draft " * 2000, id=f"a{len(state['messages'])}")]}
+
+    def revise(state):
+        # Replaces the draft in place; drafts of earlier turns become unreferenced once pruned
+        last = state["messages"][-1]
+        return {"messages": [AIMessage(content="final", id=last.id)]}
+
+    builder = StateGraph(State)
+    builder.add_node("draft", draft)
+    builder.add_node("revise", revise)
+    builder.add_edge(START, "draft")
+    builder.add_edge("draft", "revise")
+
+    cp = await history_mgr.get_checkpointer()
+    graph = builder.compile(checkpointer=cp)
+    config = {"configurable": {"thread_id": "t1"}}
+    for turn in range(4):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"turn {turn}", id=f"h{turn}")]}, config)
+    before = await _count(cp, "checkpoints"), await _count(cp, "checkpoint_messages")
+
+    report = await history_mgr.run_maintenance(keep_last=2)
+    after = await _count(cp, "checkpoints"), await _count(cp, "checkpoint_messages")
+    state = (await graph.aget_state(config)).values
+    inputs = [t async for t in cp.alist(config) if t.metadata.get("source") == "input"]
+
+    # Pruned refs are forgotten, so the next turn stores its messages again where needed
+    await graph.ainvoke({"messages": [HumanMessage(content="turn 4", id="h4")]}, config)
+    reloaded = (await graph.aget_state(config)).values
+    await history_mgr.close_pool()
+
+    # 4 turns x (input + start + draft + revise)
+    assert before[0] == 16
+    # Newest 2 kept, plus the input checkpoint of every turn
+    assert after[0] == 6
+    assert len(inputs) == 4
+    assert report["checkpoints"] == 10
+    assert report["writes"] > 0
+    assert report["messages"] == 3
+    assert after[1] == before[1] - 3
+    assert report["spill_files"] == 0
+    assert report["bytes_reclaimed"] >= 0
+    assert [msg.content for msg in state["messages"]][-2:] == ["turn 3", "final"]
+    assert len(reloaded["messages"]) == 10
+
+
+def test_pool_is_closed_when_the_loop_changes(history_db):
+    async def first_loop():
+        pool = await history_mgr.get_pool()
+        await pool.writer()
+        async with pool.reader():
+            pass
+        return pool
+
+    async def second_loop():
+        pool = await history_mgr.get_pool()
+        await history_mgr.close_pool()
+        return pool
+
+    # Two event loops on purpose: the pool is bound to the loop it was created on
+    old = asyncio.run(first_loop())
+    new = asyncio.run(second_loop())
+
+    assert new is not old
+    assert old.metrics["connections_closed"] == old.metrics["connections_opened"] == 2
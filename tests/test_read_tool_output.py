@@ -0,0 +1,58 @@
+"""Tests for spilling large tool outputs and the read_tool_output tool."""
+
+import json
+
+import pytest
+from langchain_core.messages import ToolMessage
+
+from hallw.core.agent_context import spill_tool_messages
+from hallw.tools import build_tool_response
+from hallw.tools.system.read_tool_output import read_tool_output
+from hallw.utils import config
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "tool_output_spill_dir", str(tmp_path))
+    return tmp_path
+
+
+def _large_message(size: int = 5000) -> ToolMessage:
+    output = build_tool_response(True, "Read file successfully.", {"content": "x" * size})
+    return ToolMessage(content=output, tool_call_id="call_1", name="read_file", id="tool_1")
+
+
+def test_spill_replaces_large_output_with_stub(spill_dir):
+    stubs = spill_tool_messages([_large_message()], threshold=2000)
+
+    assert len(stubs) == 1
+    assert stubs[0].id == "tool_1"
+    data = json.loads(stubs[0].content)
+    assert data["success"] is True
+    assert data["data"]["total_chars"] > 5000
+    assert len(stubs[0].content) < 2000
+
+
+def test_spill_skips_small_and_already_spilled(spill_dir):
+    stub = spill_tool_messages([_large_message()], threshold=2000)[0]
+
+    assert spill_tool_messages([_large_message(10)], threshold=2000) == []
+    assert spill_tool_messages([stub], threshold=10) == []
+
+
+def test_read_tool_output_slices(spill_dir):
+    original = _large_message()
+    stub = spill_tool_messages([original], threshold=2000)[0]
+    handle = json.loads(stub.content)["data"]["output_handle"]
+
+    data = json.loads(read_tool_output.invoke({"handle": handle, "offset": 0, "length": 100}))
+
+    assert data["success"] is True
+    assert data["data"]["content"] == original.content[:100]
+    assert data["data"]["next_offset"] == 100
+
+
+def test_read_tool_output_unknown_handle(spill_dir):
+    data = json.loads(read_tool_output.invoke({"handle": "../../etc/passwd"}))
+
+    assert data["success"] is False
@@ -0,0 +1,65 @@
+"""Tests for idle session eviction and rehydration."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from hallw.server.session_mgr import SessionManager
+from hallw.utils import config as app_config
+from hallw.utils import history_mgr
+
+
+async def _checkpoint(thread_id, messages):
+    cp = await history_mgr.get_checkpointer()
+    checkpoint = {
+        "v": 1,
+        "id": "1",
+        "ts": "2026-01-01T00:00:00+00:00",
+        "channel_values": {"messages": messages},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+    await cp.aput({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}, checkpoint, {}, {})
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_evicted_when_idle_or_over_budget_and_rehydrated(history_db, monkeypatch):
+    monkeypatch.setattr(app_config, "session_idle_timeout", 60)
+    monkeypatch.setattr(app_config, "session_memory_budget_mb", 0)
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    mgr = SessionManager()
+    loop = asyncio.get_running_loop()
+    saved = [HumanMessage(content="hello", id="m1"), AIMessage(content="hi", id="m2")]
+    large = [HumanMessage(content="x" * (2 * 1024 * 1024), id="m3")]
+    await _checkpoint("t1", saved)
+    await _checkpoint("t3", large)
+
+    persisted, _ = mgr.ensure_session("sid", sio, loop, "s1", "t1")
+    unsaved, _ = mgr.ensure_session("sid", sio, loop, "s2", "t2")
+    recent, _ = mgr.ensure_session("sid", sio, loop, "s3", "t3")
+    persisted.state["messages"] = list(saved)
+    unsaved.state["messages"] = [HumanMessage(content="not checkpointed yet", id="m4")]
+    recent.state["messages"] = list(large)
+    persisted.last_active = unsaved.last_active = time.monotonic() - 120
+
+    idle_evicted = await mgr.sweep()
+    evicted_after_idle = [s.session_id for s in (persisted, unsaved, recent) if s.evicted]
+
+    monkeypatch.setattr(app_config, "session_memory_budget_mb", 1)
+    budget_evicted = await mgr.sweep()
+    memory = mgr.memory_size()
+
+    await mgr.rehydrate(persisted)
+    restored = [msg.content for msg in persisted.messages]
+    await history_mgr.close_pool()
+
+    assert idle_evicted == 1
+    assert evicted_after_idle == ["s1"]
+    assert budget_evicted == 1 and recent.evicted
+    assert memory == len("not checkpointed yet")
+    assert restored == ["hello", "hi"]
+    assert not mgr.sessions["sid"]["s1"].evicted
@@ -0,0 +1,148 @@
+"""Tests for coalesced streaming, the outbox and wire encoding in the socket renderer."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from hallw.server.socket_renderer import SocketRenderer
+from hallw.server.wire_codec import FLAG_DEFLATE, FLAG_RAW, WIRE_EVENT, decode_frame, negotiate
+from hallw.utils import config as app_config
+from hallw.utils.spill_store import read_output
+
+
+def _renderer():
+    sio = MagicMock()
+    sio.emit = AsyncMock()
+    return SocketRenderer(sio, "sid", asyncio.get_running_loop(), "s1"), sio
+
+
+def _events(sio):
+    return [(call.args[0], call.args[1]) for call in sio.emit.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_coalesced_and_flushed_before_tool_start(monkeypatch):
+    monkeypatch.setattr(app_config, "stream_flush_interval_ms", 1000)
+    renderer, sio = _renderer()
+
+    renderer.on_llm_start()
+    for idx in range(100):
+        renderer.on_llm_chunk(text=f"t{idx} ", reasoning="r" if idx < 3 else "")
+    renderer.on_tool_start("run1", "search", {"query": "x"})
+    await asyncio.sleep(0)
+    events = _events(sio)
+
+    assert [name for name, _ in events] == ["llm_started", "llm_new_reasoning", "llm_new_text", "tool_state_update"]
+    assert events[1][1]["reasoning"] == "rrr"
+    assert events[2][1]["text"] == "".join(f"t{idx} " for idx in range(100))
+
+
+@pytest.mark.asyncio
+async def test_chunks_flush_on_interval_size_and_llm_end(monkeypatch):
+    monkeypatch.setattr(app_config, "stream_flush_interval_ms", 10)
+    monkeypatch.setattr(app_config, "stream_flush_max_chars", 8)
+    renderer, sio = _renderer()
+
+    renderer.on_llm_chunk(text="ab", reasoning="")
+    renderer.on_llm_chunk(text="cd", reasoning="")
+    await asyncio.sleep(0.05)
+    timed = _events(sio)
+
+    renderer.on_llm_chunk(text="0123456789", reasoning="")
+    await asyncio.sleep(0)
+    sized = _events(sio)[len(timed) :]
+
+    renderer.on_llm_chunk(text="tail", reasoning="")
+    renderer.on_llm_end()
+    await asyncio.sleep(0)
+    ended = _events(sio)[len(timed) + len(sized) :]
+
+    assert timed == [("llm_new_text", {"session_id": "s1", "text": "abcd"})]
+    assert sized == [("llm_new_text", {"session_id": "s1", "text": "0123456789"})]
+    assert [name for name, _ in ended] == ["llm_new_text", "llm_finished"]
+
+
+@pytest.mark.asyncio
+async def test_outbox_keeps_order_and_sheds_reasoning_for_slow_clients(monkeypatch):
+    monkeypatch.setattr(app_config, "stream_flush_interval_ms", 0)
+    monkeypatch.setattr(app_config, "socket_outbox_max_events", 4)
+    renderer, sio = _renderer()
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_emit(event, data, room=None):
+        await release.wait()
+        sent.append((event, data))
+
+    sio.emit = slow_emit
+    renderer.on_llm_start()
+    await asyncio.sleep(0)
+    for idx in range(3):
+        renderer.on_llm_chunk(text="", reasoning=f"r{idx}")
+        renderer.on_llm_chunk(text=f"t{idx}", reasoning="")
+    renderer.on_stages_advanced({"current_stage": 1})
+    renderer.on_llm_chunk(text="a", reasoning="")
+    renderer.on_llm_chunk(text="b", reasoning="")
+    depth = renderer.outbox_depth
+
+    release.set()
+    while renderer.outbox_depth or len(sent) < 6:
+        await asyncio.sleep(0)
+
+    names = [name for name, _ in sent]
+    # Reasoning frames were shed to make room; text and state updates arrive in order
+    assert names == ["llm_started", "llm_new_text", "llm_new_text", "llm_new_text", "stages_advanced", "llm_new_text"]
+    assert "".join(data["text"] for name, data in sent if name == "llm_new_text") == "t0t1t2ab"
+    assert sent[-1][1]["text"] == "ab"
+    # The text after the state update could not be shed, so the bound was exceeded once
+    assert depth == 5
+    assert renderer.outbox_metrics == {"sent": 6, "merged": 1, "dropped": 3, "overflow": 1, "max_depth": 5}
+
+
+@pytest.mark.asyncio
+async def test_binary_encoding_is_negotiated_and_round_trips(monkeypatch):
+    monkeypatch.setattr(app_config, "tool_state_preview_chars", 0)
+    monkeypatch.setattr(app_config, "socket_binary_encoding", False)
+    assert negotiate(["msgpack", "json"]) == "json"
+    monkeypatch.setattr(app_config, "socket_binary_encoding", True)
+    assert negotiate(["json"]) == "json"
+    assert negotiate(None) == "json"
+    assert negotiate(["msgpack", "json"]) == "msgpack"
+
+    monkeypatch.setattr(app_config, "socket_compress_min_bytes", 256)
+    result = '{"success": true, "message": "ok", "data": {"content": "' + "lorem ipsum " * 200 + '"}}'
+    renderer, sio = _renderer()
+    renderer.encoding = "msgpack"
+    renderer.on_llm_chunk(text="hi", reasoning="")
+    renderer.on_tool_end("r1", "extract_page", result, True, "done")
+    await asyncio.sleep(0)
+    calls = sio.emit.call_args_list
+
+    assert [call.args[0] for call in calls] == [WIRE_EVENT, WIRE_EVENT]
+    small, large = calls[0].args[1], calls[1].args[1]
+    assert small[0] == FLAG_RAW
+    assert decode_frame(small) == ("llm_new_text", {"session_id": "s1", "text": "hi"})
+    assert large[0] == FLAG_DEFLATE
+    assert len(large) < len(result) / 4
+    assert decode_frame(large)[1]["result"] == result
+
+
+@pytest.mark.asyncio
+async def test_long_tool_result_is_sent_as_preview_with_handle(monkeypatch, tmp_path):
+    monkeypatch.setattr(app_config, "tool_output_spill_dir", str(tmp_path))
+    monkeypatch.setattr(app_config, "tool_state_preview_chars", 100)
+    result = "x" * 5000
+    renderer, sio = _renderer()
+
+    renderer.on_tool_end("run1", "search", result, True, "done")
+    renderer.on_tool_end("run2", "search", "short", True, "done")
+    await asyncio.sleep(0)
+    events = _events(sio)
+
+    long_state, short_state = events[0][1], events[1][1]
+    assert long_state["result"] == result[:100]
+    assert long_state["result_chars"] == 5000
+    assert read_output(long_state["result_handle"]) == result
+    assert short_state["result"] == "short"
+    assert "result_handle" not in short_state
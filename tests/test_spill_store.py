@@ -0,0 +1,30 @@
+"""Tests for the per-thread index and cleanup in the spill store."""
+
+import pytest
+
+from hallw.utils import config
+from hallw.utils.spill_store import delete_thread_outputs, prune_outputs, read_output, spill_output
+
+
+@pytest.fixture
+def spill_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "tool_output_spill_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_thread_outputs_removed_on_delete_and_retention(spill_dir):
+    shared = spill_output("shared output", "t1")
+    assert spill_output("shared output", "t2") == shared
+    only_t1 = spill_output("t1 output", "t1")
+    only_t2 = spill_output("t2 output", "t2")
+    preview = spill_output("ui preview")
+
+    assert delete_thread_outputs("t1") == 1
+    assert read_output(only_t1) is None
+    assert read_output(shared) == "shared output"
+
+    # t2 is gone from history; fresh unindexed previews outlive it
+    assert prune_outputs([]) == 2
+    assert read_output(only_t2) is None
+    assert read_output(preview) == "ui preview"
+    assert prune_outputs([], max_age=-1) == 1
@@ -0,0 +1,54 @@
+"""Tests for the pooled history database connections."""
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from hallw.utils import history_mgr
+from hallw.utils.sqlite_pool import SqlitePool
+
+
+@pytest.mark.asyncio
+async def test_history_calls_reuse_pooled_connections(history_db):
+    cp = await history_mgr.get_checkpointer()
+    config = {"configurable": {"thread_id": "t1", "checkpoint_ns": ""}}
+    checkpoint = {
+        "v": 1,
+        "id": "1",
+        "ts": "2026-01-01T00:00:00+00:00",
+        "channel_values": {"messages": [HumanMessage(content="hello", id="m1")]},
+        "channel_versions": {},
+        "versions_seen": {},
+    }
+    await cp.aput(config, checkpoint, {}, {})
+
+    for _ in range(5):
+        threads = await history_mgr.get_all_threads()
+        loaded = await history_mgr.load_thread("t1")
+    assert await history_mgr.get_checkpointer() is cp
+
+    pool = await history_mgr.get_pool()
+    async with pool.reader(), pool.reader():
+        pass
+    metrics = history_mgr.get_db_metrics()
+    await history_mgr.close_pool()
+
+    assert [t["title"] for t in threads] == ["hello"]
+    assert loaded["state"]["messages"][0].content == "hello"
+    # One writer, one reader for the sequential calls, one more for the nested borrow
+    assert metrics["connections_opened"] == 3
+    assert metrics["reader_acquires"] == 12
+
+
+@pytest.mark.asyncio
+async def test_reader_borrowed_across_close_is_not_returned(tmp_path):
+    pool = SqlitePool(str(tmp_path / "checkpoints.db"))
+
+    async with pool.reader():
+        await pool.close()
+    queued = pool._readers.qsize()
+    async with pool.reader() as saver:
+        fresh = saver.conn in pool._all
+    await pool.close()
+
+    assert queued == 0
+    assert fresh
@@ -0,0 +1,119 @@
+"""Tests for the thread-scoped tool result cache."""
+
+import os
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import InMemorySaver
+
+from hallw.core.agent_graph import AgentGraphBuilder
+from hallw.tools import ToolResultCache, build_tool_response, file_validator, idempotent, ttl_validator
+
+
+@idempotent()
+@tool
+def lookup(query: str, limit: int = 5) -> str:
+    """Fake idempotent lookup."""
+    return query
+
+
+@idempotent(file_validator)
+@tool
+def peek(file_path: str) -> str:
+    """Fake file reader."""
+    return file_path
+
+
+@idempotent(ttl_validator(lambda: 60))
+@tool
+def fetch(url: str) -> str:
+    """Fake network fetch."""
+    return url
+
+
+@idempotent(ttl_validator(lambda: 0))
+@tool
+def fetch_live(url: str) -> str:
+    """Fake network fetch with caching disabled."""
+    return build_tool_response(True, "fetched", {"url": url})
+
+
+@tool
+def mutate(value: str) -> str:
+    """Not idempotent."""
+    return value
+
+
+def test_cache_hits_with_normalized_args():
+    cache = ToolResultCache(max_entries=8)
+    key = cache.key(lookup, {"query": "python"})
+
+    assert cache.get(key) is None
+    cache.put(key, "result")
+
+    assert cache.get(cache.key(lookup, {"query": "python", "limit": 5})) == "result"
+    assert cache.get(cache.key(lookup, {"query": "python", "limit": 6})) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_skips_non_idempotent_tools():
+    cache = ToolResultCache()
+
+    assert cache.key(mutate, {"value": "x"}) is None
+    assert ToolResultCache(max_entries=0).key(lookup, {"query": "x"}) is None
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ToolResultCache(max_entries=2)
+    keys = [cache.key(lookup, {"query": q}) for q in "abc"]
+
+    cache.put(keys[0], "a")
+    cache.put(keys[1], "b")
+    cache.get(keys[0])
+    cache.put(keys[2], "c")
+
+    assert len(cache) == 2
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "a"
+
+
+def test_file_validator_invalidates_on_change(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("one")
+    cache = ToolResultCache()
+    key = cache.key(peek, {"file_path": str(path)})
+    cache.put(key, "one")
+
+    path.write_text("two, longer")
+    os.utime(path, ns=(0, 1))
+
+    assert cache.key(peek, {"file_path": str(path)}) != key
+
+
+def test_ttl_validator_expires_network_results(monkeypatch):
+    cache = ToolResultCache()
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    key = cache.key(fetch, {"url": "https://example.com"})
+    cache.put(key, "page")
+
+    monkeypatch.setattr(time, "time", lambda: 1019.0)
+    assert cache.get(cache.key(fetch, {"url": "https://example.com"})) == "page"
+
+    monkeypatch.setattr(time, "time", lambda: 1021.0)
+    assert cache.get(cache.key(fetch, {"url": "https://example.com"})) is None
+
+
+@pytest.mark.asyncio
+async def test_zero_ttl_skips_the_cache():
+    cache = ToolResultCache()
+    builder = AgentGraphBuilder(MagicMock(), InMemorySaver(), {"fetch_live": fetch_live})
+    config = {"configurable": {"tool_cache": cache}}
+
+    for _ in range(2):
+        await builder._invoke_tool({"name": "fetch_live", "args": {"url": "https://example.com"}}, config)
+
+    assert cache.key(fetch_live, {"url": "https://example.com"}) is None
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0